@@ -23,6 +23,7 @@
 
 import os
 import time
+import weakref
 from datetime import timedelta
 from io import BytesIO
 from typing import Optional
@@ -33,15 +34,22 @@ from nextcord import SelectOption
 from nextcord.ext import commands
 from termcolor import colored
 
-from config.loader import SQLITE_PATH, USE_SQLITE, default_language, lang, type_color
+from config.loader import (
+    SQLITE_PATH,
+    USE_SQLITE,
+    default_language,
+    jukebox_config,
+    lang,
+    type_color,
+)
 from config.perm import auth_guard
 from database.guild_handler import get_guild_language, get_guild_settings
 from module.embeds.generic import Embeds
 from module.embeds.nowplaying import NowPlayingMenu
 from module.embeds.queue import QueueViewer
 from module.embeds.lyrics import LyricsLangEmbed
-from module.matcher import SongMatcher
-from module.nextcord_jukebox.enums import LOOPMODE
+from module.matcher import QueueSearchIndex, SongMatcher
+from module.nextcord_jukebox.enums import AUDIOMODE, LOOPMODE
 from module.nextcord_jukebox.event_manager import EventManager
 from module.nextcord_jukebox.exceptions import (
     AlreadyPaused,
@@ -62,6 +70,8 @@ from module.progressBar import progressBar
 from module.replay_card import create_top_songs_poster
 
 class_namespace = "music_class_title"
+# Queues shorter than this are searched with a linear scan instead of an index.
+LINEAR_SEARCH_LIMIT = 200
 
 
 class Music(commands.Cog, EventManager):
@@ -70,9 +80,12 @@ class Music(commands.Cog, EventManager):
         self.now_playing_menus = {}
         self.queue_menus = {}
         self.lyrics_menus = {}
+        self.search_indexes = weakref.WeakKeyDictionary()
 
         if USE_SQLITE:
-            self.manager = PlayerManager(bot, db_type="sqlite", db_path=SQLITE_PATH)
+            self.manager = PlayerManager(
+                bot, db_type="sqlite", db_path=SQLITE_PATH, **jukebox_config
+            )
         else:
             self.manager = PlayerManager(
                 bot,
@@ -82,8 +95,17 @@ class Music(commands.Cog, EventManager):
                 mysql_user=os.getenv("MYSQL_USER"),
                 mysql_password=os.getenv("MYSQL_PASSWORD"),
                 mysql_database=os.getenv("MYSQL_DATABASE"),
+                **jukebox_config,
             )
 
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.manager.start_background_tasks()
+
+    @commands.Cog.listener()
+    async def on_close(self):
+        await self.manager.shutdown()
+
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
         await self.manager.fire_voice_state_update(member, before, after)
@@ -115,6 +137,21 @@ class Music(commands.Cog, EventManager):
                 else:
                     return
 
+    def get_search_index(self, player) -> QueueSearchIndex:
+        """
+        Returns the queue search index of a player, creating it on first use.
+
+        Args:
+            player (MusicPlayer): The player.
+
+        Returns:
+            QueueSearchIndex: The search index over the player's queue.
+        """
+        index = self.search_indexes.get(player)
+        if index is None:
+            index = self.search_indexes[player] = QueueSearchIndex(player.music_queue)
+        return index
+
     async def ensure_voice_state(self, bot, interaction):
         try:
             player = await self.manager.get_player(interaction, bot)
@@ -231,6 +268,15 @@ class Music(commands.Cog, EventManager):
             return
 
         try:
+            await player.set_audio_mode(
+                AUDIOMODE(
+                    await get_guild_settings(interaction.guild.id, "music_audio_mode")
+                    or AUDIOMODE.loudnorm.value
+                ),
+                await get_guild_settings(interaction.guild.id, "music_audio_gain")
+                or 0.0,
+            )
+
             guild_loop = (
                 await get_guild_settings(
                     interaction.guild.id, "music_default_loop_mode"
@@ -545,8 +591,7 @@ class Music(commands.Cog, EventManager):
                 )
                 return
 
-            song = player.music_queue.pop(current_index)
-            player.music_queue.insert(new_index, song)
+            song = player.music_queue.move(current_index, new_index)
 
             await interaction.followup.send(
                 embed=Embeds.message(
@@ -604,34 +649,55 @@ class Music(commands.Cog, EventManager):
                     color=type_color["list"],
                 )
 
-                subset = (
-                    [
-                        song
-                        for song, _ in SongMatcher.match(
-                            await music_player.current_queue(),
-                            query,
-                            case_sens=False,
-                            threshold=0.8,
-                        )
+                current_queue = await music_player.current_queue()
+                more_results = False
+                if query.replace(" ", "") != "" and (
+                    len(current_queue) < LINEAR_SEARCH_LIMIT
+                ):
+                    # Score only up to one result past this page; the pages
+                    # beyond the next one are left uncounted.
+                    matches = SongMatcher.match_topk(
+                        current_queue,
+                        query,
+                        k=11,
+                        offset=(page - 1) * 10,
+                        case_sens=False,
+                    )
+                    positions = {}
+                    for position, song in enumerate(current_queue):
+                        positions.setdefault(id(song), position)
+                    page_entries = [
+                        (positions[id(song)], song) for song, _ in matches[:10]
                     ]
-                    if query.replace(" ", "") != ""
-                    else await music_player.current_queue()
-                )
+                    more_results = len(matches) > 10
+                    result_count = (page - 1) * 10 + len(page_entries)
+                elif query.replace(" ", "") != "":
+                    subset = [
+                        (position, song)
+                        for position, song, _ in self.get_search_index(
+                            music_player
+                        ).search(query, threshold=0.8)
+                    ]
+                    result_count = len(subset)
+                    page_entries = subset[(page - 1) * 10 : page * 10]
+                else:
+                    result_count = len(current_queue)
+                    page_entries = list(
+                        enumerate(
+                            current_queue[(page - 1) * 10 : page * 10],
+                            start=(page - 1) * 10,
+                        )
+                    )
 
-                for i, song in enumerate(
-                    subset[(page - 1) * 10 : page * 10], start=(page - 1) * 10
-                ):
-                    if song == now_playing and i == 0:
+                await music_player.hydrator.hydrate(song for _, song in page_entries)
+
+                for position, song in page_entries:
+                    if song == now_playing and position == 0:
                         continue
 
                     duration_str = str(timedelta(seconds=song.duration))
                     views_str = "{:,}".format(song.views)
-                    current_queue = await music_player.current_queue()
-                    field_name = (
-                        f"{i}. {song.title}"
-                        if query.replace(" ", "") == ""
-                        else f"{current_queue.index(song)}. {song.title}"
-                    )
+                    field_name = f"{position}. {song.title}"
 
                     embed.add_field(
                         name=field_name,
@@ -642,7 +708,7 @@ class Music(commands.Cog, EventManager):
                         SelectOption(
                             label=song.title,
                             description=song.channel,
-                            value=str(current_queue.index(song)),
+                            value=str(position),
                         )
                     )
                     no_result = False
@@ -660,7 +726,9 @@ class Music(commands.Cog, EventManager):
                         )
                     )
 
-                total_pages = QueueViewer.compute_total_pages(len(subset), 10)
+                total_pages = QueueViewer.compute_total_pages(result_count, 10)
+                if more_results:
+                    total_pages = max(total_pages, page + 1)
                 footer_text_key = (
                     "queue_footer"
                     if query.replace(" ", "") == ""
@@ -669,7 +737,11 @@ class Music(commands.Cog, EventManager):
                 embed.set_footer(
                     text=lang[await get_guild_language(interaction.guild.id)][
                         footer_text_key
-                    ].format(page=page, total_pages=total_pages, query=query)
+                    ].format(
+                        page=page,
+                        total_pages=f"{total_pages}+" if more_results else total_pages,
+                        query=query,
+                    )
                 )
 
                 return embed, total_pages, options
@@ -1055,12 +1127,16 @@ class Music(commands.Cog, EventManager):
 
     @staticmethod
     def generate_canvas(
-        interaction: Interaction, period: str, guild_language: str, result_list
+        interaction: Interaction,
+        period: str,
+        guild_language: str,
+        result_list,
+        period_prefix: str = "most_played",
     ):
         period_description = {
-            "Week": "most_played_week",
-            "Month": "most_played_month",
-            "Year": "most_played_year",
+            "Week": f"{period_prefix}_week",
+            "Month": f"{period_prefix}_month",
+            "Year": f"{period_prefix}_year",
         }
 
         canvas = create_top_songs_poster(
@@ -1080,46 +1156,26 @@ class Music(commands.Cog, EventManager):
 
         return canvas
 
-    @music.subcommand(
-        description=lang[default_language]["music_most_played_description"]
-    )
-    @auth_guard.check_permissions("music/most_played")
-    async def most_played(
-        self,
-        interaction: Interaction,
-        period: str = SlashOption(
-            name="period",
-            choices=["Week", "Month", "Year"],
-            description=lang[default_language]["music_most_played_period_description"],
-            required=False,
-            default="Month",
-        ),
-    ):
-        await interaction.response.defer(with_message=True)
-        timer = time.time()
-        print(colored("Obtaining Entries...", "dark_grey"))
-        guild_language = await get_guild_language(interaction.guild.id)
-        period_dict = {"Week": 7, "Month": 30, "Year": 365}
-        cutoff_days = period_dict.get(period, 30)
-
-        replay_history = await self.manager.database.get_replay_history(
-            str(interaction.user.id), cutoff_days
-        )
+    def build_poster_entries(self, replay_counts, total_replays: int) -> dict:
+        """
+        Builds the poster data from the top (video_id, plays) tuples, most played first.
 
-        replay_aggregate = {}
-        artist_counts = {}
-        total_replays = 0
+        The top artist is the channel with the most plays among the given
+        entries, and its percentage is relative to all replays in the period.
 
-        for replay in replay_history:
-            video_id = replay["song"]
-            replay_aggregate[video_id] = replay_aggregate.get(video_id, 0) + 1
-            total_replays += 1
+        Args:
+            replay_counts (list): The top 10 (video_id, plays) tuples, most played first.
+            total_replays (int): The total number of replays in the period.
 
-        video_metadata = self.manager.database.get_bulk_video_metadata(
-            list(replay_aggregate.keys())
+        Returns:
+            dict: The data consumed by generate_canvas.
+        """
+        artist_counts = {}
+        video_metadata = self.manager.metadata_cache.get_bulk(
+            [video_id for video_id, _ in replay_counts]
         )
 
-        for video_id, replay_count in replay_aggregate.items():
+        for video_id, replay_count in replay_counts:
             metadata = video_metadata.get(video_id, {})
             if metadata:
                 artist = metadata.get("channel", "Unknown")
@@ -1133,22 +1189,13 @@ class Music(commands.Cog, EventManager):
         )
 
         result_list = {
-            "total_replayed": len(replay_history),
+            "total_replayed": total_replays,
             "total_time": 0,
             "replays": [],
             "top_artist": {"name": top_artist, "percentage": top_artist_percentage},
         }
 
-        top_replays = sorted(
-            (
-                (video_id, replay_count)
-                for video_id, replay_count in replay_aggregate.items()
-            ),
-            key=lambda item: item[1],
-            reverse=True,
-        )[:10]
-
-        for video_id, replay_count in top_replays:
+        for video_id, replay_count in replay_counts:
             metadata = video_metadata.get(video_id, {})
             result_list["replays"].append(
                 {
@@ -1165,26 +1212,29 @@ class Music(commands.Cog, EventManager):
             for _ in range(10 - len(result_list["replays"]))
         )
 
-        print(
-            colored(
-                f"Entries obtained and sorted, Time Taken: {time.time() - timer}",
-                "dark_grey",
-            )
-        )
+        return result_list
 
+    async def send_poster(
+        self,
+        interaction: Interaction,
+        period: str,
+        guild_language: str,
+        result_list,
+        period_prefix: str = "most_played",
+    ):
         timer = time.time()
         print(colored("Generating Canvas...", "dark_grey"))
         canvas = await self.bot.loop.run_in_executor(
             None,
             lambda: self.generate_canvas(
-                interaction, period, guild_language, result_list
+                interaction, period, guild_language, result_list, period_prefix
             ),
         )
 
         with BytesIO() as image_binary:
             canvas.save(image_binary, "PNG")
             image_binary.seek(0)
-            poster = File(filename="most_played.png", fp=image_binary)
+            poster = File(filename=f"{period_prefix}.png", fp=image_binary)
             await interaction.followup.send(files=[poster])
             print(
                 colored(
@@ -1192,6 +1242,80 @@ class Music(commands.Cog, EventManager):
                 )
             )
 
+    @music.subcommand(
+        description=lang[default_language]["music_most_played_description"]
+    )
+    @auth_guard.check_permissions("music/most_played")
+    async def most_played(
+        self,
+        interaction: Interaction,
+        period: str = SlashOption(
+            name="period",
+            choices=["Week", "Month", "Year"],
+            description=lang[default_language]["music_most_played_period_description"],
+            required=False,
+            default="Month",
+        ),
+    ):
+        await interaction.response.defer(with_message=True)
+        timer = time.time()
+        print(colored("Obtaining Entries...", "dark_grey"))
+        guild_language = await get_guild_language(interaction.guild.id)
+        period_dict = {"Week": 7, "Month": 30, "Year": 365}
+        cutoff_days = period_dict.get(period, 30)
+
+        summary = await self.manager.database.get_replay_summary(
+            str(interaction.user.id), cutoff_days
+        )
+        result_list = self.build_poster_entries(summary["top"], summary["total"])
+
+        print(
+            colored(
+                f"Entries obtained, Time Taken: {time.time() - timer}",
+                "dark_grey",
+            )
+        )
+
+        await self.send_poster(interaction, period, guild_language, result_list)
+
+    @music.subcommand(
+        description=lang[default_language]["music_server_recap_description"]
+    )
+    @auth_guard.check_permissions("music/server_recap")
+    async def server_recap(
+        self,
+        interaction: Interaction,
+        period: str = SlashOption(
+            name="period",
+            choices=["Week", "Month", "Year"],
+            description=lang[default_language]["music_server_recap_period_description"],
+            required=False,
+            default="Month",
+        ),
+    ):
+        await interaction.response.defer(with_message=True)
+        timer = time.time()
+        print(colored("Obtaining Entries...", "dark_grey"))
+        guild_language = await get_guild_language(interaction.guild.id)
+        period_dict = {"Week": 7, "Month": 30, "Year": 365}
+        cutoff_days = period_dict.get(period, 30)
+
+        summary = await self.manager.database.get_guild_replay_summary(
+            str(interaction.guild.id), cutoff_days
+        )
+        result_list = self.build_poster_entries(summary["top"], summary["total"])
+
+        print(
+            colored(
+                f"Entries obtained, Time Taken: {time.time() - timer}",
+                "dark_grey",
+            )
+        )
+
+        await self.send_poster(
+            interaction, period, guild_language, result_list, "server_recap"
+        )
+
     @music.subcommand(
         description=lang[default_language]["music_flush_cache_description"]
     )
@@ -1202,6 +1326,10 @@ class Music(commands.Cog, EventManager):
     ):
         await interaction.response.defer(with_message=True)
         self.manager.database.clear_old_cache(days=0)
+        self.manager.metadata_cache.clear()
+        self.manager.database.clear_playlist_cache()
+        self.manager.search_cache.clear()
+        self.manager.database.clear_search_cache()
         await interaction.followup.send(
             embed=Embeds.message(
                 title=lang[await get_guild_language(interaction.guild.id)][
@@ -233,6 +233,61 @@ class Settings(commands.Cog):
             )
         )
 
+    @music.subcommand(
+        description=lang[default_language]["setting_music_audio_mode_description"]
+    )
+    @auth_guard.check_permissions("setting/music/audio_mode")
+    async def audio_mode(
+        self,
+        interaction: Interaction,
+        mode: str = nextcord.SlashOption(
+            name="mode",
+            description=lang[default_language][
+                "setting_music_audio_mode_mode_description"
+            ],
+            choices=[
+                "Passthrough",
+                "Gain",
+                "Normalized",
+            ],
+            required=True,
+        ),
+        gain: float = nextcord.SlashOption(
+            name="gain",
+            description=lang[default_language][
+                "setting_music_audio_mode_gain_description"
+            ],
+            min_value=-20,
+            max_value=20,
+            required=False,
+            default=None,
+        ),
+    ):
+        await interaction.response.defer(with_message=True)
+        audio_mode = {
+            "Passthrough": 1,
+            "Gain": 2,
+            "Normalized": 3,
+        }
+
+        await change_guild_settings(
+            interaction.guild.id, "music_audio_mode", audio_mode[mode]
+        )
+        if gain is not None:
+            await change_guild_settings(interaction.guild.id, "music_audio_gain", gain)
+
+        await interaction.followup.send(
+            embed=Embeds.message(
+                title=lang[await get_guild_language(interaction.guild.id)][
+                    class_namespace
+                ],
+                message=lang[await get_guild_language(interaction.guild.id)][
+                    "audio_mode_changed"
+                ].format(mode=mode),
+                message_type="info",
+            )
+        )
+
 
 async def setup(bot):
     bot.add_cog(Settings(bot))
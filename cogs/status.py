@@ -35,7 +35,7 @@ from nextcord import Interaction
 from nextcord.ext import commands
 from termcolor import colored
 
-from config.loader import default_language, lang, status_text, use_ytdlp
+from config.loader import default_language, jukebox_config, lang, status_text
 from config.perm import auth_guard
 from database.guild_handler import get_guild_language
 from module.embeds.generic import Embeds
@@ -104,12 +104,12 @@ class System(commands.Cog):
             )
         )
 
-        if use_ytdlp:
-            print(colored(text="Using YTDLP to extract video data", color="dark_grey"))
-        else:
-            print(
-                colored(text="Using Meta-YT to extract video data", color="dark_grey")
+        print(
+            colored(
+                text=f"Using {jukebox_config['metadata_backend']} metadata backend to extract video data",
+                color="dark_grey",
             )
+        )
         print(colored(text=f"Default language: {default_language}", color="dark_grey"))
 
         if yt_dlp_version != latest_yt_dlp_version:
@@ -43,6 +43,10 @@ theme_color = config["theme_color"]
 max_note = config["max_note"]
 point_receive_limit = config["point_receive_limit"]
 
+jukebox_config = config.get("jukebox") or {}
+if not jukebox_config.get("metadata_backend"):
+    jukebox_config["metadata_backend"] = "ytdlp" if use_ytdlp else "meta_yt"
+
 AUTHGUARD_SQLITE_PATH = config["AUTHGUARD_SQLITE_PATH"]
 AUTHGUARD_USE_SQLITE = config["AUTHGUARD_USE_SQLITE"]
 
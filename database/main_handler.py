@@ -65,6 +65,8 @@ create_statements = {
                     music_silent_mode BOOLEAN,
                     music_auto_leave BOOLEAN,
                     music_default_loop_mode INTEGER,
+                    music_audio_mode INTEGER,
+                    music_audio_gain REAL,
                     jackpot_total INTEGER,
                     game_announce_channel INTEGER
                 )
@@ -75,6 +77,8 @@ create_statements = {
                 "music_silent_mode": "BOOLEAN",
                 "music_auto_leave": "BOOLEAN",
                 "music_default_loop_mode": "INTEGER",
+                "music_audio_mode": "INTEGER",
+                "music_audio_gain": "REAL",
                 "jackpot_total": "INTEGER",
                 "game_announce_channel": "INTEGER",
             },
@@ -140,6 +144,8 @@ create_statements = {
                     music_silent_mode BOOLEAN,
                     music_auto_leave BOOLEAN,
                     music_default_loop_mode INT,
+                    music_audio_mode INT,
+                    music_audio_gain FLOAT,
                     jackpot_total INT,
                     game_announce_channel INT
                 )
@@ -150,6 +156,8 @@ create_statements = {
                 "music_silent_mode": "BOOLEAN",
                 "music_auto_leave": "BOOLEAN",
                 "music_default_loop_mode": "INT",
+                "music_audio_mode": "INT",
+                "music_audio_gain": "FLOAT",
                 "jackpot_total": "INT",
                 "game_announce_channel": "INT",
             },
@@ -21,10 +21,30 @@
 #  ------------------------------------------------------------
 #
 
+import heapq
+import math
 import re
+from functools import lru_cache
 
 from termcolor import colored
 
+SPLIT_PATTERN = re.compile(r"\s+|[^\w\s・]")
+BRACKET_PATTERN = re.compile(r"[『』【】\[\]()・]")
+SYMBOL_PATTERN = re.compile(r"[^\w\sぁ-んァ-ン一-龯]")
+SPACE_PATTERN = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=8192)
+def _normalize_text(text):
+    text = BRACKET_PATTERN.sub("", text)
+    text = SYMBOL_PATTERN.sub("", text)
+    return SPACE_PATTERN.sub(" ", text).strip()
+
+
+@lru_cache(maxsize=8192)
+def _split(text):
+    return tuple(SPLIT_PATTERN.split(text))
+
 
 class SongMatcher:
     """A class for matching songs based on a query string."""
@@ -59,6 +79,56 @@ class SongMatcher:
 
         return prev[-1]
 
+    @classmethod
+    def bounded_lev_dist(cls, s1, s2, max_dist):
+        """
+        Computes the Levenshtein distance between two strings, giving up once it exceeds a bound.
+
+        Only the diagonal band of width ``2 * max_dist + 1`` is computed, and the
+        computation stops as soon as every cell of a row exceeds the bound.
+
+        Args:
+            s1 (str): The first string.
+            s2 (str): The second string.
+            max_dist (int): The largest distance of interest.
+
+        Returns:
+            int: The Levenshtein distance if it is at most max_dist, otherwise max_dist + 1.
+        """
+        if len(s1) < len(s2):
+            s1, s2 = s2, s1
+        len1, len2 = len(s1), len(s2)
+        if len1 - len2 > max_dist:
+            return max_dist + 1
+        if len2 == 0:
+            return len1
+
+        over = max_dist + 1
+        prev = [j if j <= max_dist else over for j in range(len2 + 1)]
+        for i in range(1, len1 + 1):
+            c1 = s1[i - 1]
+            low = max(1, i - max_dist)
+            high = min(len2, i + max_dist)
+            curr = [over] * (len2 + 1)
+            curr[0] = i if i <= max_dist else over
+            row_min = curr[0]
+            for j in range(low, high + 1):
+                value = prev[j - 1] + (c1 != s2[j - 1])
+                if prev[j] + 1 < value:
+                    value = prev[j] + 1
+                if curr[j - 1] + 1 < value:
+                    value = curr[j - 1] + 1
+                if value > over:
+                    value = over
+                curr[j] = value
+                if value < row_min:
+                    row_min = value
+            if row_min > max_dist:
+                return over
+            prev = curr
+
+        return prev[len2] if prev[len2] <= max_dist else over
+
     @classmethod
     def calc_score(cls, dist, max_len):
         """
@@ -84,22 +154,31 @@ class SongMatcher:
         Returns:
             list of str: A list of terms.
         """
-        return re.split(r"\s+|[^\w\s・]", text)
+        return list(_split(text))
 
     @classmethod
-    def term_sim(cls, q_term, t_term):
+    def term_sim(cls, q_term, t_term, threshold=None):
         """
         Computes the similarity score between two terms.
 
+        With a threshold, the distance is only computed as far as it can still
+        reach the threshold. Scores below the threshold are then not exact,
+        but are guaranteed to stay below it.
+
         Args:
             q_term (str): The query term.
             t_term (str): The target term.
+            threshold (float, optional): The score of interest. Defaults to None, which computes the exact score.
 
         Returns:
             float: The similarity score (between 0 and 1).
         """
         max_len = max(len(q_term), len(t_term))
-        dist = cls.lev_dist(q_term, t_term)
+        if threshold is None:
+            dist = cls.lev_dist(q_term, t_term)
+        else:
+            max_dist = max(math.floor((1 - threshold) * max_len + 1e-9), 0)
+            dist = cls.bounded_lev_dist(q_term, t_term, max_dist)
         return cls.calc_score(dist, max_len)
 
     @classmethod
@@ -113,62 +192,101 @@ class SongMatcher:
         Returns:
             str: The normalized text.
         """
-        text = re.sub(r"[『』【】\[\]()・]", "", text)
-        text = re.sub(r"[^\w\sぁ-んァ-ン一-龯]", "", text)
-        text = re.sub(r"\s+", " ", text).strip()
-        return text
+        return _normalize_text(text)
 
     @classmethod
-    def match(cls, song_queue, query, case_sens=True, threshold=0.8, debug=False):
+    def _prepare_query(cls, query, case_sens):
         """
-        Matches songs from the song queue based on the query string.
+        Normalises and splits a query.
 
         Args:
-            song_queue (list of Song): The list of songs to search.
             query (str): The query string.
             case_sens (bool): Whether the match should be case-sensitive.
-            threshold (float): The minimum similarity score to consider a match.
-            debug (bool): Whether to print debug information.
 
         Returns:
-            list of tuple: A list of tuples containing matched songs and their scores.
+            tuple of str: The query terms.
         """
         if not case_sens:
             query = query.lower()
+        return _split(_normalize_text(query))
 
-        query = cls.normalize_text(query)
-        q_terms = cls.split(query)
-        results = []
+    @classmethod
+    def _prepare_song(cls, song, case_sens):
+        """
+        Normalises and splits the title and channel of a song.
 
-        for song in song_queue:
-            song_title = cls.normalize_text(song.name)
-            song_channel = cls.normalize_text(song.channel)
+        Args:
+            song (Song): The song.
+            case_sens (bool): Whether the match should be case-sensitive.
+
+        Returns:
+            tuple: The processed title, the processed channel and their combined terms.
+        """
+        title_proc = _normalize_text(song.name)
+        channel_proc = _normalize_text(song.channel)
+        if not case_sens:
+            title_proc = title_proc.lower()
+            channel_proc = channel_proc.lower()
+        return (
+            title_proc,
+            channel_proc,
+            _split(title_proc) + _split(channel_proc),
+        )
 
-            title_proc = song_title.lower() if not case_sens else song_title
-            channel_proc = song_channel.lower() if not case_sens else song_channel
+    @classmethod
+    def _score(cls, q_terms, prepared, threshold):
+        """
+        Scores a prepared song against query terms.
 
-            t_terms = cls.split(title_proc)
-            c_terms = cls.split(channel_proc)
+        The score comes from the first query term found in the title or channel,
+        or similar enough to one of their terms.
 
-            combined_terms = t_terms + c_terms
+        Args:
+            q_terms (tuple of str): The query terms.
+            prepared (tuple): The song, as returned by _prepare_song.
+            threshold (float): The minimum similarity score to consider a match.
 
-            match_found = False
-            for q_term in q_terms:
-                highest_score = 0
+        Returns:
+            tuple: Whether the song matched, and its score.
+        """
+        title_proc, channel_proc, combined_terms = prepared
+        highest_score = 0
+        for q_term in q_terms:
+            highest_score = 0
 
-                if q_term in title_proc or q_term in channel_proc:
-                    highest_score = 1
-                    match_found = True
-                    break
+            if q_term in title_proc or q_term in channel_proc:
+                return True, 1
 
-                # Compare against split terms
-                for t_term in combined_terms:
-                    sim_score = cls.term_sim(q_term, t_term)
-                    highest_score = max(highest_score, sim_score)
+            # Compare against split terms
+            for t_term in combined_terms:
+                sim_score = cls.term_sim(q_term, t_term, threshold)
+                highest_score = max(highest_score, sim_score)
 
-                if highest_score >= threshold:
-                    match_found = True
-                    break
+            if highest_score >= threshold:
+                return True, highest_score
+        return False, highest_score
+
+    @classmethod
+    def match(cls, song_queue, query, case_sens=True, threshold=0.8, debug=False):
+        """
+        Matches songs from the song queue based on the query string.
+
+        Args:
+            song_queue (list of Song): The list of songs to search.
+            query (str): The query string.
+            case_sens (bool): Whether the match should be case-sensitive.
+            threshold (float): The minimum similarity score to consider a match.
+            debug (bool): Whether to print debug information.
+
+        Returns:
+            list of tuple: A list of tuples containing matched songs and their scores.
+        """
+        q_terms = cls._prepare_query(query, case_sens)
+        results = []
+
+        for song in song_queue:
+            prepared = cls._prepare_song(song, case_sens)
+            match_found, highest_score = cls._score(q_terms, prepared, threshold)
 
             if match_found:
                 results.append((song, highest_score))
@@ -176,7 +294,7 @@ class SongMatcher:
                 if debug:
                     print(
                         colored(
-                            f"Unmatch >  {song_title} by {song_channel} (Score: {highest_score:.2f})",
+                            f"Unmatch >  {prepared[0]} by {prepared[1]} (Score: {highest_score:.2f})",
                             "grey",
                         )
                     )
@@ -184,6 +302,318 @@ class SongMatcher:
         results.sort(key=lambda x: x[1], reverse=True)
         return results
 
+    @classmethod
+    def match_topk(
+        cls, song_queue, query, k=10, offset=0, case_sens=True, threshold=0.8
+    ):
+        """
+        Returns one page of the results of match without scoring and sorting every match.
+
+        Matches stream through a heap bounded to ``offset + k`` entries. Once the
+        heap only holds perfect scores, no later song can displace them, so the
+        scan stops there.
+
+        Args:
+            song_queue (list of Song): The list of songs to search.
+            query (str): The query string.
+            k (int): The number of results to return. Defaults to 10.
+            offset (int): The number of best results to skip. Defaults to 0.
+            case_sens (bool): Whether the match should be case-sensitive.
+            threshold (float): The minimum similarity score to consider a match.
+
+        Returns:
+            list of tuple: The (song, score) tuples at positions offset to offset + k of match's results.
+        """
+        capacity = offset + k
+        if k <= 0:
+            return []
+
+        q_terms = cls._prepare_query(query, case_sens)
+        heap = []
+        for index, song in enumerate(song_queue):
+            match_found, score = cls._score(
+                q_terms, cls._prepare_song(song, case_sens), threshold
+            )
+            if not match_found:
+                continue
+            # Ties are won by the earlier song, as in match's stable sort.
+            item = (score, -index, song)
+            if len(heap) < capacity:
+                heapq.heappush(heap, item)
+            elif item[:2] > heap[0][:2]:
+                heapq.heapreplace(heap, item)
+            if len(heap) == capacity and heap[0][0] >= 1:
+                break
+
+        ranked = sorted(heap, key=lambda item: item[:2], reverse=True)
+        return [(song, score) for score, _, song in ranked[offset:capacity]]
+
+    @classmethod
+    def match_many(cls, song_queue, queries, case_sens=True, threshold=0.8):
+        """
+        Matches several queries in one pass, processing each song once.
+
+        Args:
+            song_queue (list of Song): The list of songs to search.
+            queries (list of str): The query strings.
+            case_sens (bool): Whether the match should be case-sensitive.
+            threshold (float): The minimum similarity score to consider a match.
+
+        Returns:
+            dict: The results of match for each query.
+        """
+        prepared_queries = {
+            query: cls._prepare_query(query, case_sens) for query in queries
+        }
+        results = {query: [] for query in prepared_queries}
+
+        for song in song_queue:
+            prepared = cls._prepare_song(song, case_sens)
+            for query, q_terms in prepared_queries.items():
+                match_found, score = cls._score(q_terms, prepared, threshold)
+                if match_found:
+                    results[query].append((song, score))
+
+        for matches in results.values():
+            matches.sort(key=lambda x: x[1], reverse=True)
+        return results
+
+
+class QueueSearchIndex:
+    """
+    A search index over a music queue, scoring songs the same way as SongMatcher.match.
+
+    Titles and channels are normalised and tokenised once per queue entry and
+    kept in sync with the queue through its version counter. Substring matches
+    are narrowed down with trigram postings over the normalised texts, and fuzzy
+    matches are computed against the distinct terms of the queue, filtered by
+    length, instead of against every term of every song. Results are kept until
+    the queue changes, so paging through them is a lookup.
+
+    Attributes:
+        queue (MusicQueue): The queue to search.
+        gram_size (int): The length of the n-grams in the postings.
+    """
+
+    def __init__(self, queue, gram_size=3):
+        """
+        Initializes the index. It is built on the first search.
+
+        Args:
+            queue (MusicQueue): The queue to search.
+            gram_size (int): The length of the n-grams in the postings. Defaults to 3.
+        """
+        self.queue = queue
+        self.gram_size = gram_size
+        self._version = None
+        self._docs = {}
+        self._term_entries = {}
+        self._terms_by_length = {}
+        self._gram_entries = {}
+        self._fuzzy_cache = {}
+        self._results = {}
+
+    def _grams(self, text):
+        """
+        Returns the n-grams of a text.
+
+        Args:
+            text (str): The text.
+
+        Returns:
+            set of str: The n-grams.
+        """
+        size = self.gram_size
+        return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+    def _add(self, entry_id, song):
+        """
+        Indexes a queue entry.
+
+        Args:
+            entry_id (int): The entry ID.
+            song (Song): The song of the entry.
+        """
+        title = SongMatcher.normalize_text(song.name).lower()
+        channel = SongMatcher.normalize_text(song.channel).lower()
+        terms = set(SongMatcher.split(title) + SongMatcher.split(channel))
+        grams = self._grams(title) | self._grams(channel)
+        self._docs[entry_id] = (
+            song,
+            song.name,
+            song.channel,
+            title,
+            channel,
+            terms,
+            grams,
+        )
+
+        for term in terms:
+            entries = self._term_entries.get(term)
+            if entries is None:
+                entries = self._term_entries[term] = set()
+                self._terms_by_length.setdefault(len(term), set()).add(term)
+                self._fuzzy_cache.clear()
+            entries.add(entry_id)
+        for gram in grams:
+            self._gram_entries.setdefault(gram, set()).add(entry_id)
+
+    def _remove(self, entry_id):
+        """
+        Drops a queue entry from the index.
+
+        Args:
+            entry_id (int): The entry ID.
+        """
+        _, _, _, _, _, terms, grams = self._docs.pop(entry_id)
+        for term in terms:
+            entries = self._term_entries[term]
+            entries.discard(entry_id)
+            if not entries:
+                del self._term_entries[term]
+                self._terms_by_length[len(term)].discard(term)
+        for gram in grams:
+            entries = self._gram_entries[gram]
+            entries.discard(entry_id)
+            if not entries:
+                del self._gram_entries[gram]
+
+    def refresh(self):
+        """
+        Brings the index in sync with the queue. Does nothing if the queue has not changed.
+        """
+        if self._version == self.queue.version:
+            return
+        self._results.clear()
+        current = {entry_id: song for _, entry_id, song in self.queue.entries()}
+        for entry_id in [
+            entry_id for entry_id in self._docs if entry_id not in current
+        ]:
+            self._remove(entry_id)
+        for entry_id, song in current.items():
+            doc = self._docs.get(entry_id)
+            if doc is not None:
+                if doc[0] is song and doc[1] == song.name and doc[2] == song.channel:
+                    continue
+                self._remove(entry_id)
+            self._add(entry_id, song)
+        self._version = self.queue.version
+
+    def _substring_entries(self, q_term):
+        """
+        Finds the entries whose title or channel contains a query term.
+
+        Args:
+            q_term (str): The normalised query term.
+
+        Returns:
+            set of int: The entry IDs.
+        """
+        if len(q_term) >= self.gram_size:
+            postings = sorted(
+                (self._gram_entries.get(gram, set()) for gram in self._grams(q_term)),
+                key=len,
+            )
+            candidates = set.intersection(*postings)
+        else:
+            candidates = self._docs.keys()
+        return {
+            entry_id
+            for entry_id in candidates
+            if q_term in self._docs[entry_id][3] or q_term in self._docs[entry_id][4]
+        }
+
+    def _fuzzy_terms(self, q_term, threshold):
+        """
+        Scores the distinct terms of the queue that are similar to a query term.
+
+        The scores only depend on the terms, so they are cached until a new term
+        enters the queue. Terms that left the queue are skipped by the caller.
+
+        Args:
+            q_term (str): The normalised query term.
+            threshold (float): The minimum similarity score.
+
+        Returns:
+            dict: The score per term, for terms reaching the threshold.
+        """
+        key = (q_term, threshold)
+        if key in self._fuzzy_cache:
+            return self._fuzzy_cache[key]
+
+        length = len(q_term)
+        if threshold > 0:
+            shortest = math.ceil(length * threshold - 1e-9)
+            longest = math.floor(length / threshold + 1e-9)
+        else:
+            shortest, longest = 0, max(self._terms_by_length, default=0)
+
+        scores = {}
+        for term_length in range(shortest, longest + 1):
+            for term in self._terms_by_length.get(term_length, ()):
+                if max(length, term_length) == 0:
+                    continue
+                score = SongMatcher.term_sim(q_term, term, threshold)
+                if score >= threshold:
+                    scores[term] = score
+
+        self._fuzzy_cache[key] = scores
+        return scores
+
+    def _fuzzy_entries(self, q_term, threshold):
+        """
+        Scores the entries whose terms are similar to a query term.
+
+        Args:
+            q_term (str): The normalised query term.
+            threshold (float): The minimum similarity score.
+
+        Returns:
+            dict: The best score per entry ID, for entries reaching the threshold.
+        """
+        scores = {}
+        for term, score in self._fuzzy_terms(q_term, threshold).items():
+            for entry_id in self._term_entries.get(term, ()):
+                if score > scores.get(entry_id, 0):
+                    scores[entry_id] = score
+        return scores
+
+    def search(self, query, threshold=0.8):
+        """
+        Searches the queue, case-insensitively.
+
+        Args:
+            query (str): The query string.
+            threshold (float): The minimum similarity score to consider a match.
+
+        Returns:
+            list of tuple: (position, song, score) tuples, best match first and in queue order on ties.
+        """
+        self.refresh()
+        key = (query, threshold)
+        if key in self._results:
+            return self._results[key]
+        q_terms = SongMatcher.split(SongMatcher.normalize_text(query.lower()))
+
+        scores = {}
+        for q_term in q_terms:
+            for entry_id in self._substring_entries(q_term):
+                scores.setdefault(entry_id, 1)
+            if len(scores) == len(self._docs):
+                break
+            for entry_id, score in self._fuzzy_entries(q_term, threshold).items():
+                scores.setdefault(entry_id, score)
+
+        results = [
+            (self.queue.position(entry_id), self._docs[entry_id][0], score)
+            for entry_id, score in scores.items()
+        ]
+        results.sort(key=lambda result: (-result[2], result[0]))
+        if len(self._results) >= 64:
+            self._results.clear()
+        self._results[key] = results
+        return results
+
 
 class Song:
     """
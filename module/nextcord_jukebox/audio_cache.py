@@ -0,0 +1,341 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import asyncio
+import os
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, Set
+
+import yt_dlp
+
+from . import LogHandler
+
+OPUS_EXTENSIONS = (".webm", ".opus", ".ogg")
+
+
+class CachedAudio:
+    """
+    A track stored in the audio cache.
+
+    Attributes:
+        path (str): The path of the audio file.
+        size (int): The size of the file in bytes.
+        last_used (float): The time the file was last played.
+        hits (int): How many times the file was played from the cache.
+    """
+
+    __slots__ = ("path", "size", "last_used", "hits")
+
+    def __init__(self, path: str, size: int, last_used: float, hits: int = 0) -> None:
+        self.path = path
+        self.size = size
+        self.last_used = last_used
+        self.hits = hits
+
+    @property
+    def codec(self) -> Optional[str]:
+        """Optional[str]: "opus" if the file holds an Opus stream, None if unknown."""
+        return "opus" if self.path.endswith(OPUS_EXTENSIONS) else None
+
+
+class AudioCache:
+    """
+    Keeps local copies of frequently played tracks on disk.
+
+    A track is downloaded once it has been played ``min_plays`` times, counting the
+    plays recorded in the replay history. The directory is bounded to ``max_bytes``
+    and evicts the least recently used ("lru") or least frequently used ("lfu")
+    files first.
+
+    Plays are only counted for tracks that are not cached yet. At most
+    ``max_tracked`` counts are kept; when twice as many accumulate, the least
+    played tracks are forgotten.
+
+    Attributes:
+        database: The database instance holding the replay history.
+        directory (str): The directory the audio files are stored in.
+        max_bytes (int): The maximum total size of the cached files.
+        min_plays (int): The play count after which a track is downloaded.
+        eviction (str): The eviction policy, "lru" or "lfu".
+        max_tracked (int): The number of uncached tracks whose play counts are kept.
+        size (int): The current total size of the cached files.
+    """
+
+    def __init__(
+        self,
+        database,
+        directory: str,
+        max_bytes: int = 2 * 1024**3,
+        min_plays: int = 5,
+        eviction: str = "lru",
+        max_downloads: int = 1,
+        max_tracked: int = 10000,
+    ) -> None:
+        """
+        Initializes the AudioCache and indexes the files already on disk.
+
+        Args:
+            database: The database instance holding the replay history.
+            directory (str): The directory the audio files are stored in.
+            max_bytes (int, optional): The maximum total size of the cached files. Defaults to 2 GiB.
+            min_plays (int, optional): The play count after which a track is downloaded. Defaults to 5.
+            eviction (str, optional): The eviction policy, "lru" or "lfu". Defaults to "lru".
+            max_downloads (int, optional): The maximum number of concurrent downloads. Defaults to 1.
+            max_tracked (int, optional): The number of uncached tracks whose play counts are kept. Defaults to 10000.
+
+        Raises:
+            ValueError: If the eviction policy is unknown.
+        """
+        if eviction not in ("lru", "lfu"):
+            raise ValueError(f"Unknown eviction policy: {eviction}")
+
+        self.database = database
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_plays = min_plays
+        self.eviction = eviction
+        self.max_downloads = max_downloads
+        self.max_tracked = max_tracked
+        self.size = 0
+
+        self._entries: "OrderedDict[str, CachedAudio]" = OrderedDict()
+        self._play_counts: Counter = Counter()
+        self._downloading: Set[str] = set()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._seeded = False
+        self._stats = {"hits": 0, "misses": 0, "downloads": 0, "evictions": 0}
+
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self) -> None:
+        """Indexes the audio files already present in the cache directory."""
+        files = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            video_id, extension = os.path.splitext(name)
+            if extension in (".part", ".ytdl") or not os.path.isfile(path):
+                continue
+            stat = os.stat(path)
+            files.append((stat.st_mtime, video_id, path, stat.st_size))
+
+        for mtime, video_id, path, size in sorted(files):
+            self._entries[video_id] = CachedAudio(path, size, mtime)
+            self.size += size
+        self._evict()
+
+    def get(self, video_id: str) -> Optional[CachedAudio]:
+        """
+        Returns the cached audio of a track and marks it as used.
+
+        Args:
+            video_id (str): The video ID.
+
+        Returns:
+            Optional[CachedAudio]: The cached audio, or None if the track is not cached.
+        """
+        entry = self._entries.get(video_id)
+        if entry is not None and not os.path.exists(entry.path):
+            self._drop(video_id)
+            entry = None
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+
+        entry.last_used = time.time()
+        entry.hits += 1
+        self._entries.move_to_end(video_id)
+        self._stats["hits"] += 1
+        return entry
+
+    def record_play(self, video_id: str) -> None:
+        """
+        Counts a play of a track and downloads it once it reaches the threshold.
+
+        Args:
+            video_id (str): The video ID.
+        """
+        if video_id in self._entries:
+            return
+        self._play_counts[video_id] += 1
+        if len(self._play_counts) > 2 * self.max_tracked:
+            self._prune_play_counts()
+        if (
+            self._play_counts[video_id] >= self.min_plays
+            and video_id not in self._downloading
+        ):
+            self._downloading.add(video_id)
+            task = asyncio.get_running_loop().create_task(self._download(video_id))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    def _prune_play_counts(self) -> None:
+        """Keeps only the play counts of the ``max_tracked`` most played tracks."""
+        self._play_counts = Counter(
+            dict(self._play_counts.most_common(self.max_tracked))
+        )
+
+    def start(self, days: int = 30) -> None:
+        """
+        Loads the play counts of the replay history in the background. Safe to call repeatedly.
+
+        Args:
+            days (int, optional): The number of days of history to count. Defaults to 30.
+        """
+        if self._seeded:
+            return
+        self._seeded = True
+        task = asyncio.get_running_loop().create_task(self._seed(days))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _seed(self, days: int) -> None:
+        """
+        Adds the play counts of the replay history to the in-memory counts.
+
+        Args:
+            days (int): The number of days of history to count.
+        """
+        try:
+            counts = await asyncio.to_thread(
+                self.database.get_play_counts, self.min_plays, days
+            )
+        except Exception as e:
+            LogHandler.warning(f"Failed to seed audio cache play counts: {e}")
+            return
+        self._play_counts.update(
+            {
+                video_id: count
+                for video_id, count in counts.items()
+                if video_id not in self._entries
+            }
+        )
+
+    async def _download(self, video_id: str) -> None:
+        """
+        Downloads a track into the cache and evicts files to stay within the size bound.
+
+        Args:
+            video_id (str): The video ID.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_downloads)
+        try:
+            async with self._semaphore:
+                path = await asyncio.to_thread(self._download_file, video_id)
+            size = os.path.getsize(path)
+            self._entries[video_id] = CachedAudio(path, size, time.time())
+            self.size += size
+            self._play_counts.pop(video_id, None)
+            self._stats["downloads"] += 1
+            LogHandler.info(f"Cached audio of {video_id} ({size} bytes)")
+            self._evict()
+        except Exception as e:
+            LogHandler.warning(f"Failed to cache audio of {video_id}: {e}")
+        finally:
+            self._downloading.discard(video_id)
+
+    def _download_file(self, video_id: str) -> str:
+        """
+        Downloads the audio of a track with yt-dlp, preferring Opus.
+
+        Args:
+            video_id (str): The video ID.
+
+        Returns:
+            str: The path of the downloaded file.
+        """
+        with yt_dlp.YoutubeDL(
+            {
+                "format": "bestaudio[acodec=opus]/bestaudio",
+                "outtmpl": os.path.join(self.directory, "%(id)s.%(ext)s"),
+                "noplaylist": True,
+                "quiet": True,
+                "no_warnings": True,
+                "max_filesize": self.max_bytes,
+            }
+        ) as ydl:
+            info = ydl.extract_info(
+                f"https://www.youtube.com/watch?v={video_id}", download=True
+            )
+            if not info:
+                raise RuntimeError("No audio was downloaded")
+            return ydl.prepare_filename(info)
+
+    def _evict(self) -> None:
+        """Removes files until the cache fits within ``max_bytes``."""
+        while self.size > self.max_bytes and self._entries:
+            if self.eviction == "lfu":
+                video_id = min(
+                    self._entries,
+                    key=lambda k: (self._entries[k].hits, self._entries[k].last_used),
+                )
+            else:
+                video_id = next(iter(self._entries))
+            self._drop(video_id, delete=True)
+            self._stats["evictions"] += 1
+
+    def _drop(self, video_id: str, delete: bool = False) -> None:
+        """
+        Forgets a cached track, optionally deleting its file.
+
+        Args:
+            video_id (str): The video ID.
+            delete (bool, optional): Whether to delete the file. Defaults to False.
+        """
+        entry = self._entries.pop(video_id, None)
+        if entry is None:
+            return
+        self.size -= entry.size
+        if delete:
+            try:
+                os.remove(entry.path)
+            except OSError as e:
+                LogHandler.warning(f"Failed to remove cached audio {entry.path}: {e}")
+
+    def remove(self, video_id: str) -> None:
+        """
+        Deletes a track from the cache.
+
+        Args:
+            video_id (str): The video ID.
+        """
+        self._drop(video_id, delete=True)
+
+    def clear(self) -> None:
+        """Deletes every cached track."""
+        for video_id in list(self._entries):
+            self._drop(video_id, delete=True)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        """Dict[str, int]: Cache hits, misses, downloads and evictions, plus the current size."""
+        return {**self._stats, "files": len(self._entries), "bytes": self.size}
+
+    def __contains__(self, video_id: str) -> bool:
+        return video_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -23,13 +23,16 @@
 
 import json
 import sqlite3
+import threading
+from collections import Counter
 from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
 
 import mysql.connector
 from mysql.connector import Error
 
 from . import LogHandler
-from .utils import generate_secret
+from .utils import generate_secret, make_secret
 
 
 class Database:
@@ -40,6 +43,7 @@ class Database:
         db_type (str): The type of database ('sqlite' or 'mysql').
         connection: The database connection object.
         cursor: The database cursor object.
+        _secrets (Dict[str, str]): Maps user IDs to their secrets, loaded when the tables are created and kept in sync on registration.
     """
 
     def __init__(self, db_type, **kwargs):
@@ -53,6 +57,10 @@ class Database:
         self.db_type = db_type
         self.connection = None
         self.cursor = None
+        self._connect_kwargs = kwargs
+        self._maintenance_connection = None
+        self._maintenance_lock = threading.Lock()
+        self._secrets: Dict[str, str] = {}
         if db_type == "sqlite":
             self._connect_sqlite(**kwargs)
         elif db_type == "mysql":
@@ -101,16 +109,76 @@ class Database:
                 "CREATE TABLE IF NOT EXISTS jukebox_secrets (user_id TEXT PRIMARY KEY, secret TEXT);",
                 "CREATE TABLE IF NOT EXISTS jukebox_ytcache (video_id TEXT PRIMARY KEY, metadata TEXT, registered_date TEXT);",
                 "CREATE TABLE IF NOT EXISTS jukebox_replay_history (user_id TEXT, played_at TEXT, song TEXT, FOREIGN KEY (user_id) REFERENCES jukebox_secrets (user_id));",
+                "CREATE TABLE IF NOT EXISTS jukebox_playlist_cache (playlist_id TEXT PRIMARY KEY, title TEXT, video_ids TEXT, registered_date TEXT);",
+                "CREATE TABLE IF NOT EXISTS jukebox_queue_snapshots (guild_id TEXT PRIMARY KEY, snapshot TEXT, updated_at TEXT);",
+                "CREATE TABLE IF NOT EXISTS jukebox_search_cache (query TEXT PRIMARY KEY, video_id TEXT, registered_date TEXT);",
+                "CREATE TABLE IF NOT EXISTS jukebox_replay_rollup (user_id TEXT, video_id TEXT, day TEXT, plays INTEGER, PRIMARY KEY (user_id, video_id, day));",
+                "CREATE INDEX IF NOT EXISTS jukebox_replay_rollup_user_day ON jukebox_replay_rollup (user_id, day);",
+                "CREATE TABLE IF NOT EXISTS jukebox_guild_rollup (guild_id TEXT, video_id TEXT, day TEXT, plays INTEGER, PRIMARY KEY (guild_id, video_id, day));",
+                "CREATE INDEX IF NOT EXISTS jukebox_guild_rollup_guild_day ON jukebox_guild_rollup (guild_id, day);",
             ],
             "mysql": [
                 "CREATE TABLE IF NOT EXISTS jukebox_secrets (user_id VARCHAR(255) PRIMARY KEY, secret TEXT);",
                 "CREATE TABLE IF NOT EXISTS jukebox_ytcache (video_id VARCHAR(255) PRIMARY KEY, metadata TEXT, registered_date VARCHAR(255));",
                 "CREATE TABLE IF NOT EXISTS jukebox_replay_history (user_id VARCHAR(255), played_at VARCHAR(255), song TEXT, FOREIGN KEY (user_id) REFERENCES jukebox_secrets (user_id));",
+                "CREATE TABLE IF NOT EXISTS jukebox_playlist_cache (playlist_id VARCHAR(255) PRIMARY KEY, title TEXT, video_ids MEDIUMTEXT, registered_date VARCHAR(255));",
+                "CREATE TABLE IF NOT EXISTS jukebox_queue_snapshots (guild_id VARCHAR(255) PRIMARY KEY, snapshot MEDIUMTEXT, updated_at VARCHAR(255));",
+                "CREATE TABLE IF NOT EXISTS jukebox_search_cache (query VARCHAR(255) PRIMARY KEY, video_id VARCHAR(255), registered_date VARCHAR(255));",
+                "CREATE TABLE IF NOT EXISTS jukebox_replay_rollup (user_id VARCHAR(255), video_id VARCHAR(255), day VARCHAR(10), plays INT, PRIMARY KEY (user_id, video_id, day), INDEX jukebox_replay_rollup_user_day (user_id, day));",
+                "CREATE TABLE IF NOT EXISTS jukebox_guild_rollup (guild_id VARCHAR(255), video_id VARCHAR(255), day VARCHAR(10), plays INT, PRIMARY KEY (guild_id, video_id, day), INDEX jukebox_guild_rollup_guild_day (guild_id, day));",
             ],
         }
         for query in queries[self.db_type]:
             self.cursor.execute(query)
+        self._add_missing_column(
+            "jukebox_replay_history",
+            "guild_id",
+            {"sqlite": "TEXT", "mysql": "VARCHAR(255)"}[self.db_type],
+        )
+        self._add_missing_column(
+            "jukebox_queue_snapshots",
+            "loop_mode",
+            {"sqlite": "INTEGER", "mysql": "INT"}[self.db_type],
+        )
+        self._add_missing_column(
+            "jukebox_queue_snapshots",
+            "elapsed",
+            {"sqlite": "REAL", "mysql": "DOUBLE"}[self.db_type],
+        )
+        self._add_missing_column(
+            "jukebox_playlist_cache",
+            "reported_length",
+            {"sqlite": "INTEGER", "mysql": "INT"}[self.db_type],
+        )
         self.connection.commit()
+        self._load_secrets()
+
+    def _load_secrets(self):
+        """Loads every registered user's secret into memory."""
+        self.cursor.execute("SELECT user_id, secret FROM jukebox_secrets")
+        self._secrets = {
+            str(user_id): secret for user_id, secret in self.cursor.fetchall()
+        }
+        LogHandler.info(f"Loaded {len(self._secrets)} user secrets")
+
+    def _add_missing_column(self, table: str, column: str, definition: str):
+        """
+        Adds a column to a table created by an older version, if it is missing.
+
+        Args:
+            table (str): The table name.
+            column (str): The column name.
+            definition (str): The column type.
+        """
+        if self.db_type == "sqlite":
+            self.cursor.execute(f"PRAGMA table_info({table})")
+            columns = {row[1] for row in self.cursor.fetchall()}
+        else:
+            self.cursor.execute(f"SHOW COLUMNS FROM {table}")
+            columns = {row[0] for row in self.cursor.fetchall()}
+        if column not in columns:
+            self.cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            LogHandler.info(f"Added column {column} to {table}")
 
     async def register(self, user_id: str) -> str:
         """
@@ -131,6 +199,7 @@ class Database:
             }
             self.cursor.execute(query[self.db_type], (user_id, secret))
             self.connection.commit()
+            self._secrets[str(user_id)] = secret
             LogHandler.info(f"Registered user: {user_id}")
         except Exception as e:
             LogHandler.error(f"Error registering user: {e}")
@@ -139,7 +208,7 @@ class Database:
 
     async def user_exists(self, user_id: str) -> bool:
         """
-        Checks if a user exists in the database.
+        Checks if a user is registered, from the in-memory secrets.
 
         Args:
             user_id (str): The user ID.
@@ -147,20 +216,11 @@ class Database:
         Returns:
             bool: True if the user exists, False otherwise.
         """
-        try:
-            query = {
-                "sqlite": "SELECT EXISTS(SELECT 1 FROM jukebox_secrets WHERE user_id = ?)",
-                "mysql": "SELECT EXISTS(SELECT 1 FROM jukebox_secrets WHERE user_id = %s)",
-            }
-            self.cursor.execute(query[self.db_type], (user_id,))
-            return self.cursor.fetchone()[0] == 1
-        except Exception as e:
-            LogHandler.error(f"Error checking if user exists: {e}")
-            return False
+        return str(user_id) in self._secrets
 
     async def get_user_secret(self, user_id: str) -> str | None:
         """
-        Retrieves the secret for a given user ID.
+        Retrieves the secret for a given user ID, from the in-memory secrets.
 
         Args:
             user_id (str): The user ID.
@@ -168,17 +228,24 @@ class Database:
         Returns:
             str | None: The user's secret if found, None otherwise.
         """
-        try:
-            query = {
-                "sqlite": "SELECT secret FROM jukebox_secrets WHERE user_id = ?",
-                "mysql": "SELECT secret FROM jukebox_secrets WHERE user_id = %s",
-            }
-            self.cursor.execute(query[self.db_type], (user_id,))
-            result = self.cursor.fetchone()
-            return result[0] if result else None
-        except Exception as e:
-            LogHandler.error(f"Error fetching user secret: {e}")
-            raise e
+        return self._secrets.get(str(user_id))
+
+    def get_user_secrets(self, user_ids: Iterable[str]) -> Dict[str, str]:
+        """
+        Retrieves the secrets of several users at once, from the in-memory secrets.
+
+        Args:
+            user_ids (Iterable[str]): The user IDs.
+
+        Returns:
+            Dict[str, str]: The secrets of the registered users, by user ID. Unregistered users are left out.
+        """
+        secrets = self._secrets
+        return {
+            str(user_id): secrets[str(user_id)]
+            for user_id in user_ids
+            if str(user_id) in secrets
+        }
 
     def cache_video_metadata(self, video_id: str, metadata: dict):
         """
@@ -204,6 +271,44 @@ class Database:
             LogHandler.error(f"Error caching video metadata: {e}")
             raise e
 
+    def cache_video_metadata_bulk(self, entries: dict, chunk_size: int = 200):
+        """
+        Caches metadata for multiple videos, committing once per chunk.
+
+        Uses the maintenance connection, so it is safe to call from a worker thread.
+
+        Args:
+            entries (dict): A dictionary with video IDs as keys and metadata as values.
+            chunk_size (int, optional): The number of rows written per transaction. Defaults to 200.
+        """
+        if not entries:
+            return
+        registered_date = datetime.now().isoformat()
+        rows = [
+            (str(video_id), json.dumps(metadata), registered_date)
+            for video_id, metadata in entries.items()
+        ]
+        query = {
+            "sqlite": "INSERT INTO jukebox_ytcache (video_id, metadata, registered_date) VALUES (?, ?, ?) ON CONFLICT(video_id) DO UPDATE SET metadata=excluded.metadata, registered_date=excluded.registered_date;",
+            "mysql": "INSERT INTO jukebox_ytcache (video_id, metadata, registered_date) VALUES (%s, %s, %s) ON DUPLICATE KEY UPDATE metadata=VALUES(metadata), registered_date=VALUES(registered_date);",
+        }
+        with self._maintenance_lock:
+            connection = self._get_maintenance_connection()
+            cursor = connection.cursor()
+            try:
+                for start in range(0, len(rows), chunk_size):
+                    cursor.executemany(
+                        query[self.db_type], rows[start : start + chunk_size]
+                    )
+                    connection.commit()
+                LogHandler.info(f"Cached video metadata for {len(rows)} videos")
+            except Exception as e:
+                connection.rollback()
+                LogHandler.error(f"Error caching bulk video metadata: {e}")
+                raise e
+            finally:
+                cursor.close()
+
     def get_cached_video_metadata(self, video_id: str) -> None | dict:
         """
         Retrieves cached video metadata from the database.
@@ -255,7 +360,214 @@ class Database:
             raise e
         return metadata_dict
 
-    async def add_replay_entry(self, user_id: str, played_at: str, song: str):
+    def cache_playlist(
+        self,
+        playlist_id: str,
+        title: str,
+        video_ids: list,
+        reported_length: Optional[int] = None,
+    ):
+        """
+        Caches the expanded video list of a playlist in the database.
+
+        Args:
+            playlist_id (str): The playlist ID.
+            title (str): The title of the playlist.
+            video_ids (list): The ordered video IDs of the playlist.
+            reported_length (Optional[int], optional): The video count YouTube reported for the playlist. Defaults to None.
+        """
+        try:
+            registered_date = datetime.now().isoformat()
+            query = {
+                "sqlite": "INSERT INTO jukebox_playlist_cache (playlist_id, title, video_ids, registered_date, reported_length) VALUES (?, ?, ?, ?, ?) ON CONFLICT(playlist_id) DO UPDATE SET title=excluded.title, video_ids=excluded.video_ids, registered_date=excluded.registered_date, reported_length=excluded.reported_length;",
+                "mysql": "INSERT INTO jukebox_playlist_cache (playlist_id, title, video_ids, registered_date, reported_length) VALUES (%s, %s, %s, %s, %s) ON DUPLICATE KEY UPDATE title=VALUES(title), video_ids=VALUES(video_ids), registered_date=VALUES(registered_date), reported_length=VALUES(reported_length);",
+            }
+            self.cursor.execute(
+                query[self.db_type],
+                (
+                    playlist_id,
+                    title,
+                    json.dumps(video_ids),
+                    registered_date,
+                    reported_length,
+                ),
+            )
+            self.connection.commit()
+            LogHandler.info(f"Cached playlist {playlist_id} ({len(video_ids)} videos)")
+        except Exception as e:
+            LogHandler.error(f"Error caching playlist: {e}")
+            raise e
+
+    def touch_cached_playlist(self, playlist_id: str):
+        """
+        Resets the cache age of a playlist that did not change.
+
+        Args:
+            playlist_id (str): The playlist ID.
+        """
+        try:
+            query = {
+                "sqlite": "UPDATE jukebox_playlist_cache SET registered_date = ? WHERE playlist_id = ?",
+                "mysql": "UPDATE jukebox_playlist_cache SET registered_date = %s WHERE playlist_id = %s",
+            }
+            self.cursor.execute(
+                query[self.db_type], (datetime.now().isoformat(), playlist_id)
+            )
+            self.connection.commit()
+        except Exception as e:
+            LogHandler.error(f"Error touching cached playlist: {e}")
+            raise e
+
+    def get_cached_playlist(self, playlist_id: str) -> None | dict:
+        """
+        Retrieves a cached playlist from the database.
+
+        Args:
+            playlist_id (str): The playlist ID.
+
+        Returns:
+            None | dict: The title, video IDs, registered date and reported length if found, None otherwise.
+        """
+        try:
+            query = {
+                "sqlite": "SELECT title, video_ids, registered_date, reported_length FROM jukebox_playlist_cache WHERE playlist_id = ?",
+                "mysql": "SELECT title, video_ids, registered_date, reported_length FROM jukebox_playlist_cache WHERE playlist_id = %s",
+            }
+            self.cursor.execute(query[self.db_type], (playlist_id,))
+            result = self.cursor.fetchone()
+            if result:
+                return {
+                    "title": result[0],
+                    "video_ids": json.loads(result[1]),
+                    "registered_date": datetime.fromisoformat(result[2]),
+                    "reported_length": result[3],
+                }
+            return None
+        except Exception as e:
+            LogHandler.error(f"Error fetching cached playlist: {e}")
+            raise e
+
+    def clear_playlist_cache(self):
+        """Clears every cached playlist from the database."""
+        try:
+            self.cursor.execute("DELETE FROM jukebox_playlist_cache")
+            self.connection.commit()
+            LogHandler.info("Cleared playlist cache")
+        except Exception as e:
+            LogHandler.error(f"Error clearing playlist cache: {e}")
+            raise e
+
+    def cache_search_result(self, query: str, video_id: str):
+        """
+        Caches the video a normalised search query resolved to.
+
+        Args:
+            query (str): The normalised search query.
+            video_id (str): The video ID the query resolved to.
+        """
+        try:
+            registered_date = datetime.now().isoformat()
+            query_statement = {
+                "sqlite": "INSERT INTO jukebox_search_cache (query, video_id, registered_date) VALUES (?, ?, ?) ON CONFLICT(query) DO UPDATE SET video_id=excluded.video_id, registered_date=excluded.registered_date;",
+                "mysql": "INSERT INTO jukebox_search_cache (query, video_id, registered_date) VALUES (%s, %s, %s) ON DUPLICATE KEY UPDATE video_id=VALUES(video_id), registered_date=VALUES(registered_date);",
+            }
+            self.cursor.execute(
+                query_statement[self.db_type], (query, video_id, registered_date)
+            )
+            self.connection.commit()
+        except Exception as e:
+            LogHandler.error(f"Error caching search result: {e}")
+            raise e
+
+    def get_cached_search_result(self, query: str) -> None | dict:
+        """
+        Retrieves the cached resolution of a normalised search query.
+
+        Args:
+            query (str): The normalised search query.
+
+        Returns:
+            None | dict: The video ID and registered date if found, None otherwise.
+        """
+        try:
+            query_statement = {
+                "sqlite": "SELECT video_id, registered_date FROM jukebox_search_cache WHERE query = ?",
+                "mysql": "SELECT video_id, registered_date FROM jukebox_search_cache WHERE query = %s",
+            }
+            self.cursor.execute(query_statement[self.db_type], (query,))
+            result = self.cursor.fetchone()
+            if result:
+                return {
+                    "video_id": result[0],
+                    "registered_date": datetime.fromisoformat(result[1]),
+                }
+            return None
+        except Exception as e:
+            LogHandler.error(f"Error fetching cached search result: {e}")
+            raise e
+
+    def delete_search_result(self, query: str):
+        """
+        Deletes the cached resolution of a normalised search query.
+
+        Args:
+            query (str): The normalised search query.
+        """
+        try:
+            query_statement = {
+                "sqlite": "DELETE FROM jukebox_search_cache WHERE query = ?",
+                "mysql": "DELETE FROM jukebox_search_cache WHERE query = %s",
+            }
+            self.cursor.execute(query_statement[self.db_type], (query,))
+            self.connection.commit()
+        except Exception as e:
+            LogHandler.error(f"Error deleting search result: {e}")
+            raise e
+
+    def clear_search_cache(self):
+        """Clears every cached search result from the database."""
+        try:
+            self.cursor.execute("DELETE FROM jukebox_search_cache")
+            self.connection.commit()
+            LogHandler.info("Cleared search cache")
+        except Exception as e:
+            LogHandler.error(f"Error clearing search cache: {e}")
+            raise e
+
+    def clear_old_search_cache(self, days=7) -> int:
+        """
+        Deletes cached search results older than the given age.
+
+        Uses the maintenance connection, so it is safe to call from a worker thread.
+
+        Args:
+            days (int, optional): The age in days after which results expire. Defaults to 7.
+
+        Returns:
+            int: The number of rows deleted.
+        """
+        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
+        query = {
+            "sqlite": "DELETE FROM jukebox_search_cache WHERE registered_date < ?",
+            "mysql": "DELETE FROM jukebox_search_cache WHERE registered_date < %s",
+        }
+        with self._maintenance_lock:
+            connection = self._get_maintenance_connection()
+            cursor = connection.cursor()
+            try:
+                cursor.execute(query[self.db_type], (cutoff_date,))
+                deleted = cursor.rowcount
+                connection.commit()
+                return max(deleted, 0)
+            except Exception as e:
+                LogHandler.error(f"Error clearing old search cache: {e}")
+                raise e
+            finally:
+                cursor.close()
+
+    async def add_replay_entry(
+        self, user_id: str, played_at: str, song: str, guild_id: str | None = None
+    ):
         """
         Adds a replay entry to the database.
 
@@ -263,21 +575,127 @@ class Database:
             user_id (str): The user ID.
             played_at (str): The timestamp when the song was played.
             song (str): The song that was played.
+            guild_id (str | None, optional): The guild the song was played in. Defaults to None.
         """
         if not await self.user_exists(user_id):
             await self.register(user_id)
         try:
             query = {
-                "sqlite": "INSERT INTO jukebox_replay_history (user_id, played_at, song) VALUES (?, ?, ?)",
-                "mysql": "INSERT INTO jukebox_replay_history (user_id, played_at, song) VALUES (%s, %s, %s)",
+                "sqlite": "INSERT INTO jukebox_replay_history (user_id, played_at, song, guild_id) VALUES (?, ?, ?, ?)",
+                "mysql": "INSERT INTO jukebox_replay_history (user_id, played_at, song, guild_id) VALUES (%s, %s, %s, %s)",
             }
-            self.cursor.execute(query[self.db_type], (user_id, played_at, song))
+            self.cursor.execute(
+                query[self.db_type], (user_id, played_at, song, guild_id)
+            )
             self.connection.commit()
             LogHandler.info(f"Added replay entry for {user_id}")
         except Exception as e:
             LogHandler.error(f"Error adding replay entry: {e}")
             raise e
 
+    def add_replay_entries(self, entries: list):
+        """
+        Adds replay entries in one transaction, registering unknown users in bulk and updating the rollups.
+
+        The guild rollup counts listener-plays: a song played to three members
+        adds three plays to its guild, the same as the sum of their user
+        rollups. Counting each play once would need the listeners of a play,
+        which reach the recorder separately, to be matched across flushes.
+
+        Uses the maintenance connection, so it is safe to call from a worker thread.
+
+        Args:
+            entries (list): (user_id, played_at, video_id, guild_id) tuples.
+        """
+        if not entries:
+            return
+        users = {entry[0] for entry in entries}
+        new_secrets = {
+            user_id: make_secret()
+            for user_id in users
+            if str(user_id) not in self._secrets
+        }
+        register_query = {
+            "sqlite": "INSERT INTO jukebox_secrets (user_id, secret) VALUES (?, ?) ON CONFLICT(user_id) DO NOTHING;",
+            "mysql": "INSERT IGNORE INTO jukebox_secrets (user_id, secret) VALUES (%s, %s);",
+        }
+        replay_query = {
+            "sqlite": "INSERT INTO jukebox_replay_history (user_id, played_at, song, guild_id) VALUES (?, ?, ?, ?)",
+            "mysql": "INSERT INTO jukebox_replay_history (user_id, played_at, song, guild_id) VALUES (%s, %s, %s, %s)",
+        }
+        rollup_query = {
+            "sqlite": "INSERT INTO jukebox_replay_rollup (user_id, video_id, day, plays) VALUES (?, ?, ?, ?) ON CONFLICT(user_id, video_id, day) DO UPDATE SET plays = plays + excluded.plays;",
+            "mysql": "INSERT INTO jukebox_replay_rollup (user_id, video_id, day, plays) VALUES (%s, %s, %s, %s) ON DUPLICATE KEY UPDATE plays = plays + VALUES(plays);",
+        }
+        guild_rollup_query = {
+            "sqlite": "INSERT INTO jukebox_guild_rollup (guild_id, video_id, day, plays) VALUES (?, ?, ?, ?) ON CONFLICT(guild_id, video_id, day) DO UPDATE SET plays = plays + excluded.plays;",
+            "mysql": "INSERT INTO jukebox_guild_rollup (guild_id, video_id, day, plays) VALUES (%s, %s, %s, %s) ON DUPLICATE KEY UPDATE plays = plays + VALUES(plays);",
+        }
+        rollup = Counter(
+            (user_id, video_id, played_at[:10])
+            for user_id, played_at, video_id, _ in entries
+        )
+        # One per listener row, see the docstring.
+        guild_rollup = Counter(
+            (guild_id, video_id, played_at[:10])
+            for _, played_at, video_id, guild_id in entries
+            if guild_id is not None
+        )
+        with self._maintenance_lock:
+            connection = self._get_maintenance_connection()
+            cursor = connection.cursor()
+            try:
+                if new_secrets:
+                    cursor.executemany(
+                        register_query[self.db_type], list(new_secrets.items())
+                    )
+                cursor.executemany(replay_query[self.db_type], entries)
+                cursor.executemany(
+                    rollup_query[self.db_type],
+                    [key + (plays,) for key, plays in rollup.items()],
+                )
+                if guild_rollup:
+                    cursor.executemany(
+                        guild_rollup_query[self.db_type],
+                        [key + (plays,) for key, plays in guild_rollup.items()],
+                    )
+                connection.commit()
+                if new_secrets:
+                    self._cache_stored_secrets(cursor, list(new_secrets))
+                LogHandler.info(
+                    f"Added {len(entries)} replay entries for {len(users)} users"
+                )
+            except Exception as e:
+                connection.rollback()
+                LogHandler.error(f"Error adding replay entries: {e}")
+                raise e
+            finally:
+                cursor.close()
+
+    def _cache_stored_secrets(self, cursor, user_ids: list):
+        """
+        Reads the stored secrets of users back into the in-memory secrets.
+
+        Bulk registration skips users registered concurrently, so the secrets that
+        were generated for them are not the stored ones. Users already held in
+        memory keep their entry, which ``register`` sets after its own commit.
+
+        Args:
+            cursor: A cursor of the connection to read with.
+            user_ids (list): The user IDs.
+        """
+        for start in range(0, len(user_ids), 500):
+            chunk = tuple(user_ids[start : start + 500])
+            placeholders = ",".join(
+                ["?" if self.db_type == "sqlite" else "%s"] * len(chunk)
+            )
+            cursor.execute(
+                f"SELECT user_id, secret FROM jukebox_secrets WHERE user_id IN ({placeholders})",
+                chunk,
+            )
+            for user_id, secret in cursor.fetchall():
+                self._secrets.setdefault(str(user_id), secret)
+
     async def get_replay_history(self, user_id: str, cutoff: int = 30) -> list:
         """
         Retrieves the replay history for a user within a specified cutoff period.
@@ -302,22 +720,193 @@ class Database:
             LogHandler.error(f"Error fetching replay history: {e}")
             raise e
 
+    def get_play_counts(self, min_count: int = 1, days: int = 30) -> dict:
+        """
+        Counts the plays of each video within a period.
+
+        Every listener of a play gets its own history entry with the same
+        ``played_at``, so a play is counted once however many listened to it.
+
+        Uses the maintenance connection, so it is safe to call from a worker thread.
+
+        Args:
+            min_count (int, optional): The minimum count for a video to be included. Defaults to 1.
+            days (int, optional): The number of days to look back. Defaults to 30.
+
+        Returns:
+            dict: A dictionary with video IDs as keys and play counts as values.
+        """
+        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
+        query = {
+            "sqlite": "SELECT song, COUNT(DISTINCT played_at) FROM jukebox_replay_history WHERE played_at >= ? GROUP BY song HAVING COUNT(DISTINCT played_at) >= ?",
+            "mysql": "SELECT song, COUNT(DISTINCT played_at) FROM jukebox_replay_history WHERE played_at >= %s GROUP BY song HAVING COUNT(DISTINCT played_at) >= %s",
+        }
+        with self._maintenance_lock:
+            connection = self._get_maintenance_connection()
+            cursor = connection.cursor()
+            try:
+                cursor.execute(query[self.db_type], (cutoff_date, min_count))
+                return {song: count for song, count in cursor.fetchall()}
+            except Exception as e:
+                LogHandler.error(f"Error counting plays: {e}")
+                raise e
+            finally:
+                cursor.close()
+
+    def backfill_replay_rollup(self, force: bool = False) -> int:
+        """
+        Rebuilds the user and guild replay rollups from the raw replay history.
+
+        Each rollup is only rebuilt when it is empty unless forced. Entries
+        recorded before replay entries carried a guild ID are left out of the
+        guild rollup. Uses the maintenance connection, so it is safe to call
+        from a worker thread.
+
+        Args:
+            force (bool, optional): Whether to rebuild rollups that already have rows. Defaults to False.
+
+        Returns:
+            int: The number of rollup rows written.
+        """
+        day = {
+            "sqlite": "substr(played_at, 1, 10)",
+            "mysql": "SUBSTRING(played_at, 1, 10)",
+        }[self.db_type]
+        queries = {
+            "jukebox_replay_rollup": f"INSERT INTO jukebox_replay_rollup (user_id, video_id, day, plays) SELECT user_id, song, {day}, COUNT(*) FROM jukebox_replay_history GROUP BY user_id, song, {day}",
+            "jukebox_guild_rollup": f"INSERT INTO jukebox_guild_rollup (guild_id, video_id, day, plays) SELECT guild_id, song, {day}, COUNT(*) FROM jukebox_replay_history WHERE guild_id IS NOT NULL GROUP BY guild_id, song, {day}",
+        }
+        with self._maintenance_lock:
+            connection = self._get_maintenance_connection()
+            cursor = connection.cursor()
+            try:
+                written = 0
+                for table, query in queries.items():
+                    if not force:
+                        cursor.execute(f"SELECT 1 FROM {table} LIMIT 1")
+                        if cursor.fetchall():
+                            continue
+                    cursor.execute(f"DELETE FROM {table}")
+                    cursor.execute(query)
+                    written += max(cursor.rowcount, 0)
+                connection.commit()
+                if written:
+                    LogHandler.info(f"Backfilled {written} replay rollup rows")
+                return written
+            except Exception as e:
+                connection.rollback()
+                LogHandler.error(f"Error backfilling replay rollup: {e}")
+                raise e
+            finally:
+                cursor.close()
+
+    async def get_replay_summary(
+        self, user_id: str, cutoff: int = 30, limit: int = 10
+    ) -> dict:
+        """
+        Retrieves the most played videos of a user and their total plays within a cutoff period, from the rollup.
+
+        Args:
+            user_id (str): The user ID.
+            cutoff (int, optional): The number of days to look back. Defaults to 30.
+            limit (int, optional): The number of videos to return. Defaults to 10.
+
+        Returns:
+            dict: (video_id, plays) tuples, most played first, under "top", and the total plays under "total".
+        """
+        try:
+            cutoff_day = (datetime.now() - timedelta(days=cutoff)).date().isoformat()
+            top_query = {
+                "sqlite": "SELECT video_id, SUM(plays) AS total FROM jukebox_replay_rollup WHERE user_id = ? AND day >= ? GROUP BY video_id ORDER BY total DESC LIMIT ?",
+                "mysql": "SELECT video_id, SUM(plays) AS total FROM jukebox_replay_rollup WHERE user_id = %s AND day >= %s GROUP BY video_id ORDER BY total DESC LIMIT %s",
+            }
+            total_query = {
+                "sqlite": "SELECT COALESCE(SUM(plays), 0) FROM jukebox_replay_rollup WHERE user_id = ? AND day >= ?",
+                "mysql": "SELECT COALESCE(SUM(plays), 0) FROM jukebox_replay_rollup WHERE user_id = %s AND day >= %s",
+            }
+            self.cursor.execute(top_query[self.db_type], (user_id, cutoff_day, limit))
+            top = [(video_id, int(plays)) for video_id, plays in self.cursor.fetchall()]
+            self.cursor.execute(total_query[self.db_type], (user_id, cutoff_day))
+            return {"top": top, "total": int(self.cursor.fetchone()[0])}
+        except Exception as e:
+            LogHandler.error(f"Error fetching replay summary: {e}")
+            raise e
+
+    async def get_guild_replay_summary(
+        self, guild_id: str, cutoff: int = 30, limit: int = 10
+    ) -> dict:
+        """
+        Retrieves the most played videos of a guild and its total plays within a cutoff period, from the rollup.
+
+        Plays are listener-plays, counted once for every member who heard the song.
+
+        Args:
+            guild_id (str): The guild ID.
+            cutoff (int, optional): The number of days to look back. Defaults to 30.
+            limit (int, optional): The number of videos to return. Defaults to 10.
+
+        Returns:
+            dict: (video_id, plays) tuples, most played first, under "top", and the total plays under "total".
+        """
+        try:
+            cutoff_day = (datetime.now() - timedelta(days=cutoff)).date().isoformat()
+            top_query = {
+                "sqlite": "SELECT video_id, SUM(plays) AS total FROM jukebox_guild_rollup WHERE guild_id = ? AND day >= ? GROUP BY video_id ORDER BY total DESC LIMIT ?",
+                "mysql": "SELECT video_id, SUM(plays) AS total FROM jukebox_guild_rollup WHERE guild_id = %s AND day >= %s GROUP BY video_id ORDER BY total DESC LIMIT %s",
+            }
+            total_query = {
+                "sqlite": "SELECT COALESCE(SUM(plays), 0) FROM jukebox_guild_rollup WHERE guild_id = ? AND day >= ?",
+                "mysql": "SELECT COALESCE(SUM(plays), 0) FROM jukebox_guild_rollup WHERE guild_id = %s AND day >= %s",
+            }
+            self.cursor.execute(top_query[self.db_type], (guild_id, cutoff_day, limit))
+            top = [(video_id, int(plays)) for video_id, plays in self.cursor.fetchall()]
+            self.cursor.execute(total_query[self.db_type], (guild_id, cutoff_day))
+            return {"top": top, "total": int(self.cursor.fetchone()[0])}
+        except Exception as e:
+            LogHandler.error(f"Error fetching guild replay summary: {e}")
+            raise e
+
     def clear_replay_history(self, user_id: str):
         """
-        Clears the replay history for a user.
+        Clears the replay history for a user, removing their plays from the user and guild rollups.
+
+        The guild rollup counts listener-plays, so each of the user's history
+        rows takes one play off its guild.
 
         Args:
             user_id (str): The user ID.
         """
         try:
+            plays_query = {
+                "sqlite": "SELECT guild_id, song, SUBSTR(played_at, 1, 10) AS day, COUNT(*) FROM jukebox_replay_history WHERE user_id = ? AND guild_id IS NOT NULL GROUP BY guild_id, song, day",
+                "mysql": "SELECT guild_id, song, SUBSTRING(played_at, 1, 10) AS day, COUNT(*) FROM jukebox_replay_history WHERE user_id = %s AND guild_id IS NOT NULL GROUP BY guild_id, song, day",
+            }
+            guild_rollup_query = {
+                "sqlite": "UPDATE jukebox_guild_rollup SET plays = plays - ? WHERE guild_id = ? AND video_id = ? AND day = ?",
+                "mysql": "UPDATE jukebox_guild_rollup SET plays = plays - %s WHERE guild_id = %s AND video_id = %s AND day = %s",
+            }
             query = {
                 "sqlite": "DELETE FROM jukebox_replay_history WHERE user_id = ?",
                 "mysql": "DELETE FROM jukebox_replay_history WHERE user_id = %s",
             }
+            rollup_query = {
+                "sqlite": "DELETE FROM jukebox_replay_rollup WHERE user_id = ?",
+                "mysql": "DELETE FROM jukebox_replay_rollup WHERE user_id = %s",
+            }
+            self.cursor.execute(plays_query[self.db_type], (user_id,))
+            guild_plays = [
+                (plays, guild_id, video_id, day)
+                for guild_id, video_id, day, plays in self.cursor.fetchall()
+            ]
+            if guild_plays:
+                self.cursor.executemany(guild_rollup_query[self.db_type], guild_plays)
+                self.cursor.execute("DELETE FROM jukebox_guild_rollup WHERE plays <= 0")
             self.cursor.execute(query[self.db_type], (user_id,))
+            self.cursor.execute(rollup_query[self.db_type], (user_id,))
             self.connection.commit()
             LogHandler.info(f"Cleared replay history for {user_id}")
         except Exception as e:
+            self.connection.rollback()
             LogHandler.error(f"Error clearing replay history: {e}")
             raise e
 
@@ -354,6 +943,208 @@ class Database:
             LogHandler.error(f"Error clearing old cache: {e}")
             raise e
 
+    def _get_maintenance_connection(self):
+        """
+        Returns a dedicated connection for maintenance jobs running in worker threads.
+
+        Returns:
+            The maintenance connection object.
+        """
+        if self._maintenance_connection is None:
+            if self.db_type == "sqlite":
+                self._maintenance_connection = sqlite3.connect(
+                    self._connect_kwargs["db_file"], check_same_thread=False
+                )
+            else:
+                self._maintenance_connection = mysql.connector.connect(
+                    **self._connect_kwargs
+                )
+        return self._maintenance_connection
+
+    def clear_old_cache_batch(self, days=28, batch_size=500) -> int:
+        """
+        Deletes at most one batch of old cached video metadata.
+
+        Uses the maintenance connection, so it is safe to call from a worker thread.
+
+        Args:
+            days (int, optional): The age in days after which entries expire. Defaults to 28.
+            batch_size (int, optional): The maximum number of rows to delete. Defaults to 500.
+
+        Returns:
+            int: The number of rows deleted.
+        """
+        cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
+        query = {
+            "sqlite": "DELETE FROM jukebox_ytcache WHERE video_id IN (SELECT video_id FROM jukebox_ytcache WHERE registered_date < ? LIMIT ?)",
+            "mysql": "DELETE FROM jukebox_ytcache WHERE registered_date < %s LIMIT %s",
+        }
+        with self._maintenance_lock:
+            connection = self._get_maintenance_connection()
+            cursor = connection.cursor()
+            try:
+                cursor.execute(query[self.db_type], (cutoff_date, batch_size))
+                deleted = cursor.rowcount
+                connection.commit()
+                return max(deleted, 0)
+            except Exception as e:
+                LogHandler.error(f"Error clearing old cache batch: {e}")
+                raise e
+            finally:
+                cursor.close()
+
+    def save_queue_snapshots(self, snapshots: dict):
+        """
+        Stores queue snapshots in one transaction.
+
+        The video IDs are stored as JSON, the loop mode and elapsed time in
+        their own columns so :meth:`update_queue_snapshot_states` can change
+        them without rewriting the IDs.
+
+        Uses the maintenance connection, so it is safe to call from a worker thread.
+
+        Args:
+            snapshots (dict): A dictionary with guild IDs as keys and snapshot dictionaries as values.
+        """
+        if not snapshots:
+            return
+        updated_at = datetime.now().isoformat()
+        rows = [
+            (
+                str(guild_id),
+                json.dumps({"ids": snapshot["ids"]}, separators=(",", ":")),
+                snapshot["loop"],
+                snapshot["elapsed"],
+                updated_at,
+            )
+            for guild_id, snapshot in snapshots.items()
+        ]
+        query = {
+            "sqlite": "INSERT INTO jukebox_queue_snapshots (guild_id, snapshot, loop_mode, elapsed, updated_at) VALUES (?, ?, ?, ?, ?) ON CONFLICT(guild_id) DO UPDATE SET snapshot=excluded.snapshot, loop_mode=excluded.loop_mode, elapsed=excluded.elapsed, updated_at=excluded.updated_at;",
+            "mysql": "INSERT INTO jukebox_queue_snapshots (guild_id, snapshot, loop_mode, elapsed, updated_at) VALUES (%s, %s, %s, %s, %s) ON DUPLICATE KEY UPDATE snapshot=VALUES(snapshot), loop_mode=VALUES(loop_mode), elapsed=VALUES(elapsed), updated_at=VALUES(updated_at);",
+        }
+        with self._maintenance_lock:
+            connection = self._get_maintenance_connection()
+            cursor = connection.cursor()
+            try:
+                cursor.executemany(query[self.db_type], rows)
+                connection.commit()
+            except Exception as e:
+                connection.rollback()
+                LogHandler.error(f"Error saving queue snapshots: {e}")
+                raise e
+            finally:
+                cursor.close()
+
+    def update_queue_snapshot_states(self, states: dict):
+        """
+        Updates the loop mode and elapsed time of stored queue snapshots in one transaction, leaving their video IDs untouched.
+
+        Uses the maintenance connection, so it is safe to call from a worker thread.
+
+        Args:
+            states (dict): A dictionary with guild IDs as keys and dictionaries with "loop" and "elapsed" keys as values.
+        """
+        if not states:
+            return
+        updated_at = datetime.now().isoformat()
+        rows = [
+            (state["loop"], state["elapsed"], updated_at, str(guild_id))
+            for guild_id, state in states.items()
+        ]
+        query = {
+            "sqlite": "UPDATE jukebox_queue_snapshots SET loop_mode = ?, elapsed = ?, updated_at = ? WHERE guild_id = ?",
+            "mysql": "UPDATE jukebox_queue_snapshots SET loop_mode = %s, elapsed = %s, updated_at = %s WHERE guild_id = %s",
+        }
+        with self._maintenance_lock:
+            connection = self._get_maintenance_connection()
+            cursor = connection.cursor()
+            try:
+                cursor.executemany(query[self.db_type], rows)
+                connection.commit()
+            except Exception as e:
+                connection.rollback()
+                LogHandler.error(f"Error updating queue snapshot states: {e}")
+                raise e
+            finally:
+                cursor.close()
+
+    def get_queue_snapshot(self, guild_id) -> None | dict:
+        """
+        Retrieves the queue snapshot of a guild.
+
+        Args:
+            guild_id: The guild ID.
+
+        Returns:
+            None | dict: The snapshot, with the time it was stored under "updated_at", if found, None otherwise.
+        """
+        try:
+            query = {
+                "sqlite": "SELECT snapshot, loop_mode, elapsed, updated_at FROM jukebox_queue_snapshots WHERE guild_id = ?",
+                "mysql": "SELECT snapshot, loop_mode, elapsed, updated_at FROM jukebox_queue_snapshots WHERE guild_id = %s",
+            }
+            self.cursor.execute(query[self.db_type], (str(guild_id),))
+            result = self.cursor.fetchone()
+            if result:
+                snapshot = json.loads(result[0])
+                # Rows written before the state columns existed keep it in the JSON.
+                if result[1] is not None:
+                    snapshot["loop"] = result[1]
+                    snapshot["elapsed"] = result[2]
+                snapshot["updated_at"] = datetime.fromisoformat(result[3])
+                return snapshot
+            return None
+        except Exception as e:
+            LogHandler.error(f"Error fetching queue snapshot: {e}")
+            raise e
+
+    def delete_queue_snapshot(self, guild_id):
+        """
+        Deletes the queue snapshot of a guild.
+
+        Args:
+            guild_id: The guild ID.
+        """
+        try:
+            query = {
+                "sqlite": "DELETE FROM jukebox_queue_snapshots WHERE guild_id = ?",
+                "mysql": "DELETE FROM jukebox_queue_snapshots WHERE guild_id = %s",
+            }
+            self.cursor.execute(query[self.db_type], (str(guild_id),))
+            self.connection.commit()
+        except Exception as e:
+            LogHandler.error(f"Error deleting queue snapshot: {e}")
+            raise e
+
+    def delete_queue_snapshots(self, guild_ids):
+        """
+        Deletes the queue snapshots of several guilds in one transaction.
+
+        Uses the maintenance connection, so it is safe to call from a worker thread.
+
+        Args:
+            guild_ids: The guild IDs.
+        """
+        query = {
+            "sqlite": "DELETE FROM jukebox_queue_snapshots WHERE guild_id = ?",
+            "mysql": "DELETE FROM jukebox_queue_snapshots WHERE guild_id = %s",
+        }
+        with self._maintenance_lock:
+            connection = self._get_maintenance_connection()
+            cursor = connection.cursor()
+            try:
+                cursor.executemany(
+                    query[self.db_type], [(str(guild_id),) for guild_id in guild_ids]
+                )
+                connection.commit()
+            except Exception as e:
+                connection.rollback()
+                LogHandler.error(f"Error deleting queue snapshots: {e}")
+                raise e
+            finally:
+                cursor.close()
+
     def run_cleanup(self):
         """Clears old cached video metadata from the database and logs the action."""
         self.clear_old_cache()
@@ -365,3 +1156,5 @@ class Database:
             self.cursor.close()
         if self.connection:
             self.connection.close()
+        if self._maintenance_connection:
+            self._maintenance_connection.close()
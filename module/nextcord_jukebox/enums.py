@@ -38,3 +38,19 @@ class LOOPMODE(Enum):
     off = 1
     single = 2
     all = 3
+
+
+@unique
+class AUDIOMODE(Enum):
+    """
+    Enum representing the audio pipelines a music player can stream through.
+
+    Attributes:
+        passthrough (int): Send the source Opus packets as-is, without decoding or volume processing.
+        gain (int): Apply a fixed gain inside FFmpeg and let FFmpeg encode Opus directly.
+        loudnorm (int): Apply live loudness normalisation inside FFmpeg.
+    """
+
+    passthrough = 1
+    gain = 2
+    loudnorm = 3
@@ -21,7 +21,10 @@
 #  ------------------------------------------------------------
 #
 
+import asyncio
 import inspect
+import time
+from typing import Callable, Dict, List, Set, Tuple
 
 from . import LogHandler
 
@@ -30,13 +33,26 @@ class EventManager:
     """
     A class for managing event listeners and dispatching events to attached cog instances.
 
+    The listeners each attached instance receives are resolved once, when a cog
+    is attached or a listener is registered, into a dispatch table keyed by event
+    name. Firing an event runs all of its listeners concurrently. A listener that
+    raises or exceeds ``listener_timeout`` is logged and does not affect the
+    others.
+
     Attributes:
         _event_listeners (dict): A dictionary of event listeners keyed by event names.
         _cog_instances (list): A list of attached cog instances.
+        _dispatch (dict): The (instance, listener) pairs to call, keyed by event names.
+        _metrics (dict): Latency and failure counters keyed by event and listener names.
+        listener_timeout (float): Seconds a coroutine listener may run before it is cancelled.
     """
 
-    _event_listeners = {}
-    _cog_instances = []
+    _event_listeners: Dict[str, List[Callable]] = {}
+    _cog_instances: List = []
+    _dispatch: Dict[str, List[Tuple[object, Callable]]] = {}
+    _metrics: Dict[str, dict] = {}
+    _tasks: Set[asyncio.Task] = set()
+    listener_timeout: float = 10.0
 
     @classmethod
     def listener(cls, func):
@@ -53,6 +69,7 @@ class EventManager:
         if event_name not in cls._event_listeners:
             cls._event_listeners[event_name] = []
         cls._event_listeners[event_name].append(func)
+        cls._rebuild(event_name)
         LogHandler.info(f"Started Listening on function {event_name}")
         return func
 
@@ -66,12 +83,104 @@ class EventManager:
         """
         cog_name = cog_instance.__class__.__name__
         cls._cog_instances.append(cog_instance)
+        for event_name in cls._event_listeners:
+            cls._rebuild(event_name)
         LogHandler.info(f"Attached cog {cog_name}")
 
+    @classmethod
+    def detach(cls, cog_instance):
+        """
+        Detaches a cog instance from the EventManager.
+
+        Args:
+            cog_instance: The cog instance to detach.
+        """
+        if cog_instance in cls._cog_instances:
+            cls._cog_instances.remove(cog_instance)
+            for event_name in cls._event_listeners:
+                cls._rebuild(event_name)
+            LogHandler.info(f"Detached cog {cog_instance.__class__.__name__}")
+
+    @classmethod
+    def _rebuild(cls, event_name: str) -> None:
+        """
+        Recomputes the dispatch table of an event.
+
+        A listener belongs to the instances whose class has the name the listener
+        was defined in.
+
+        Args:
+            event_name (str): The name of the event.
+        """
+        cls._dispatch[event_name] = [
+            (instance, listener)
+            for instance in cls._cog_instances
+            for listener in cls._event_listeners.get(event_name, [])
+            if instance.__class__.__name__ == listener.__qualname__.split(".")[0]
+        ]
+
+    @classmethod
+    def _record(cls, key: str, elapsed: float, outcome: str = "ok") -> None:
+        """
+        Adds a measurement to the metrics of an event or listener.
+
+        Args:
+            key (str): The event or listener name.
+            elapsed (float): The time taken in seconds.
+            outcome (str, optional): "ok", "error" or "timeout". Defaults to "ok".
+        """
+        metric = cls._metrics.get(key)
+        if metric is None:
+            metric = cls._metrics[key] = {
+                "count": 0,
+                "total_time": 0.0,
+                "max_time": 0.0,
+                "errors": 0,
+                "timeouts": 0,
+            }
+        metric["count"] += 1
+        metric["total_time"] += elapsed
+        metric["max_time"] = max(metric["max_time"], elapsed)
+        if outcome == "error":
+            metric["errors"] += 1
+        elif outcome == "timeout":
+            metric["timeouts"] += 1
+
+    @classmethod
+    async def _invoke(cls, instance, listener: Callable, args, kwargs) -> None:
+        """
+        Calls one listener, isolating its failures and enforcing the timeout.
+
+        Args:
+            instance: The instance the listener is bound to.
+            listener (Callable): The listener function.
+            args: Positional arguments to pass to the listener.
+            kwargs: Keyword arguments to pass to the listener.
+        """
+        name = listener.__qualname__
+        outcome = "ok"
+        timer = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(listener):
+                await asyncio.wait_for(
+                    listener(instance, *args, **kwargs), cls.listener_timeout
+                )
+            else:
+                listener(instance, *args, **kwargs)
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            LogHandler.warning(
+                f"Listener {name} timed out after {cls.listener_timeout}s"
+            )
+        except Exception as e:
+            outcome = "error"
+            LogHandler.error(f"Listener {name} failed: {type(e).__name__}: {e}")
+        cls._record(name, time.perf_counter() - timer, outcome)
+
     @classmethod
     async def fire(cls, event_name, *args, **kwargs):
         """
-        Fires an event, calling all registered listeners for the event.
+        Fires an event, calling all registered listeners for the event concurrently.
 
         Args:
             event_name (str): The name of the event to fire.
@@ -79,14 +188,53 @@ class EventManager:
             **kwargs: Keyword arguments to pass to the event listeners.
         """
         LogHandler.info(f"Fired {event_name}")
-        for instance in cls._cog_instances:
-            if event_name in cls._event_listeners:
-                for listener in cls._event_listeners[event_name]:
-                    if (
-                        instance.__class__.__name__
-                        == listener.__qualname__.split(".")[0]
-                    ):
-                        if inspect.iscoroutinefunction(listener):
-                            await listener(instance, *args, **kwargs)
-                        else:
-                            listener(instance, *args, **kwargs)
+        targets = cls._dispatch.get(event_name)
+        if not targets:
+            return
+        timer = time.perf_counter()
+        if len(targets) == 1:
+            await cls._invoke(targets[0][0], targets[0][1], args, kwargs)
+        else:
+            await asyncio.gather(
+                *(
+                    cls._invoke(instance, listener, args, kwargs)
+                    for instance, listener in targets
+                )
+            )
+        cls._record(event_name, time.perf_counter() - timer)
+
+    @classmethod
+    def fire_nowait(cls, event_name, *args, **kwargs) -> asyncio.Task:
+        """
+        Fires an event in a background task, so the caller does not wait for the listeners.
+
+        Args:
+            event_name (str): The name of the event to fire.
+            *args: Positional arguments to pass to the event listeners.
+            **kwargs: Keyword arguments to pass to the event listeners.
+
+        Returns:
+            asyncio.Task: The task running the listeners.
+        """
+        task = asyncio.get_running_loop().create_task(
+            cls.fire(event_name, *args, **kwargs)
+        )
+        cls._tasks.add(task)
+        task.add_done_callback(cls._tasks.discard)
+        return task
+
+    @classmethod
+    def metrics(cls) -> Dict[str, dict]:
+        """
+        Returns the latency metrics of every event and listener.
+
+        Returns:
+            Dict[str, dict]: The count, average and maximum time in seconds, errors and timeouts, keyed by event or listener name.
+        """
+        return {
+            key: {
+                **metric,
+                "avg_time": metric["total_time"] / metric["count"],
+            }
+            for key, metric in cls._metrics.items()
+        }
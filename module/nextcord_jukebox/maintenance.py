@@ -0,0 +1,266 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+from . import LogHandler
+
+
+class CacheJanitor:
+    """
+    Periodically expires old rows from the jukebox_ytcache table in the background.
+
+    Deletions run in bounded batches in a worker thread, so the event loop never
+    waits on the database and a large backlog of expired rows cannot hold a lock
+    for long.
+
+    Attributes:
+        database: The database instance to clean up.
+        interval (float): Seconds between cleanup runs.
+        expire_days (int): The age in days after which cache entries expire.
+        batch_size (int): The maximum number of rows deleted per batch.
+        max_batches (int): The maximum number of batches per run.
+        search_expire_days (Optional[float]): The age in days after which cached search results expire.
+        metadata_cache (Optional[MetadataCache]): The in-memory metadata cache whose expired failures are pruned.
+        stats (dict): Metrics about the cleanup runs.
+    """
+
+    def __init__(
+        self,
+        database,
+        interval: float = 3600,
+        expire_days: int = 28,
+        batch_size: int = 500,
+        max_batches: int = 20,
+        search_expire_days: Optional[float] = None,
+        metadata_cache=None,
+    ) -> None:
+        """
+        Initializes the CacheJanitor.
+
+        Args:
+            database: The database instance to clean up.
+            interval (float, optional): Seconds between cleanup runs. Defaults to 3600.
+            expire_days (int, optional): The age in days after which cache entries expire. Defaults to 28.
+            batch_size (int, optional): The maximum number of rows deleted per batch. Defaults to 500.
+            max_batches (int, optional): The maximum number of batches per run. Defaults to 20.
+            search_expire_days (Optional[float], optional): The age in days after which cached search results expire. Defaults to None, which keeps them.
+            metadata_cache (Optional[MetadataCache], optional): The in-memory metadata cache whose expired failures are pruned. Defaults to None.
+        """
+        self.database = database
+        self.metadata_cache = metadata_cache
+        self.search_expire_days = search_expire_days
+        self.interval = interval
+        self.expire_days = expire_days
+        self.batch_size = batch_size
+        self.max_batches = max_batches
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "runs": 0,
+            "batches": 0,
+            "rows_deleted": 0,
+            "errors": 0,
+            "last_run_at": None,
+            "last_run_duration": 0.0,
+            "last_run_deleted": 0,
+            "last_error": None,
+        }
+
+    @property
+    def running(self) -> bool:
+        """bool: Whether the background task is running."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Starts the background task on the running event loop if it is not running yet."""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+            LogHandler.info(
+                f"Cache janitor started (interval: {self.interval}s, expire: {self.expire_days}d)"
+            )
+
+    def stop(self) -> None:
+        """Cancels the background task."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def run_once(self) -> int:
+        """
+        Expires old cache rows in bounded batches until none are left or the batch limit is hit.
+
+        Returns:
+            int: The number of rows deleted in this run.
+        """
+        timer = time.time()
+        deleted = 0
+        try:
+            for _ in range(self.max_batches):
+                batch_deleted = await asyncio.to_thread(
+                    self.database.clear_old_cache_batch,
+                    self.expire_days,
+                    self.batch_size,
+                )
+                self.stats["batches"] += 1
+                deleted += batch_deleted
+                if batch_deleted < self.batch_size:
+                    break
+                await asyncio.sleep(0)
+            if self.search_expire_days is not None:
+                deleted += await asyncio.to_thread(
+                    self.database.clear_old_search_cache, self.search_expire_days
+                )
+            if self.metadata_cache is not None:
+                self.metadata_cache.prune_failures()
+        except Exception as e:
+            self.stats["errors"] += 1
+            self.stats["last_error"] = f"{type(e).__name__}: {e}"
+            LogHandler.error(f"Cache janitor run failed: {e}")
+
+        self.stats["runs"] += 1
+        self.stats["rows_deleted"] += deleted
+        self.stats["last_run_at"] = timer
+        self.stats["last_run_duration"] = time.time() - timer
+        self.stats["last_run_deleted"] = deleted
+        if deleted:
+            LogHandler.info(f"Cache janitor expired {deleted} cache entries.")
+        return deleted
+
+    async def _run(self) -> None:
+        """Runs the cleanup loop until cancelled."""
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval)
+
+
+class PlayerReaper:
+    """
+    Periodically removes players that are idle or lost their voice connection.
+
+    A player is idle when it has not been playing, and no command has touched it,
+    for ``idle_timeout`` seconds. A player without a connected voice client is
+    removed once it has stayed disconnected for ``disconnect_grace`` seconds, which
+    leaves time for the automatic reconnect.
+
+    Attributes:
+        manager (PlayerManager): The manager whose players are reaped.
+        interval (float): Seconds between runs.
+        idle_timeout (float): Seconds of inactivity after which a player is removed.
+        disconnect_grace (float): Seconds a player may stay disconnected before it is removed.
+        stats (dict): Metrics about the reaped players.
+    """
+
+    def __init__(
+        self,
+        manager,
+        interval: float = 60,
+        idle_timeout: float = 900,
+        disconnect_grace: float = 120,
+    ) -> None:
+        """
+        Initializes the PlayerReaper.
+
+        Args:
+            manager (PlayerManager): The manager whose players are reaped.
+            interval (float, optional): Seconds between runs. Defaults to 60.
+            idle_timeout (float, optional): Seconds of inactivity after which a player is removed. Defaults to 900.
+            disconnect_grace (float, optional): Seconds a player may stay disconnected before it is removed. Defaults to 120.
+        """
+        self.manager = manager
+        self.interval = interval
+        self.idle_timeout = idle_timeout
+        self.disconnect_grace = disconnect_grace
+        self._disconnected_since: Dict[int, float] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "runs": 0,
+            "reaped": 0,
+            "reaped_idle": 0,
+            "reaped_disconnected": 0,
+            "errors": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        """bool: Whether the background task is running."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Starts the background task on the running event loop if it is not running yet."""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        """Cancels the background task."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def run_once(self) -> int:
+        """
+        Removes every player that is idle or has been disconnected for too long.
+
+        Returns:
+            int: The number of players removed in this run.
+        """
+        now = time.monotonic()
+        reaped = 0
+        for guild_id, player in list(self.manager.players.items()):
+            reason = None
+            if not player.connected:
+                since = self._disconnected_since.setdefault(guild_id, now)
+                if now - since >= self.disconnect_grace:
+                    reason = "disconnected"
+            else:
+                self._disconnected_since.pop(guild_id, None)
+                if player.idle_for >= self.idle_timeout:
+                    reason = "idle"
+
+            if reason is None:
+                continue
+            try:
+                if await self.manager.remove_player_by_guild_id(guild_id):
+                    reaped += 1
+                    self.stats[f"reaped_{reason}"] += 1
+                    LogHandler.info(f"Reaped {reason} player of guild {guild_id}")
+            except Exception as e:
+                self.stats["errors"] += 1
+                LogHandler.error(f"Failed to reap player of guild {guild_id}: {e}")
+            finally:
+                self._disconnected_since.pop(guild_id, None)
+
+        for guild_id in list(self._disconnected_since):
+            if guild_id not in self.manager.players:
+                del self._disconnected_since[guild_id]
+
+        self.stats["runs"] += 1
+        self.stats["reaped"] += reaped
+        return reaped
+
+    async def _run(self) -> None:
+        """Runs the reaper loop until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.run_once()
@@ -0,0 +1,253 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+from . import LogHandler
+
+
+class MetadataCache:
+    """
+    An in-memory LRU of decoded video metadata in front of the jukebox_ytcache table.
+
+    Lookups check memory first and only fall back to the database for the
+    remainder. Video IDs that failed to resolve are remembered for a short time,
+    so private or removed videos are not retried against YouTube on every queue;
+    at most ``max_size`` of them are kept, and expired ones are pruned by the
+    cache janitor.
+    Writes can be buffered and flushed to the database in bulk. Every write runs
+    in a worker thread, so the event loop never waits on the database.
+
+    Attributes:
+        database: The database instance backing the cache.
+        max_size (int): The maximum number of metadata entries kept in memory.
+        negative_ttl (float): Seconds a failed video ID stays negatively cached.
+        flush_threshold (int): The number of buffered writes that triggers a flush.
+        stats (dict): Hit and miss counters for the cache.
+    """
+
+    def __init__(
+        self,
+        database,
+        max_size: int = 2048,
+        negative_ttl: float = 300,
+        flush_threshold: int = 50,
+    ):
+        """
+        Initializes the MetadataCache.
+
+        Args:
+            database: The database instance backing the cache.
+            max_size (int, optional): The maximum number of metadata entries kept in memory. Defaults to 2048.
+            negative_ttl (float, optional): Seconds a failed video ID stays negatively cached. Defaults to 300.
+            flush_threshold (int, optional): The number of buffered writes that triggers a flush. Defaults to 50.
+        """
+        self.database = database
+        self.max_size = max_size
+        self.negative_ttl = negative_ttl
+        self.flush_threshold = flush_threshold
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self._failures: OrderedDict[str, float] = OrderedDict()
+        self._pending: Dict[str, dict] = {}
+        self.stats = {
+            "memory_hits": 0,
+            "database_hits": 0,
+            "misses": 0,
+            "negative_hits": 0,
+            "evictions": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _remember(self, video_id: str, metadata: dict) -> None:
+        """
+        Stores metadata in memory, evicting the least recently used entries if needed.
+
+        Args:
+            video_id (str): The video ID.
+            metadata (dict): The decoded metadata.
+        """
+        self._entries[video_id] = metadata
+        self._entries.move_to_end(video_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get(self, video_id: str) -> Optional[dict]:
+        """
+        Retrieves metadata for a video from memory or the database.
+
+        Args:
+            video_id (str): The video ID.
+
+        Returns:
+            Optional[dict]: The metadata if cached, None otherwise.
+        """
+        metadata = self._entries.get(video_id)
+        if metadata is not None:
+            self._entries.move_to_end(video_id)
+            self.stats["memory_hits"] += 1
+            return metadata
+
+        metadata = self.database.get_cached_video_metadata(video_id)
+        if metadata is None:
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["database_hits"] += 1
+        self._remember(video_id, metadata)
+        return metadata
+
+    def get_bulk(self, video_ids: Iterable[str]) -> Dict[str, dict]:
+        """
+        Retrieves metadata for multiple videos, querying the database only for IDs not held in memory.
+
+        Args:
+            video_ids (Iterable[str]): The video IDs.
+
+        Returns:
+            Dict[str, dict]: A dictionary with video IDs as keys and metadata as values.
+        """
+        found = {}
+        remaining = []
+        for video_id in dict.fromkeys(video_ids):
+            metadata = self._entries.get(video_id)
+            if metadata is not None:
+                self._entries.move_to_end(video_id)
+                found[video_id] = metadata
+            else:
+                remaining.append(video_id)
+        self.stats["memory_hits"] += len(found)
+
+        if remaining:
+            loaded = self.database.get_bulk_video_metadata(remaining)
+            for video_id, metadata in loaded.items():
+                self._remember(video_id, metadata)
+            found.update(loaded)
+            self.stats["database_hits"] += len(loaded)
+            self.stats["misses"] += len(remaining) - len(loaded)
+
+        return found
+
+    async def put(self, video_id: str, metadata: dict, buffered: bool = False) -> None:
+        """
+        Stores metadata in memory and writes it to the database.
+
+        Args:
+            video_id (str): The video ID.
+            metadata (dict): The metadata to cache.
+            buffered (bool, optional): Whether to buffer the database write until the next flush. Defaults to False.
+        """
+        self._failures.pop(video_id, None)
+        self._remember(video_id, metadata)
+        if buffered:
+            self._pending[video_id] = metadata
+            if len(self._pending) >= self.flush_threshold:
+                await self.flush()
+        else:
+            await asyncio.to_thread(
+                self.database.cache_video_metadata_bulk, {video_id: metadata}
+            )
+
+    @property
+    def pending(self) -> int:
+        """int: The number of buffered writes not yet flushed to the database."""
+        return len(self._pending)
+
+    async def flush(self) -> None:
+        """Writes every buffered entry to the database in bulk from a worker thread."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        await asyncio.to_thread(self.database.cache_video_metadata_bulk, pending)
+
+    def mark_failed(self, video_id: str) -> None:
+        """
+        Negatively caches a video ID that failed to resolve.
+
+        Args:
+            video_id (str): The video ID.
+        """
+        self._failures.pop(video_id, None)
+        self._failures[video_id] = time.monotonic() + self.negative_ttl
+        while len(self._failures) > self.max_size:
+            self._failures.popitem(last=False)
+        LogHandler.debug(f"Negatively cached {video_id} for {self.negative_ttl}s")
+
+    def is_failed(self, video_id: str) -> bool:
+        """
+        Checks whether a video ID is negatively cached.
+
+        Args:
+            video_id (str): The video ID.
+
+        Returns:
+            bool: True if the video recently failed to resolve, False otherwise.
+        """
+        expires_at = self._failures.get(video_id)
+        if expires_at is None:
+            return False
+        if expires_at <= time.monotonic():
+            del self._failures[video_id]
+            return False
+        self.stats["negative_hits"] += 1
+        return True
+
+    def prune_failures(self) -> int:
+        """
+        Drops the negatively cached video IDs that have expired.
+
+        Failures are kept in the order they expire in, so only the oldest are checked.
+
+        Returns:
+            int: The number of entries dropped.
+        """
+        now = time.monotonic()
+        pruned = 0
+        while self._failures:
+            video_id, expires_at = next(iter(self._failures.items()))
+            if expires_at > now:
+                break
+            del self._failures[video_id]
+            pruned += 1
+        return pruned
+
+    def invalidate(self, video_id: str) -> None:
+        """
+        Drops a video from the in-memory tiers.
+
+        Args:
+            video_id (str): The video ID.
+        """
+        self._entries.pop(video_id, None)
+        self._failures.pop(video_id, None)
+
+    def clear(self) -> None:
+        """Drops every entry from the in-memory tiers, discarding buffered writes."""
+        self._pending.clear()
+        self._entries.clear()
+        self._failures.clear()
@@ -0,0 +1,331 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from meta_yt import Video, YouTube
+
+from . import LogHandler
+from .exceptions import InvalidVideo, NoQueryResult
+
+
+class MetadataProvider(ABC):
+    """
+    Resolves video metadata and text searches. Blocking, meant for executor threads.
+
+    Metadata is returned in the dictionary layout the metadata cache stores and
+    Song accepts.
+
+    Attributes:
+        name (str): The name of the backend.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def fetch(self, video_id: str) -> dict:
+        """
+        Fetches the metadata of a video.
+
+        Args:
+            video_id (str): The video ID.
+
+        Returns:
+            dict: The video metadata.
+
+        Raises:
+            InvalidVideo: If the video cannot be resolved.
+        """
+
+    @abstractmethod
+    def search(self, query: str) -> Tuple[str, Optional[str]]:
+        """
+        Resolves a text query to its first video result.
+
+        Args:
+            query (str): The text query.
+
+        Returns:
+            Tuple[str, Optional[str]]: The video URL and its title.
+
+        Raises:
+            NoQueryResult: If the query has no result.
+        """
+
+    def stats(self) -> dict:
+        """dict: The backend statistics, empty unless the backend tracks any."""
+        return {}
+
+
+class MetaYTProvider(MetadataProvider):
+    """
+    Resolves metadata by scraping the watch page with meta_yt.
+    """
+
+    name = "meta_yt"
+
+    def fetch(self, video_id: str) -> dict:
+        video = Video(str(video_id))
+        return {
+            "url": video.url,
+            "title": video.title,
+            "views": video.views,
+            "duration": video.duration,
+            "thumbnail": video.thumbnail,
+            "channel": video.channel,
+            "channel_url": video.channel_url,
+            "thumbnails": video.thumbnails,
+        }
+
+    def search(self, query: str) -> Tuple[str, Optional[str]]:
+        yt = YouTube(query)
+        if yt.video is None or not yt.video.url:
+            raise NoQueryResult
+        return yt.video.url, yt.video.title
+
+
+class YTDLPProvider(MetadataProvider):
+    """
+    Resolves metadata with yt-dlp without selecting a stream format, and searches with flat results.
+
+    Attributes:
+        pool (YTDLPool): The pool of YoutubeDL instances to extract with.
+    """
+
+    name = "ytdlp"
+
+    def __init__(self, pool) -> None:
+        """
+        Initializes the YTDLPProvider.
+
+        Args:
+            pool (YTDLPool): The pool of YoutubeDL instances to extract with.
+        """
+        self.pool = pool
+
+    def fetch(self, video_id: str) -> dict:
+        info = self.pool.extract_info(
+            f"https://www.youtube.com/watch?v={video_id}",
+            download=False,
+            process=False,
+        )
+        if not info:
+            raise InvalidVideo
+        return {
+            "url": f"https://www.youtube.com/watch?v={info.get('id') or video_id}",
+            "title": info.get("title"),
+            "views": info.get("view_count"),
+            "duration": info.get("duration"),
+            "thumbnail": info.get("thumbnail"),
+            "channel": info.get("channel") or info.get("uploader"),
+            "channel_url": info.get("channel_url") or info.get("uploader_url"),
+            "thumbnails": [
+                {
+                    "url": thumbnail["url"],
+                    "width": thumbnail["width"],
+                    "height": thumbnail["height"],
+                }
+                for thumbnail in info.get("thumbnails") or []
+                if thumbnail.get("url")
+                and thumbnail.get("width")
+                and thumbnail.get("height")
+            ],
+        }
+
+    def search(self, query: str) -> Tuple[str, Optional[str]]:
+        info = self.pool.extract_info(f"ytsearch1:{query}", download=False)
+        entries = [entry for entry in (info or {}).get("entries") or [] if entry]
+        if not entries or not entries[0].get("id"):
+            raise NoQueryResult
+        return (
+            f"https://www.youtube.com/watch?v={entries[0]['id']}",
+            entries[0].get("title"),
+        )
+
+
+class AdaptiveProvider(MetadataProvider):
+    """
+    Routes each request to the fastest healthy backend, falling back to the others on failure.
+
+    Each backend keeps a rolling window of its latency and outcome. A backend is
+    healthy while its error rate in the window stays below ``max_error_rate``.
+    Every ``explore_every`` requests, the lowest ranked backend is tried first,
+    so a slow or failing backend gets the chance to show it has recovered.
+
+    Attributes:
+        providers (List[MetadataProvider]): The backends, in order of preference before any sample exists.
+        window (int): The number of recent requests kept per backend.
+        max_error_rate (float): The error rate above which a backend is skipped.
+        explore_every (int): The number of requests between explorations.
+    """
+
+    name = "adaptive"
+
+    def __init__(
+        self,
+        providers: List[MetadataProvider],
+        window: int = 50,
+        max_error_rate: float = 0.5,
+        explore_every: int = 20,
+    ) -> None:
+        """
+        Initializes the AdaptiveProvider.
+
+        Args:
+            providers (List[MetadataProvider]): The backends to route between.
+            window (int, optional): The number of recent requests kept per backend. Defaults to 50.
+            max_error_rate (float, optional): The error rate above which a backend is skipped. Defaults to 0.5.
+            explore_every (int, optional): The number of requests between explorations. Defaults to 20.
+
+        Raises:
+            ValueError: If no backend is given.
+        """
+        if not providers:
+            raise ValueError("At least one metadata provider is required")
+
+        self.providers = providers
+        self.window = window
+        self.max_error_rate = max_error_rate
+        self.explore_every = explore_every
+
+        self._samples: Dict[str, Deque[Tuple[float, bool]]] = {
+            provider.name: deque(maxlen=window) for provider in providers
+        }
+        self._requests = 0
+        self._lock = threading.Lock()
+
+    def _error_rate(self, name: str) -> float:
+        samples = self._samples[name]
+        if not samples:
+            return 0.0
+        return sum(1 for _, ok in samples if not ok) / len(samples)
+
+    def _latency(self, name: str) -> float:
+        latencies = [latency for latency, ok in self._samples[name] if ok]
+        if not latencies:
+            return 0.0 if not self._samples[name] else float("inf")
+        return sum(latencies) / len(latencies)
+
+    def _ranked(self) -> List[MetadataProvider]:
+        """
+        Orders the backends for a request.
+
+        Returns:
+            List[MetadataProvider]: The backends, the one to try first at the front.
+        """
+        with self._lock:
+            self._requests += 1
+            ranked = sorted(
+                self.providers,
+                key=lambda provider: (
+                    self._error_rate(provider.name) > self.max_error_rate,
+                    self._latency(provider.name),
+                ),
+            )
+            if self._requests % self.explore_every == 0:
+                return ranked[-1:] + ranked[:-1]
+            return ranked
+
+    def _record(self, name: str, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._samples[name].append((latency, ok))
+
+    def _call(self, method: str, argument: str):
+        """
+        Calls a method on the ranked backends until one succeeds.
+
+        Args:
+            method (str): "fetch" or "search".
+            argument (str): The video ID or query.
+
+        Returns:
+            The result of the first backend that succeeds.
+
+        Raises:
+            Exception: The error of the last backend if every backend failed.
+        """
+        error = None
+        for provider in self._ranked():
+            timer = time.perf_counter()
+            try:
+                result = getattr(provider, method)(argument)
+            except Exception as e:
+                self._record(provider.name, time.perf_counter() - timer, False)
+                LogHandler.warning(
+                    f"Metadata backend {provider.name} failed to {method} {argument}: {e}"
+                )
+                error = e
+                continue
+            self._record(provider.name, time.perf_counter() - timer, True)
+            return result
+        raise error
+
+    def fetch(self, video_id: str) -> dict:
+        return self._call("fetch", video_id)
+
+    def search(self, query: str) -> Tuple[str, Optional[str]]:
+        return self._call("search", query)
+
+    def stats(self) -> dict:
+        """
+        Reports the rolling latency and error rate of each backend.
+
+        Returns:
+            dict: The sample count, mean latency in seconds and error rate per backend name.
+        """
+        with self._lock:
+            return {
+                provider.name: {
+                    "samples": len(self._samples[provider.name]),
+                    "latency": round(self._latency(provider.name), 3),
+                    "error_rate": round(self._error_rate(provider.name), 3),
+                }
+                for provider in self.providers
+            }
+
+
+def create_metadata_provider(backend: str, pool) -> MetadataProvider:
+    """
+    Creates the metadata provider for a backend name.
+
+    Args:
+        backend (str): "meta_yt", "ytdlp" or "adaptive".
+        pool (YTDLPool): The pool of YoutubeDL instances for the yt-dlp backend.
+
+    Returns:
+        MetadataProvider: The provider.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if backend == "meta_yt":
+        return MetaYTProvider()
+    if backend == "ytdlp":
+        return YTDLPProvider(pool)
+    if backend == "adaptive":
+        return AdaptiveProvider([MetaYTProvider(), YTDLPProvider(pool)])
+    raise ValueError(f"Unknown metadata backend: {backend}")
@@ -24,39 +24,29 @@
 import asyncio
 import datetime
 import random
+import sys
 import time
 from typing import Callable, Optional, Union
 from urllib import parse
 
-import yt_dlp
-from meta_yt import Video, YouTube
-from nextcord import FFmpegPCMAudio, Interaction, PCMVolumeTransformer
-from pytube import Playlist
+from nextcord import (
+    AudioSource,
+    FFmpegOpusAudio,
+    FFmpegPCMAudio,
+    Interaction,
+    PCMVolumeTransformer,
+)
 from termcolor import colored
 
 from . import LogHandler
-from .enums import LOOPMODE
+from .enums import AUDIOMODE, LOOPMODE
 from .event_manager import EventManager
 from .exceptions import *
+from .music_queue import MusicQueue
+from .queue import QueueHydrator
 from .song import Song
 from .utils import get_video_id
 
-yt_dlp.utils.bug_reports_message = lambda *args, **kwargs: ""
-ytdlp = yt_dlp.YoutubeDL(
-    {
-        "format": "bestaudio/best",
-        "noplaylist": True,
-        "ignoreerrors": True,
-        "quiet": True,
-        "no_warnings": True,
-        "source_address": "0.0.0.0",
-        "forceip": "4",
-        "skip_download": True,
-        "extract_flat": True,
-        "default_search": "auto",
-    }
-)
-
 
 class MusicPlayer:
     """
@@ -74,12 +64,19 @@ class MusicPlayer:
         leave_when_empty (bool): Whether to leave the voice channel when the queue is empty.
         manager (PlayerManager): The player manager instance managing this player.
         database: The database instance for caching video metadata.
-        music_queue (list): The queue of songs to play.
+        metadata_cache (MetadataCache): The in-memory metadata cache in front of the database.
+        playlist_cache (PlaylistCache): The cache of expanded playlists.
+        music_queue (MusicQueue): The queue of songs to play.
         _fetching_stream (bool): Whether a stream is currently being fetched.
         _appending (bool): Whether songs are being appended to the queue.
         _asyncio_lock (asyncio.Lock): An asyncio lock for handling concurrency.
         _members (list): The list of members currently in the voice channel.
         ffmpeg_opts (dict): Options for FFmpeg.
+        audio_mode (AUDIOMODE): The audio pipeline used for new tracks.
+        gain_db (float): The gain in decibels applied in AUDIOMODE.gain.
+        opus_bitrate (int): The Opus bitrate in kbps used when FFmpeg has to encode.
+        ffmpeg_opus_encoding (bool): Whether loudnorm output is encoded by FFmpeg instead of in-process.
+        last_active (float): The monotonic time of the last command or track start.
     """
 
     def __init__(
@@ -106,8 +103,18 @@ class MusicPlayer:
         self.leave_when_empty = False
         self.manager = manager
         self.database = manager.database
+        self.metadata_cache = manager.metadata_cache
+        self.playlist_cache = manager.playlist_cache
+        self.audio_cache = manager.audio_cache
+        self.search_cache = manager.search_cache
+        self.metadata_provider = manager.metadata_provider
+        self.hydrator = QueueHydrator(
+            self,
+            manager.hydration_executor,
+            prefetch_count=manager.hydration_prefetch,
+        )
 
-        self.music_queue = []
+        self.music_queue = MusicQueue()
         self._fetching_stream = False
         self._appending = False
         self._asyncio_lock = asyncio.Lock()
@@ -116,6 +123,11 @@ class MusicPlayer:
             "options": "-vn -af loudnorm",
             "before_options": "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 0",
         }
+        self.audio_mode = AUDIOMODE.loudnorm
+        self.gain_db = 0.0
+        self.opus_bitrate = 128
+        self.ffmpeg_opus_encoding = manager.ffmpeg_opus_encoding
+        self.last_active = time.monotonic()
 
     async def _attempt_reconnect(self, max_retries=5, delay=1):
         """
@@ -179,63 +191,108 @@ class MusicPlayer:
 
             self._members = self.voice.channel.members
 
-    async def _play_func(self, last: Union[Song, None], new):
+    async def _play_func(self, last: Union[Song, None], new, start_at: float = 0.0):
         """
         Plays a new song and updates the now playing state.
 
         Args:
             last (Optional[Song]): The last song that was playing.
             new (Song): The new song to be played.
+            start_at (float, optional): The position in seconds to start playback from. Defaults to 0.0.
 
         Raises:
             Exception: If playback fails.
         """
         if self.voice:
             self._members = self.voice.channel.members
+        self.touch()
 
         async with self._asyncio_lock:
             try:
                 if self.interaction.guild.voice_client:
                     timer = time.time()
-                    print(colored(f"Extracting Song... {new.title}", "dark_grey"))
+                    while True:
+                        if not new.extracted_metadata and await self.hydrator.hydrate(
+                            [new]
+                        ):
+                            new = self._drop_unplayable(new)
+                            if new is None:
+                                break
+                            continue
+
+                        video_id = await get_video_id(new.url)
+                        cached_audio = (
+                            self.audio_cache.get(video_id)
+                            if self.audio_cache is not None and video_id
+                            else None
+                        )
+                        if cached_audio is not None:
+                            data = {
+                                "url": cached_audio.path,
+                                "acodec": cached_audio.codec,
+                            }
+                            break
+
+                        print(colored(f"Extracting Song... {new.title}", "dark_grey"))
+                        song_url = new.url
+                        data = await self.loop.run_in_executor(
+                            None,
+                            lambda: self.manager.ytdl_pool.extract_info(
+                                song_url, download=False
+                            ),
+                        )
+                        print(
+                            colored(
+                                f"Extract Completed, Time taken: {time.time() - timer}",
+                                "dark_grey",
+                            )
+                        )
+                        if data:
+                            break
+                        new = self._drop_unplayable(new)
+                        if new is None:
+                            break
 
-                    data = await self.loop.run_in_executor(
-                        None, lambda: ytdlp.extract_info(new.url, download=False)
-                    )
+                    if new is None:
+                        self._now_playing = None
+                        EventManager.fire_nowait("queue_ended", self, self.interaction)
+                        return
 
-                    print(
-                        colored(
-                            f"Extract Completed, Time taken: {time.time() - timer}",
-                            "dark_grey",
-                        )
-                    )
                     source_url = data["url"]
                     new.source_url = source_url
 
-                    audio_source = FFmpegPCMAudio(source_url, **self.ffmpeg_opts)
-                    self.voice.play(
-                        PCMVolumeTransformer(audio_source), after=self._after_func
+                    audio_source = await self._create_audio_source(
+                        data, source_url, start_at, local=cached_audio is not None
                     )
+                    self.voice.play(audio_source, after=self._after_func)
 
                     self._now_playing = new
-                    await self._now_playing.start()
+                    await self._now_playing.start(start_at)
+                    self.hydrator.prefetch()
 
                     print(colored(f"[PLAYING] {new.title}", "light_blue"))
 
-                    expire_unix_time = parse.parse_qs(parse.urlparse(source_url).query)[
-                        "expire"
-                    ][0]
-                    expire_time = datetime.datetime.fromtimestamp(int(expire_unix_time))
-                    print(
-                        colored(
-                            f"Queue Source (Expire: {expire_time}):\n{source_url}",
-                            "dark_grey",
+                    if cached_audio is not None:
+                        print(colored(f"Cached Source:\n{source_url}", "dark_grey"))
+                    else:
+                        expire_unix_time = parse.parse_qs(
+                            parse.urlparse(source_url).query
+                        )["expire"][0]
+                        expire_time = datetime.datetime.fromtimestamp(
+                            int(expire_unix_time)
                         )
-                    )
+                        print(
+                            colored(
+                                f"Queue Source (Expire: {expire_time}):\n{source_url}",
+                                "dark_grey",
+                            )
+                        )
+                    if self.audio_cache is not None and video_id:
+                        self.audio_cache.record_play(video_id)
 
                     print(colored(f"Time taken: {time.time() - timer}", "dark_grey"))
 
-                    await EventManager.fire(
+                    EventManager.fire_nowait(
                         "track_start", self, self.interaction, last, new
                     )
             except Exception as e:
@@ -243,6 +300,91 @@ class MusicPlayer:
                     return
                 raise e
 
+    def _drop_unplayable(self, song: Song) -> Optional[Song]:
+        """
+        Removes a song that cannot be resolved or extracted from the queue.
+
+        Args:
+            song (Song): The unplayable song.
+
+        Returns:
+            Optional[Song]: The song now at the head of the queue, or None if the queue is empty.
+        """
+        try:
+            self.music_queue.pop(self.music_queue.index(song))
+        except (ValueError, IndexError):
+            pass
+        LogHandler.warning(f"Dropped unplayable song {song.url} from the queue")
+        return self.music_queue[0] if len(self.music_queue) > 0 else None
+
+    async def _create_audio_source(
+        self, data: dict, source_url: str, start_at: float = 0.0, local: bool = False
+    ) -> AudioSource:
+        """
+        Builds the audio source for a track according to the current audio mode.
+
+        Passthrough copies the Opus stream when yt-dlp reports an Opus track, and
+        probes the stream otherwise. Gain mode applies a fixed volume filter and
+        loudnorm the live normaliser. Both have FFmpeg encode Opus itself, so all
+        per-stream audio work runs in the FFmpeg child process. With
+        ``ffmpeg_opus_encoding`` disabled, loudnorm falls back to PCM output that
+        the client encodes in-process.
+
+        Args:
+            data (dict): The info dict extracted by yt-dlp.
+            source_url (str): The direct stream URL or local file path.
+            start_at (float, optional): The position in seconds to start playback from. Defaults to 0.0.
+            local (bool, optional): Whether the source is a file from the audio cache, which skips the network options. Defaults to False.
+
+        Returns:
+            AudioSource: The audio source to hand to the voice client.
+        """
+        before_options = "" if local else self.ffmpeg_opts.get("before_options", "")
+        if start_at > 0:
+            before_options = f"-ss {start_at:.2f} {before_options}"
+
+        if self.audio_mode == AUDIOMODE.passthrough:
+            if data.get("acodec") == "opus":
+                return FFmpegOpusAudio(
+                    source_url,
+                    bitrate=int(data.get("abr") or self.opus_bitrate),
+                    codec="copy",
+                    before_options=before_options,
+                    options="-vn",
+                )
+            return await FFmpegOpusAudio.from_probe(
+                source_url, before_options=before_options, options="-vn"
+            )
+
+        if self.audio_mode == AUDIOMODE.gain:
+            options = "-vn"
+            if self.gain_db:
+                options = f"-vn -af volume={self.gain_db:.1f}dB"
+            return FFmpegOpusAudio(
+                source_url,
+                bitrate=self.opus_bitrate,
+                codec="libopus",
+                before_options=before_options,
+                options=options,
+            )
+
+        if self.ffmpeg_opus_encoding:
+            return FFmpegOpusAudio(
+                source_url,
+                bitrate=self.opus_bitrate,
+                codec="libopus",
+                before_options=before_options,
+                options=self.ffmpeg_opts.get("options"),
+            )
+
+        return PCMVolumeTransformer(
+            FFmpegPCMAudio(
+                source_url,
+                before_options=before_options,
+                options=self.ffmpeg_opts.get("options"),
+            )
+        )
+
     async def _pop_queue(self, index: int = 1, append: bool = False):
         """
         Removes songs from the queue.
@@ -251,10 +393,7 @@ class MusicPlayer:
             index (int, optional): The number of songs to remove. Defaults to 1.
             append (bool, optional): Whether to append the removed songs to the end of the queue. Defaults to False.
         """
-        for _ in range(index):
-            last = self.music_queue.pop(0)
-            if append:
-                self.music_queue.append(last)
+        self.music_queue.advance(index, append=append)
 
     async def _next_func(self, index: int = 1):
         """
@@ -360,11 +499,45 @@ class MusicPlayer:
 
         return decorator
 
+    def touch(self) -> None:
+        """Marks the player as active now."""
+        self.last_active = time.monotonic()
+
+    @property
+    def idle_for(self) -> float:
+        """float: Seconds since the player was last active, or 0 while it is playing."""
+        if self.voice is not None and self.voice.is_playing():
+            return 0.0
+        return time.monotonic() - self.last_active
+
+    @property
+    def connected(self) -> bool:
+        """bool: Whether the player has a connected voice client."""
+        return self.voice is not None and self.voice.is_connected()
+
+    def memory_estimate(self) -> int:
+        """
+        Estimates the memory held by the player, its queue and the song playing.
+
+        Returns:
+            int: The estimated size in bytes.
+        """
+        size = sys.getsizeof(self) + sys.getsizeof(self.__dict__)
+        size += self.music_queue.memory_estimate()
+        size += sys.getsizeof(self._members)
+        if self._now_playing is not None and self._now_playing not in self.music_queue:
+            size += self._now_playing.memory_estimate()
+        return size
+
     async def cleanup(self):
         """
         Cleans up the music player by clearing the queue and disconnecting from the voice channel.
         """
-        self.music_queue = []
+        self.removed = True
+        self.hydrator.stop()
+        self.music_queue.clear()
+        self._now_playing = None
+        self._members = []
         try:
             if self.voice:
                 await self.voice.disconnect()
@@ -374,40 +547,6 @@ class MusicPlayer:
             )
         return
 
-    async def _process_songs(self, video_ids, cache_metas):
-        songs = []
-        for video_id in video_ids:
-            song = Song(**cache_metas[video_id])
-            songs.append(song)
-            self.music_queue.append(song)
-
-            if not self.paused and self.music_queue and not self._now_playing:
-                await self._play_func(None, self.music_queue[0])
-        return songs
-
-    async def _process_missing_songs(self, missing_ids):
-        songs = []
-        for video_id in missing_ids:
-            video = await self.loop.run_in_executor(None, lambda: Video(str(video_id)))
-            meta = {
-                "url": video.url,
-                "title": video.title,
-                "views": video.views,
-                "duration": video.duration,
-                "thumbnail": video.thumbnail,
-                "channel": video.channel,
-                "channel_url": video.channel_url,
-                "thumbnails": video.thumbnails,
-            }
-            self.database.cache_video_metadata(video_id, meta)
-            song = Song(**meta)
-            songs.append(song)
-            self.music_queue.append(song)
-
-            if not self.paused and self.music_queue and not self._now_playing:
-                await self._play_func(None, self.music_queue[0])
-        return songs
-
     @pre_check()
     async def _queue_bulk(
         self, video_urls: list, shuffle: bool = False
@@ -415,6 +554,10 @@ class MusicPlayer:
         """
         Queues multiple songs.
 
+        Songs with cached metadata are queued complete and the rest as bare video
+        IDs, so the whole list is queued at once. The first song is hydrated
+        before returning, and the rest is hydrated in the background.
+
         Args:
             video_urls (list): A list of video URLs to queue.
             shuffle (bool, optional): Whether to shuffle the added songs. Defaults to False.
@@ -423,7 +566,6 @@ class MusicPlayer:
             tuple: A tuple containing the processed songs and the failed songs.
         """
         timer = time.time()
-        self.database.run_cleanup()
         failed_songs = []
         processed_songs = []
 
@@ -431,57 +573,35 @@ class MusicPlayer:
         for url in video_urls:
             try:
                 video_id = await get_video_id(url)
-                video_ids.append(video_id)
             except Exception as e:
-                failed_songs.append(url)
+                video_id = None
                 LogHandler.error(f"Failed to process URL {url}: {e}")
-
-        cache_metas = self.database.get_bulk_video_metadata(video_ids)
-        cached_ids = set(cache_metas.keys())
-        missing_ids = list((set(video_ids) - cached_ids))
-        cached_ids = list(cached_ids)
+            if video_id:
+                video_ids.append(video_id)
+            else:
+                failed_songs.append(url)
 
         if shuffle:
-            random.shuffle(cached_ids)
-            random.shuffle(missing_ids)
-
-        for video_id in cached_ids:
-            try:
-                song = Song(**cache_metas[video_id])
-                processed_songs.append(song)
-                self.music_queue.append(song)
+            random.shuffle(video_ids)
 
-                if not self.paused and self.music_queue and not self._now_playing:
-                    await self._play_func(None, self.music_queue[0])
-            except Exception as e:
+        cache_metas = self.metadata_cache.get_bulk(video_ids)
+        for video_id in video_ids:
+            if video_id in cache_metas:
+                processed_songs.append(Song(**cache_metas[video_id]))
+            elif self.metadata_cache.is_failed(video_id):
                 failed_songs.append(video_id)
-                LogHandler.error(f"Failed to process cached song {video_id}: {e}")
+            else:
+                processed_songs.append(Song.from_video_id(video_id))
 
-        for video_id in missing_ids:
-            try:
-                video = await self.loop.run_in_executor(
-                    None, lambda: Video(str(video_id))
-                )
-                meta = {
-                    "url": video.url,
-                    "title": video.title,
-                    "views": video.views,
-                    "duration": video.duration,
-                    "thumbnail": video.thumbnail,
-                    "channel": video.channel,
-                    "channel_url": video.channel_url,
-                    "thumbnails": video.thumbnails,
-                }
-                self.database.cache_video_metadata(video_id, meta)
-                song = Song(**meta)
-                processed_songs.append(song)
-                self.music_queue.append(song)
-
-                if not self.paused and self.music_queue and not self._now_playing:
-                    await self._play_func(None, self.music_queue[0])
-            except Exception as e:
-                failed_songs.append(video_id)
-                LogHandler.error(f"Failed to process missing song {video_id}: {e}")
+        if processed_songs:
+            await self.hydrator.ensure(processed_songs[:1])
+            if not processed_songs[0].extracted_metadata:
+                failed_songs.append(processed_songs.pop(0).url)
+        self.music_queue.extend(processed_songs)
+
+        if not self.paused and self.music_queue and not self._now_playing:
+            await self._play_func(None, self.music_queue[0])
+        self.hydrator.start_drain()
 
         print(colored(f"[BULK ADDED] {len(processed_songs)} songs", color="magenta"))
         print(colored(f"[BULK FAILED] {len(failed_songs)} songs", color="red"))
@@ -499,26 +619,25 @@ class MusicPlayer:
 
         Returns:
             Song: The queued song.
+
+        Raises:
+            InvalidVideo: If the video recently failed to resolve.
         """
-        # TODO: self.database.run_cleanup() を呼び出し続けると、ボットの負荷が高くなると思う、だからこれより良い方法を探してください
         timer = time.time()
-        self.database.run_cleanup()
         video_id = await get_video_id(video_url)
-        cached_meta = self.database.get_cached_video_metadata(video_id)
+        if self.metadata_cache.is_failed(video_id):
+            raise InvalidVideo
+        cached_meta = self.metadata_cache.get(video_id)
 
         if cached_meta is None:
-            video = await self.loop.run_in_executor(None, lambda: Video(video_id))
-            meta = {
-                "url": video.url,
-                "title": video.title,
-                "views": video.views,
-                "duration": video.duration,
-                "thumbnail": video.thumbnail,
-                "channel": video.channel,
-                "channel_url": video.channel_url,
-                "thumbnails": video.thumbnails,
-            }
-            self.database.cache_video_metadata(video_id, meta)
+            try:
+                meta = await self.loop.run_in_executor(
+                    None, self.metadata_provider.fetch, video_id
+                )
+            except Exception:
+                self.metadata_cache.mark_failed(video_id)
+                raise
+            await self.metadata_cache.put(video_id, meta)
         else:
             meta = cached_meta
 
@@ -559,11 +678,12 @@ class MusicPlayer:
             query (str): Search query or URL to queue.
 
         Returns:
-            Union[Playlist, Song]: The queued playlist or song.
+            Union[CachedPlaylist, Song]: The queued playlist or song.
 
         Raises:
             NoQueryResult: If no results are found for the given query.
         """
+        self.touch()
         self._fetching_stream = True
 
         result = None
@@ -572,13 +692,14 @@ class MusicPlayer:
 
         try:
             if self.is_valid_playlist_url(query):
-                playlist = await asyncio.to_thread(Playlist, query)
+                playlist = await self.playlist_cache.get(query)
                 await EventManager.fire("loading_playlist", self, interaction, None)
 
+                video_urls = playlist.video_urls
                 after_playlist = (
-                    random.sample(list(playlist.video_urls), len(playlist.video_urls))
+                    random.sample(video_urls, len(video_urls))
                     if shuffle_added
-                    else list(playlist.video_urls)
+                    else video_urls
                 )
 
                 songs, failed = await self.loop.create_task(
@@ -591,15 +712,30 @@ class MusicPlayer:
                     result = playlist
                 failed_songs.extend(failed)
             else:
-                try:
-                    yt = await asyncio.to_thread(YouTube, query)
-                except Exception as e:
-                    failed_songs.append(query)
+                video_url = None
+                title = query
+                video_id = self.search_cache.get(query)
+                if video_id is not None:
+                    video_url = f"https://www.youtube.com/watch?v={video_id}"
                 else:
                     try:
-                        result = await self._queue_single(yt.video.url)
+                        video_url, found_title = await asyncio.to_thread(
+                            self.metadata_provider.search, query
+                        )
+                    except Exception as e:
+                        failed_songs.append(query)
+                        LogHandler.warning(f"Failed to search for {query}: {e}")
+                    else:
+                        title = found_title or query
+                        self.search_cache.put(query, await get_video_id(video_url))
+
+                if video_url is not None:
+                    try:
+                        result = await self._queue_single(video_url)
                     except Exception as e:
-                        failed_songs.append(yt.video.title or query)
+                        if video_id is not None:
+                            self.search_cache.invalidate(query)
+                        failed_songs.append(title)
                         LogHandler.error(f"Failed to queue song: {e}")
 
         except Exception as e:
@@ -645,11 +781,30 @@ class MusicPlayer:
         Returns:
             LOOPMODE: The new loop mode.
         """
+        self.touch()
         self.loop_mode = (
             LOOPMODE.off if self.loop_mode == mode and mode != LOOPMODE.off else mode
         )
         return self.loop_mode
 
+    async def set_audio_mode(
+        self, mode: AUDIOMODE, gain_db: Optional[float] = None
+    ) -> AUDIOMODE:
+        """
+        Changes the audio pipeline of the player. The change applies from the next track.
+
+        Args:
+            mode (AUDIOMODE): The audio mode to set.
+            gain_db (Optional[float], optional): The gain in decibels used by AUDIOMODE.gain. Defaults to None, which keeps the current gain.
+
+        Returns:
+            AUDIOMODE: The new audio mode.
+        """
+        self.audio_mode = mode
+        if gain_db is not None:
+            self.gain_db = float(gain_db)
+        return self.audio_mode
+
     @pre_check(check_queue=True, check_nowplaying=True)
     async def resume(self, forced=False):
         """
@@ -661,11 +816,13 @@ class MusicPlayer:
         Returns:
             Song: The currently playing song.
         """
+        self.touch()
         self.paused = self.voice.is_paused()
         if forced or self.paused:
             self.voice.resume()
             song = self._now_playing
             await song.resume()
+            EventManager.fire_nowait("track_resume", self, self.interaction, song)
             return song
         raise NotPaused
 
@@ -680,11 +837,13 @@ class MusicPlayer:
         Returns:
             Song: The currently paused song.
         """
+        self.touch()
         self.paused = self.voice.is_paused()
         if forced or not self.paused:
             self.voice.pause()
             song = self._now_playing
             await song.pause()
+            EventManager.fire_nowait("track_pause", self, self.interaction, song)
             return song
         raise AlreadyPaused
 
@@ -699,6 +858,7 @@ class MusicPlayer:
         Returns:
             tuple: The last song played and the new song to be played.
         """
+        self.touch()
         last = self._now_playing
         new = None
 
@@ -724,11 +884,8 @@ class MusicPlayer:
         Returns:
             tuple: The previous song played and the new song to be played.
         """
-        first = self.music_queue[: len(self.music_queue) - 2]
-        last = self.music_queue[len(self.music_queue) - 2 :]
-        last.extend(first)
-
-        self.music_queue = last
+        self.touch()
+        self.music_queue.rotate(2)
 
         if not len(self.music_queue) > 1:
             self.music_queue.append(self.music_queue[0])
@@ -745,12 +902,11 @@ class MusicPlayer:
         Shuffles the songs in the queue.
 
         Returns:
-            list: The shuffled music queue.
+            MusicQueue: The shuffled music queue.
         """
+        self.touch()
         if len(self.music_queue) > 0:
-            self.music_queue = [self.music_queue[0]] + random.sample(
-                self.music_queue[1:], len(self.music_queue) - 1
-            )
+            self.music_queue.shuffle(keep_first=True)
 
         return self.music_queue
 
@@ -770,7 +926,7 @@ class MusicPlayer:
         Returns the current queue of songs.
 
         Returns:
-            list: The current music queue.
+            MusicQueue: The current music queue.
         """
         return self.music_queue
 
@@ -785,7 +941,7 @@ class MusicPlayer:
         Returns:
             bool: True if stopped successfully.
         """
-        self.music_queue = []
+        self.music_queue.clear()
 
         try:
             self.voice.stop()
@@ -808,18 +964,106 @@ class MusicPlayer:
         Returns:
             Song: The removed song.
         """
+        self.touch()
         song = None
         if index == 0:
             song = await self.now_playing()
             await self.skip()
         elif index == -1:
             self.voice.stop()
-            self.music_queue = []
+            self.music_queue.clear()
         else:
             song = self.music_queue.pop(index)
 
         return song
 
+    def snapshot_signature(self, elapsed_granularity: float = 30) -> tuple:
+        """
+        Returns a cheap signature of the state stored in a queue snapshot.
+
+        Args:
+            elapsed_granularity (float, optional): Seconds of playback progress that count as a change. Defaults to 30.
+
+        Returns:
+            tuple: A value that changes whenever the snapshot would change.
+        """
+        elapsed = self._now_playing.timer.elapsed if self._now_playing else 0
+        return (
+            self.music_queue.version,
+            self.loop_mode.value,
+            id(self._now_playing),
+            int(elapsed // elapsed_granularity),
+        )
+
+    def snapshot_state(self) -> dict:
+        """
+        Builds the part of a queue snapshot that changes without the queue changing.
+
+        Returns:
+            dict: The loop mode and the elapsed time of the current song.
+        """
+        return {
+            "loop": self.loop_mode.value,
+            "elapsed": (
+                round(self._now_playing.timer.elapsed, 1) if self._now_playing else 0
+            ),
+        }
+
+    async def snapshot(self) -> dict:
+        """
+        Builds a compact snapshot of the queue. The first video is the one playing.
+
+        Returns:
+            dict: The video IDs of the queue, the loop mode and the elapsed time of the current song.
+        """
+        return {
+            "ids": [await get_video_id(song.url) for song in self.music_queue],
+            **self.snapshot_state(),
+        }
+
+    async def restore(self, snapshot: dict) -> int:
+        """
+        Restores a queue snapshot, hydrating the songs from the metadata cache in bulk.
+
+        Videos without cached metadata are queued bare and hydrated in the background.
+
+        Args:
+            snapshot (dict): A snapshot created by :meth:`snapshot`.
+
+        Returns:
+            int: The number of restored songs.
+        """
+        video_ids = [video_id for video_id in snapshot.get("ids", []) if video_id]
+        if not video_ids:
+            return 0
+
+        self.loop = self.loop or self.interaction.guild.voice_client.loop
+        cache_metas = self.metadata_cache.get_bulk(video_ids)
+        songs = [
+            (
+                Song(**cache_metas[video_id])
+                if video_id in cache_metas
+                else Song.from_video_id(video_id)
+            )
+            for video_id in video_ids
+        ]
+
+        self.loop_mode = LOOPMODE(snapshot.get("loop", LOOPMODE.off.value))
+        self.music_queue.extend(songs)
+        LogHandler.info(
+            f"Restored {len(songs)}/{len(video_ids)} songs for guild {self.interaction.guild.id}"
+        )
+
+        if not self.paused and not self._now_playing:
+            start_at = (
+                snapshot.get("elapsed", 0)
+                if await get_video_id(songs[0].url) == video_ids[0]
+                else 0
+            )
+            await self._play_func(None, self.music_queue[0], start_at=start_at)
+        self.hydrator.start_drain()
+        return len(songs)
+
     @property
     def fetching_stream(self):
         """bool: Whether a stream is currently being fetched."""
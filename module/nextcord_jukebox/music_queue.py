@@ -0,0 +1,436 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import itertools
+import random
+import sys
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .song import Song
+
+
+class MusicQueue:
+    """
+    A deque-backed queue of songs with stable per-entry IDs.
+
+    Every entry receives an ID when it is added. Positions are tracked with a
+    contiguous sequence number per entry, so advancing the queue, rotating it for
+    loop-all and looking up the position of an entry are all O(1). Arbitrary
+    mutations (insert, move, remove from the middle, shuffle) only mark the
+    sequence numbers as stale; they are rebuilt once, lazily, on the next lookup.
+
+    Attributes:
+        _entries (Deque[Tuple[int, Song]]): The (entry ID, song) pairs in queue order.
+        _seq (Dict[int, int]): Maps entry IDs to their sequence number.
+        _by_song (Dict[int, Optional[int]]): Maps ``id(song)`` to the entry ID holding it, or None once the song was queued more than once.
+        _head (int): Sequence number of the first entry.
+        _tail (int): Sequence number the next appended entry will receive.
+        _dirty (bool): Whether the sequence numbers need to be rebuilt.
+        version (int): A counter bumped on every mutation, for cheap change detection.
+    """
+
+    def __init__(self, songs: Optional[Iterable[Song]] = None) -> None:
+        """
+        Initializes the queue, optionally filled with the given songs.
+
+        Args:
+            songs (Optional[Iterable[Song]]): Songs to add to the queue. Defaults to None.
+        """
+        self._entries: Deque[Tuple[int, Song]] = deque()
+        self._seq: Dict[int, int] = {}
+        self._by_song: Dict[int, Optional[int]] = {}
+        self._ids = itertools.count(1)
+        self._head = 0
+        self._tail = 0
+        self._dirty = False
+        self.version = 0
+
+        if songs:
+            self.extend(songs)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+    def __iter__(self) -> Iterator[Song]:
+        return (song for _, song in self._entries)
+
+    def __contains__(self, song: Song) -> bool:
+        return any(entry is song for _, entry in self._entries)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Song, List[Song]]:
+        """
+        Returns the song at the given index, or a list of songs for a slice.
+
+        Args:
+            index (Union[int, slice]): The index or slice to fetch.
+
+        Returns:
+            Union[Song, List[Song]]: The song at the index, or the songs in the slice.
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self._entries))
+            if step != 1:
+                return list(self)[index]
+            return [
+                song
+                for _, song in itertools.islice(self._entries, start, max(start, stop))
+            ]
+        return self._entries[index][1]
+
+    def _register(self, song: Song, seq: int) -> int:
+        """
+        Allocates an entry ID for a song at the given sequence number.
+
+        Args:
+            song (Song): The song to register.
+            seq (int): The sequence number of the new entry.
+
+        Returns:
+            int: The new entry ID.
+        """
+        entry_id = next(self._ids)
+        self.version += 1
+        self._seq[entry_id] = seq
+        # A song queued twice is looked up by scanning, so index finds its
+        # first entry, as list.index does.
+        self._by_song[id(song)] = None if id(song) in self._by_song else entry_id
+        return entry_id
+
+    def _forget(self, entry_id: int, song: Song) -> None:
+        """
+        Drops the bookkeeping of a removed entry.
+
+        Args:
+            entry_id (int): The ID of the removed entry.
+            song (Song): The song held by the removed entry.
+        """
+        self.version += 1
+        self._seq.pop(entry_id, None)
+        if self._by_song.get(id(song)) == entry_id:
+            del self._by_song[id(song)]
+
+    def _reindex(self) -> None:
+        """Rebuilds contiguous sequence numbers after an arbitrary mutation."""
+        for seq, (entry_id, _) in enumerate(self._entries):
+            self._seq[entry_id] = seq
+        self._head = 0
+        self._tail = len(self._entries)
+        self._dirty = False
+
+    def append(self, song: Song) -> int:
+        """
+        Adds a song to the end of the queue.
+
+        Args:
+            song (Song): The song to add.
+
+        Returns:
+            int: The entry ID of the added song.
+        """
+        entry_id = self._register(song, self._tail)
+        self._tail += 1
+        self._entries.append((entry_id, song))
+        return entry_id
+
+    def appendleft(self, song: Song) -> int:
+        """
+        Adds a song to the front of the queue.
+
+        Args:
+            song (Song): The song to add.
+
+        Returns:
+            int: The entry ID of the added song.
+        """
+        self._head -= 1
+        entry_id = self._register(song, self._head)
+        self._entries.appendleft((entry_id, song))
+        return entry_id
+
+    def extend(self, songs: Iterable[Song]) -> List[int]:
+        """
+        Adds multiple songs to the end of the queue.
+
+        Args:
+            songs (Iterable[Song]): The songs to add.
+
+        Returns:
+            List[int]: The entry IDs of the added songs.
+        """
+        return [self.append(song) for song in songs]
+
+    def popleft(self) -> Song:
+        """
+        Removes and returns the first song in the queue.
+
+        Returns:
+            Song: The removed song.
+
+        Raises:
+            IndexError: If the queue is empty.
+        """
+        entry_id, song = self._entries.popleft()
+        self._forget(entry_id, song)
+        self._head += 1
+        return song
+
+    def pop(self, index: int = -1) -> Song:
+        """
+        Removes and returns the song at the given index.
+
+        Args:
+            index (int, optional): The index of the song to remove. Defaults to -1.
+
+        Returns:
+            Song: The removed song.
+
+        Raises:
+            IndexError: If the index is out of range.
+        """
+        size = len(self._entries)
+        if index < 0:
+            index += size
+        if not 0 <= index < size:
+            raise IndexError("queue index out of range")
+
+        if index == 0:
+            return self.popleft()
+        if index == size - 1:
+            entry_id, song = self._entries.pop()
+            self._tail -= 1
+        else:
+            entry_id, song = self._entries[index]
+            del self._entries[index]
+            self._dirty = True
+        self._forget(entry_id, song)
+        return song
+
+    def insert(self, index: int, song: Song) -> int:
+        """
+        Inserts a song before the given index.
+
+        Args:
+            index (int): The index to insert at.
+            song (Song): The song to insert.
+
+        Returns:
+            int: The entry ID of the inserted song.
+        """
+        size = len(self._entries)
+        if index < 0:
+            index = max(index + size, 0)
+        if index >= size:
+            return self.append(song)
+        if index == 0:
+            return self.appendleft(song)
+
+        entry_id = self._register(song, self._tail)
+        self._entries.insert(index, (entry_id, song))
+        self._dirty = True
+        return entry_id
+
+    def move(self, source: int, destination: int) -> Song:
+        """
+        Moves the song at one index to another index.
+
+        Args:
+            source (int): The current index of the song.
+            destination (int): The new index of the song.
+
+        Returns:
+            Song: The moved song.
+        """
+        entry = self._entries[source]
+        del self._entries[source]
+        self._entries.insert(destination, entry)
+        self._dirty = True
+        self.version += 1
+        return entry[1]
+
+    def advance(self, count: int = 1, append: bool = False) -> List[Song]:
+        """
+        Removes songs from the front of the queue in O(count).
+
+        Args:
+            count (int, optional): The number of songs to remove. Defaults to 1.
+            append (bool, optional): Whether to move the removed songs to the end of the queue instead of dropping them. Defaults to False.
+
+        Returns:
+            List[Song]: The songs that were removed from the front.
+        """
+        count = min(max(count, 0), len(self._entries))
+        if append:
+            self.rotate(-count)
+            return self[len(self._entries) - count :] if count else []
+        return [self.popleft() for _ in range(count)]
+
+    def rotate(self, steps: int = 1) -> None:
+        """
+        Rotates the queue in O(steps). Positive steps move songs from the end to the front.
+
+        Args:
+            steps (int, optional): The number of steps to rotate. Defaults to 1.
+        """
+        if not self._entries:
+            return
+        steps %= len(self._entries)
+        if steps > len(self._entries) // 2:
+            steps -= len(self._entries)
+        if steps:
+            self.version += 1
+
+        for _ in range(steps):
+            entry = self._entries.pop()
+            self._head -= 1
+            self._tail -= 1
+            self._seq[entry[0]] = self._head
+            self._entries.appendleft(entry)
+        for _ in range(-steps):
+            entry = self._entries.popleft()
+            self._seq[entry[0]] = self._tail
+            self._head += 1
+            self._tail += 1
+            self._entries.append(entry)
+
+    def shuffle(self, keep_first: bool = True) -> None:
+        """
+        Shuffles the queue in place.
+
+        Args:
+            keep_first (bool, optional): Whether to keep the first (now playing) entry in place. Defaults to True.
+        """
+        entries = list(self._entries)
+        head, rest = (entries[:1], entries[1:]) if keep_first else ([], entries)
+        random.shuffle(rest)
+        self._entries = deque(head + rest)
+        self._dirty = True
+        self.version += 1
+
+    def clear(self) -> None:
+        """Removes every song from the queue."""
+        self._entries.clear()
+        self._seq.clear()
+        self._by_song.clear()
+        self._head = 0
+        self._tail = 0
+        self._dirty = False
+        self.version += 1
+
+    def touch(self) -> None:
+        """Marks the queue as changed without mutating it, such as after its songs were hydrated."""
+        self.version += 1
+
+    def position(self, entry_id: int) -> int:
+        """
+        Returns the current index of an entry.
+
+        Args:
+            entry_id (int): The entry ID.
+
+        Returns:
+            int: The index of the entry.
+
+        Raises:
+            KeyError: If the entry is no longer in the queue.
+        """
+        if self._dirty:
+            self._reindex()
+        return self._seq[entry_id] - self._head
+
+    def entry_id(self, index: int) -> int:
+        """
+        Returns the entry ID at the given index.
+
+        Args:
+            index (int): The index of the entry.
+
+        Returns:
+            int: The entry ID.
+        """
+        return self._entries[index][0]
+
+    def index(self, song: Song) -> int:
+        """
+        Returns the index of a song in the queue.
+
+        Args:
+            song (Song): The song to look up.
+
+        Returns:
+            int: The index of the song.
+
+        Raises:
+            ValueError: If the song is not in the queue.
+        """
+        entry_id = self._by_song.get(id(song))
+        if entry_id is not None:
+            return self.position(entry_id)
+        for index, (_, entry) in enumerate(self._entries):
+            if entry is song:
+                return index
+        raise ValueError("song is not in the queue")
+
+    def memory_estimate(self) -> int:
+        """
+        Estimates the memory held by the queue, including its songs.
+
+        Returns:
+            int: The estimated size in bytes.
+        """
+        size = (
+            sys.getsizeof(self._entries)
+            + sys.getsizeof(self._seq)
+            + sys.getsizeof(self._by_song)
+        )
+        seen = set()
+        for entry in self._entries:
+            size += sys.getsizeof(entry)
+            if id(entry[1]) not in seen:
+                seen.add(id(entry[1]))
+                size += entry[1].memory_estimate()
+        return size
+
+    def entries(
+        self, start: int = 0, stop: Optional[int] = None
+    ) -> List[Tuple[int, int, Song]]:
+        """
+        Returns (index, entry ID, song) triples for a range of the queue.
+
+        Args:
+            start (int, optional): The first index to include. Defaults to 0.
+            stop (Optional[int], optional): The index to stop before. Defaults to the end of the queue.
+
+        Returns:
+            List[Tuple[int, int, Song]]: The entries in the range.
+        """
+        stop = len(self._entries) if stop is None else min(stop, len(self._entries))
+        return [
+            (index, entry_id, song)
+            for index, (entry_id, song) in enumerate(
+                itertools.islice(self._entries, start, max(start, stop)), start=start
+            )
+        ]
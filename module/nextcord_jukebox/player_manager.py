@@ -17,6 +17,12 @@ Methods:
 
     fire_voice_state_update(member: Member, before, after) -> None:
         Handles voice state updates for the bot and other members, performing necessary actions such as removing the player if the bot leaves a voice channel.
+
+    start_background_tasks() -> None:
+        Starts the maintenance tasks, such as the cache janitor, on the running event loop.
+
+    memory_usage() -> dict:
+        Estimates the memory held by each player and in total, and reports how many idle players were reaped.
 """
 
 #  ------------------------------------------------------------
@@ -42,14 +48,28 @@ Methods:
 #  ------------------------------------------------------------
 #
 
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
 from nextcord import BotIntegration, Interaction, Member
 from nextcord.utils import get
 
+from . import LogHandler
+from .audio_cache import AudioCache
 from .database_handler import Database
+from .event_manager import EventManager
 from .exceptions import UserNotConnected, VoiceChannelMismatch
+from .maintenance import CacheJanitor, PlayerReaper
+from .metadata_cache import MetadataCache
+from .metadata_provider import create_metadata_provider
 from .music_player import MusicPlayer
+from .playlist_cache import PlaylistCache
 from .replay_handler import attach as attach_replay
+from .search_cache import SearchCache
+from .snapshots import QueueSnapshotter
 from .sockets import attach as attach_sockets
+from .ytdl_pool import YTDLPool
 
 
 class PlayerManager:
@@ -65,15 +85,81 @@ class PlayerManager:
         mysql_database: str = "jukebox",
         enable_rpc: bool = True,
         enable_replay: bool = True,
+        cache_cleanup_interval: float = 3600,
+        cache_expire_days: int = 28,
+        cache_cleanup_batch_size: int = 500,
+        metadata_cache_size: int = 2048,
+        metadata_negative_ttl: float = 300,
+        metadata_flush_every: int = 50,
+        playlist_cache_ttl: float = 7 * 86400,
+        playlist_refresh_after: float = 3600,
+        enable_queue_snapshots: bool = True,
+        queue_snapshot_interval: float = 30,
+        queue_snapshot_max_age: float = 86400,
+        audio_cache_dir: str | None = None,
+        audio_cache_max_mb: int = 2048,
+        audio_cache_min_plays: int = 5,
+        audio_cache_eviction: str = "lru",
+        ffmpeg_opus_encoding: bool = True,
+        player_idle_timeout: float = 900,
+        player_disconnect_grace: float = 120,
+        player_reap_interval: float = 60,
+        search_cache_size: int = 1024,
+        search_cache_ttl: float = 7 * 86400,
+        event_listener_timeout: float = 10,
+        replay_flush_interval: float = 5,
+        replay_batch_size: int = 200,
+        ytdl_pool_size: int = 4,
+        ytdl_warm_up: bool = True,
+        metadata_backend: str = "meta_yt",
+        hydration_workers: int = 2,
+        hydration_prefetch: int = 3,
+        rpc_max_pending: int = 8,
+        rpc_send_timeout: float = 5,
+        rpc_heartbeat_interval: float = 15,
     ):
         """
         Initializes the PlayerManager with the given bot instance.
 
         Args:
             bot (Bot): The bot instance to which the PlayerManager is attached.
+            cache_cleanup_interval (float, optional): Seconds between metadata cache cleanups. Defaults to 3600.
+            cache_expire_days (int, optional): The age in days after which cached metadata expires. Defaults to 28.
+            cache_cleanup_batch_size (int, optional): The maximum number of cache rows deleted per batch. Defaults to 500.
+            metadata_cache_size (int, optional): The maximum number of video metadata entries kept in memory. Defaults to 2048.
+            metadata_negative_ttl (float, optional): Seconds a video that failed to resolve is not retried. Defaults to 300.
+            metadata_flush_every (int, optional): The number of newly resolved videos buffered before they are written to the database. Defaults to 50.
+            playlist_cache_ttl (float, optional): Seconds a cached playlist expansion may be served. Defaults to 7 days.
+            playlist_refresh_after (float, optional): Seconds after which a served cached playlist is refreshed in the background. Defaults to 3600.
+            enable_queue_snapshots (bool, optional): Whether to snapshot queues so they survive restarts. Defaults to True.
+            queue_snapshot_interval (float, optional): Seconds between queue snapshots. Defaults to 30.
+            queue_snapshot_max_age (float, optional): Seconds after which a queue snapshot is discarded instead of restored. Defaults to 1 day.
+            audio_cache_dir (str | None, optional): The directory to store frequently played tracks in. Defaults to None, which disables the audio cache.
+            audio_cache_max_mb (int, optional): The maximum size of the audio cache in megabytes. Defaults to 2048.
+            audio_cache_min_plays (int, optional): The play count after which a track is stored in the audio cache. Defaults to 5.
+            audio_cache_eviction (str, optional): The audio cache eviction policy, "lru" or "lfu". Defaults to "lru".
+            ffmpeg_opus_encoding (bool, optional): Whether FFmpeg encodes normalised audio to Opus, keeping the encoding out of the bot process. Defaults to True.
+            player_idle_timeout (float, optional): Seconds a player may sit idle before it is removed. Defaults to 900.
+            player_disconnect_grace (float, optional): Seconds a player may stay disconnected before it is removed. Defaults to 120.
+            player_reap_interval (float, optional): Seconds between checks for idle players. Defaults to 60.
+            search_cache_size (int, optional): The maximum number of text queries whose resolution is kept in memory. Defaults to 1024.
+            search_cache_ttl (float, optional): Seconds a text query keeps resolving to the same video. Defaults to 7 days.
+            event_listener_timeout (float, optional): Seconds an event listener may run before it is cancelled. Defaults to 10.
+            replay_flush_interval (float, optional): Seconds between replay history writes. Defaults to 5.
+            replay_batch_size (int, optional): The number of buffered replay entries that triggers a write. Defaults to 200.
+            ytdl_pool_size (int, optional): The number of YoutubeDL instances available for concurrent extractions. Defaults to 4.
+            ytdl_warm_up (bool, optional): Whether to create the YoutubeDL instances at startup rather than on first use. Defaults to True.
+            metadata_backend (str, optional): Where video metadata and searches are resolved, "meta_yt", "ytdlp", or "adaptive" to route to the faster healthy one. Defaults to "meta_yt".
+            hydration_workers (int, optional): The number of threads resolving the metadata of queued playlists in the background. Defaults to 2.
+            hydration_prefetch (int, optional): The number of upcoming songs whose metadata is resolved ahead of playback. Defaults to 3.
+            rpc_max_pending (int, optional): The number of messages queued per RPC client before it is disconnected. Superseded states are coalesced rather than queued. Defaults to 8.
+            rpc_send_timeout (float, optional): Seconds a send to an RPC client may take before it is disconnected. Defaults to 5.
+            rpc_heartbeat_interval (float, optional): Seconds between position heartbeats sent to RPC clients, or 0 to disable them. Defaults to 15.
         """
         self.players = {}
         self.bot = bot
+        self.ffmpeg_opus_encoding = ffmpeg_opus_encoding
+        EventManager.listener_timeout = event_listener_timeout
 
         # Initialize database
         if db_type == "mysql":
@@ -88,11 +174,85 @@ class PlayerManager:
         else:
             self.database = Database("sqlite", db_file=db_path)
 
+        self.ytdl_pool = YTDLPool(size=ytdl_pool_size)
+        self.ytdl_warm_up = ytdl_warm_up
+        self.metadata_provider = create_metadata_provider(
+            metadata_backend, self.ytdl_pool
+        )
+        self.hydration_executor = ThreadPoolExecutor(
+            max_workers=hydration_workers, thread_name_prefix="jukebox-hydrate"
+        )
+        self.hydration_prefetch = hydration_prefetch
+
+        self.metadata_cache = MetadataCache(
+            self.database,
+            max_size=metadata_cache_size,
+            negative_ttl=metadata_negative_ttl,
+            flush_threshold=metadata_flush_every,
+        )
+        self.playlist_cache = PlaylistCache(
+            self.database,
+            ttl=playlist_cache_ttl,
+            refresh_after=playlist_refresh_after,
+        )
+        self.search_cache = SearchCache(
+            self.database, max_size=search_cache_size, ttl=search_cache_ttl
+        )
+        self.audio_cache = (
+            AudioCache(
+                self.database,
+                audio_cache_dir,
+                max_bytes=audio_cache_max_mb * 1024**2,
+                min_plays=audio_cache_min_plays,
+                eviction=audio_cache_eviction,
+            )
+            if audio_cache_dir
+            else None
+        )
+        self.cache_janitor = CacheJanitor(
+            self.database,
+            interval=cache_cleanup_interval,
+            expire_days=cache_expire_days,
+            batch_size=cache_cleanup_batch_size,
+            search_expire_days=search_cache_ttl / 86400,
+            metadata_cache=self.metadata_cache,
+        )
+
+        self.player_reaper = PlayerReaper(
+            self,
+            interval=player_reap_interval,
+            idle_timeout=player_idle_timeout,
+            disconnect_grace=player_disconnect_grace,
+        )
+
+        self.queue_snapshotter = (
+            QueueSnapshotter(
+                self, interval=queue_snapshot_interval, max_age=queue_snapshot_max_age
+            )
+            if enable_queue_snapshots
+            else None
+        )
+
         # Optional features
-        if enable_rpc:
-            attach_sockets(self)
-        if enable_replay:
-            attach_replay(self)
+        self.rpc_handler = (
+            attach_sockets(
+                self,
+                max_pending=rpc_max_pending,
+                send_timeout=rpc_send_timeout,
+                heartbeat_interval=rpc_heartbeat_interval,
+            )
+            if enable_rpc
+            else None
+        )
+        self.replay_handler = (
+            attach_replay(
+                self,
+                flush_interval=replay_flush_interval,
+                batch_size=replay_batch_size,
+            )
+            if enable_replay
+            else None
+        )
 
     async def get_player(
         self, interaction: Interaction, bot: BotIntegration
@@ -111,12 +271,15 @@ class PlayerManager:
             UserNotConnected: If the user is not connected to a voice channel.
             VoiceChannelMismatch: If the user is in a different voice channel than the bot.
         """
+        self.start_background_tasks()
+
         if not interaction.user.voice or not interaction.user.voice.channel:
             raise UserNotConnected
 
         if interaction.guild.id not in self.players:
             self.players[interaction.guild.id] = MusicPlayer(self, interaction, bot)
             await self.players[interaction.guild.id].connect(interaction)
+            await self._restore_snapshot(self.players[interaction.guild.id])
         else:
             if not interaction.guild.voice_client:
                 await self.players[interaction.guild.id].connect(interaction)
@@ -149,11 +312,7 @@ class PlayerManager:
         Returns:
             bool: True if a player was removed, False otherwise.
         """
-        if interaction.guild.id in self.players:
-            await self.players[interaction.guild.id].cleanup()
-            self.players.pop(interaction.guild.id, None)
-            return True
-        return False
+        return await self.remove_player_by_guild_id(interaction.guild.id)
 
     async def remove_player_by_guild_id(self, guild_id: int) -> bool:
         """
@@ -168,6 +327,13 @@ class PlayerManager:
         if guild_id in self.players:
             await self.players[guild_id].cleanup()
             self.players.pop(guild_id, None)
+            if self.replay_handler is not None:
+                await self.replay_handler.recorder.flush()
+            if self.queue_snapshotter is not None:
+                self.queue_snapshotter.forget(guild_id)
+                await asyncio.to_thread(
+                    self.database.delete_queue_snapshots, [guild_id]
+                )
             return True
         return False
 
@@ -180,6 +346,8 @@ class PlayerManager:
             before (VoiceState): The previous voice state of the member.
             after (VoiceState): The new voice state of the member.
         """
+        self.start_background_tasks()
+
         if (
             member.id == self.bot.user.id
             and before.channel is not None
@@ -191,3 +359,81 @@ class PlayerManager:
                 member, before, after
             )
         return
+
+    def start_background_tasks(self) -> None:
+        """
+        Starts the maintenance tasks on the running event loop. Safe to call repeatedly.
+
+        The tasks are started lazily because the manager may be created before the bot's event loop is running.
+        """
+        self.cache_janitor.start()
+        self.player_reaper.start()
+        if self.rpc_handler is not None:
+            self.rpc_handler.start()
+        if self.ytdl_warm_up:
+            self.ytdl_pool.start()
+        if self.replay_handler is not None:
+            self.replay_handler.recorder.start()
+        if self.queue_snapshotter is not None:
+            self.queue_snapshotter.start()
+        if self.audio_cache is not None:
+            self.audio_cache.start()
+
+    async def shutdown(self) -> None:
+        """
+        Stops the maintenance tasks and writes every buffered replay entry and metadata cache entry.
+        """
+        self.cache_janitor.stop()
+        self.player_reaper.stop()
+        if self.queue_snapshotter is not None:
+            self.queue_snapshotter.stop()
+        if self.replay_handler is not None:
+            self.replay_handler.recorder.stop()
+            await self.replay_handler.recorder.flush()
+        await self.metadata_cache.flush()
+
+    def memory_usage(self) -> dict:
+        """
+        Estimates the memory held by the players.
+
+        Returns:
+            dict: The estimated bytes per guild ID under "players", their sum under "total", and the number of players reaped so far under "reaped".
+        """
+        players = {
+            guild_id: player.memory_estimate()
+            for guild_id, player in list(self.players.items())
+        }
+        return {
+            "players": players,
+            "total": sum(players.values()),
+            "reaped": self.player_reaper.stats["reaped"],
+        }
+
+    async def _restore_snapshot(self, player: MusicPlayer) -> None:
+        """
+        Restores the queue a guild had before the bot restarted, if a snapshot exists.
+
+        Snapshots older than the snapshotter's max_age are deleted instead.
+
+        Args:
+            player (MusicPlayer): The newly created player of the guild.
+        """
+        if self.queue_snapshotter is None:
+            return
+        guild_id = player.interaction.guild.id
+        try:
+            snapshot = self.database.get_queue_snapshot(guild_id)
+            if not snapshot:
+                return
+            age = (datetime.now() - snapshot["updated_at"]).total_seconds()
+            if age > self.queue_snapshotter.max_age:
+                LogHandler.info(
+                    f"Discarded queue snapshot of {guild_id}, {round(age)}s old"
+                )
+                await asyncio.to_thread(
+                    self.database.delete_queue_snapshots, [guild_id]
+                )
+                return
+            await player.restore(snapshot)
+        except Exception as e:
+            LogHandler.error(f"Failed to restore queue snapshot of {guild_id}: {e}")
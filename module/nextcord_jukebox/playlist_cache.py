@@ -0,0 +1,255 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import asyncio
+from datetime import datetime, timedelta
+from typing import List, Optional, Set
+
+from pytube import Playlist
+
+from . import LogHandler
+from .exceptions import InvalidPlaylist
+from .utils import get_playlist_id, get_video_id
+
+
+class CachedPlaylist:
+    """
+    An expanded playlist, either freshly scraped or loaded from the playlist cache.
+
+    Attributes:
+        playlist_id (Optional[str]): The playlist ID.
+        title (str): The title of the playlist.
+        video_ids (List[str]): The ordered video IDs of the playlist.
+        fetched_at (datetime): When the playlist was last scraped from YouTube.
+    """
+
+    def __init__(
+        self,
+        playlist_id: Optional[str],
+        title: str,
+        video_ids: List[str],
+        fetched_at: datetime,
+    ) -> None:
+        self.playlist_id = playlist_id
+        self.title = title
+        self.video_ids = video_ids
+        self.fetched_at = fetched_at
+
+    @property
+    def video_urls(self) -> List[str]:
+        """List[str]: The watch URLs of the videos in the playlist."""
+        return [
+            f"https://www.youtube.com/watch?v={video_id}" for video_id in self.video_ids
+        ]
+
+    def __len__(self) -> int:
+        return len(self.video_ids)
+
+
+class PlaylistCache:
+    """
+    Caches expanded playlists in the database, keyed by playlist ID.
+
+    A cached playlist younger than ``refresh_after`` is served as is. An older one
+    is still served immediately, while a background task revalidates it. Once a
+    playlist is older than ``ttl`` it is revalidated before being served.
+
+    Revalidating first loads only the playlist's first page and compares its
+    title and reported length with those stored with the cached expansion. The
+    reported length is compared rather than the number of cached IDs, because
+    YouTube counts videos the expansion skips, such as private ones. Only a
+    playlist that changed is scraped again in full; an unchanged one just has
+    its cache age reset.
+
+    Attributes:
+        database: The database instance storing the playlists.
+        ttl (timedelta): The age after which a cached playlist is no longer served.
+        refresh_after (timedelta): The age after which a cached playlist is refreshed in the background.
+    """
+
+    def __init__(
+        self, database, ttl: float = 7 * 86400, refresh_after: float = 3600
+    ) -> None:
+        """
+        Initializes the PlaylistCache.
+
+        Args:
+            database: The database instance storing the playlists.
+            ttl (float, optional): Seconds after which a cached playlist is no longer served. Defaults to 7 days.
+            refresh_after (float, optional): Seconds after which a cached playlist is refreshed in the background. Defaults to 3600.
+        """
+        self.database = database
+        self.ttl = timedelta(seconds=ttl)
+        self.refresh_after = timedelta(seconds=refresh_after)
+        self._refreshing: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def get(self, url: str) -> CachedPlaylist:
+        """
+        Returns the expanded playlist for a URL, from the cache when possible.
+
+        Args:
+            url (str): The playlist URL.
+
+        Returns:
+            CachedPlaylist: The expanded playlist.
+
+        Raises:
+            InvalidPlaylist: If the playlist could not be expanded.
+        """
+        playlist_id = await get_playlist_id(url)
+        if playlist_id is None:
+            return await self._fetch(url, None)
+
+        cached = self.database.get_cached_playlist(playlist_id)
+        if cached is None:
+            return await self._fetch(url, playlist_id)
+
+        age = datetime.now() - cached["registered_date"]
+        if age < self.ttl:
+            LogHandler.info(f"Using cached playlist {playlist_id}")
+            if age >= self.refresh_after:
+                self._schedule_refresh(url, playlist_id, cached)
+            return CachedPlaylist(
+                playlist_id,
+                cached["title"],
+                cached["video_ids"],
+                cached["registered_date"],
+            )
+        return await self._revalidate(url, playlist_id, cached)
+
+    async def _revalidate(
+        self, url: str, playlist_id: str, cached: dict
+    ) -> CachedPlaylist:
+        """
+        Serves a cached playlist again if it did not change, and scrapes it in full otherwise.
+
+        Args:
+            url (str): The playlist URL.
+            playlist_id (str): The playlist ID.
+            cached (dict): The cached playlist, as returned by the database.
+
+        Returns:
+            CachedPlaylist: The expanded playlist.
+
+        Raises:
+            InvalidPlaylist: If the playlist changed and could not be expanded.
+        """
+
+        def probe():
+            playlist = Playlist(url)
+            return playlist.title, playlist.length
+
+        try:
+            title, length = await asyncio.to_thread(probe)
+        except Exception as e:
+            LogHandler.warning(f"Failed to probe playlist {playlist_id}: {e}")
+        else:
+            if (
+                title == cached["title"]
+                and cached["reported_length"] is not None
+                and length == cached["reported_length"]
+            ):
+                LogHandler.info(f"Playlist {playlist_id} unchanged, keeping cache")
+                self.database.touch_cached_playlist(playlist_id)
+                return CachedPlaylist(
+                    playlist_id, cached["title"], cached["video_ids"], datetime.now()
+                )
+        return await self._fetch(url, playlist_id)
+
+    def _schedule_refresh(self, url: str, playlist_id: str, cached: dict) -> None:
+        """
+        Starts a background refresh of a playlist unless one is already running.
+
+        Args:
+            url (str): The playlist URL.
+            playlist_id (str): The playlist ID.
+            cached (dict): The cached playlist, as returned by the database.
+        """
+        if playlist_id in self._refreshing:
+            return
+        self._refreshing.add(playlist_id)
+        task = asyncio.get_running_loop().create_task(
+            self._refresh(url, playlist_id, cached)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _refresh(self, url: str, playlist_id: str, cached: dict) -> None:
+        """
+        Revalidates a playlist and updates the cache, logging failures.
+
+        Args:
+            url (str): The playlist URL.
+            playlist_id (str): The playlist ID.
+            cached (dict): The cached playlist, as returned by the database.
+        """
+        try:
+            await self._revalidate(url, playlist_id, cached)
+        except Exception as e:
+            LogHandler.warning(
+                f"Background refresh of playlist {playlist_id} failed: {e}"
+            )
+        finally:
+            self._refreshing.discard(playlist_id)
+
+    async def _fetch(self, url: str, playlist_id: Optional[str]) -> CachedPlaylist:
+        """
+        Scrapes a playlist from YouTube and stores it in the cache.
+
+        Args:
+            url (str): The playlist URL.
+            playlist_id (Optional[str]): The playlist ID, or None to skip caching.
+
+        Returns:
+            CachedPlaylist: The expanded playlist.
+
+        Raises:
+            InvalidPlaylist: If the playlist could not be expanded.
+        """
+
+        def expand():
+            playlist = Playlist(url)
+            title, video_urls = playlist.title, list(playlist.video_urls)
+            try:
+                length = playlist.length
+            except Exception:
+                # Mixes and some auto-generated playlists report no length.
+                length = None
+            return title, video_urls, length
+
+        try:
+            title, video_urls, length = await asyncio.to_thread(expand)
+        except Exception as e:
+            LogHandler.error(f"Failed to expand playlist {url}: {e}")
+            raise InvalidPlaylist from e
+
+        video_ids = [
+            video_id
+            for video_id in [await get_video_id(u) for u in video_urls]
+            if video_id
+        ]
+        fetched_at = datetime.now()
+        if playlist_id is not None:
+            self.database.cache_playlist(playlist_id, title, video_ids, length)
+        return CachedPlaylist(playlist_id, title, video_ids, fetched_at)
@@ -24,53 +24,280 @@
 import asyncio
 import concurrent.futures
 import time
+from typing import Dict, Iterable, List, Optional, Set
 
-from meta_yt import Video
 from termcolor import colored
 
+from . import LogHandler
+from .song import Song
+from .utils import extract_video_id
 
-class Queue:
-    def __init__(self, loop):
-        self.queue = []
-        self.lock = asyncio.Lock()
-        self.loop = loop
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=3)
-
-    async def add(self, song):
-        self.queue.append(song)
-        await asyncio.create_task(self._pre_extract())
-
-    async def remove(self, song):
-        if song in self.queue:
-            self.queue.remove(song)
-            print(colored(text=f"Removed {song.title} from the queue", color="green"))
-            return True
-        print(colored(text=f"{song.title} not found in the queue", color="red"))
-        return False
-
-    async def batch_add_to_queue(self, songs):
-        self.queue.extend(songs)
-        await asyncio.create_task(self._pre_extract())
-
-    async def _pre_extract(self):
-        async with self.lock:
-            for song in self.queue:
-                if not song.extracted_metadata:
-                    await self.extract_metadata(song)
-
-    async def extract_metadata(self, song):
-        try:
-            timer = time.time()
-            video = await self.loop.run_in_executor(self.executor, Video, song.url)
-            song.title = video.title
-            song.views = video.views
-            song.duration = video.duration
-            song.thumbnail = video.thumbnail
-            song.channel = video.channel
-            song.channel_url = video.channel_url
-            song.extracted_metadata = True
-            print(colored(text=f"{song.title} [{song.url}]", color="magenta"))
-            print(colored(text=f"Time taken: {time.time() - timer}", color="dark_grey"))
-        except Exception as e:
-            print(colored(f"Failed to extract {song.url}: {e}", color="red"))
-        return
+
+class QueueHydrator:
+    """
+    Fills in the metadata of songs queued as bare video IDs.
+
+    Large playlists are queued as bare songs so they are enqueued at once.
+    Their metadata is resolved on demand: the songs a queue page shows and the
+    song about to play are hydrated in the foreground, the next few songs are
+    prefetched while the current one plays, and the rest is drained in the
+    background on a small dedicated executor, so it never competes with
+    foreground work for threads. Songs whose metadata cannot be resolved are
+    dropped from the queue.
+
+    Attributes:
+        player (MusicPlayer): The player whose queue is hydrated.
+        executor (concurrent.futures.Executor): The executor background hydration runs on.
+        prefetch_count (int): The number of songs after the current one hydrated ahead of playback.
+        drain_batch (int): The number of songs hydrated per background step.
+        drain_delay (float): Seconds between background steps.
+    """
+
+    def __init__(
+        self,
+        player,
+        executor: concurrent.futures.Executor,
+        prefetch_count: int = 3,
+        drain_batch: int = 10,
+        drain_delay: float = 0.5,
+    ) -> None:
+        """
+        Initializes the QueueHydrator.
+
+        Args:
+            player (MusicPlayer): The player whose queue is hydrated.
+            executor (concurrent.futures.Executor): The executor background hydration runs on.
+            prefetch_count (int, optional): The number of songs hydrated ahead of playback. Defaults to 3.
+            drain_batch (int, optional): The number of songs hydrated per background step. Defaults to 10.
+            drain_delay (float, optional): Seconds between background steps. Defaults to 0.5.
+        """
+        self.player = player
+        self.executor = executor
+        self.prefetch_count = prefetch_count
+        self.drain_batch = drain_batch
+        self.drain_delay = drain_delay
+
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._drain_task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """int: The number of queued songs still awaiting hydration."""
+        return sum(1 for song in self.player.music_queue if not song.extracted_metadata)
+
+    async def _fetch(self, video_id: str, background: bool) -> dict:
+        """
+        Fetches the metadata of a video, sharing the request with concurrent callers.
+
+        Args:
+            video_id (str): The video ID.
+            background (bool): Whether to run on the background executor.
+
+        Returns:
+            dict: The video metadata.
+        """
+        future = self._inflight.get(video_id)
+        if future is None:
+            future = asyncio.get_running_loop().run_in_executor(
+                self.executor if background else None,
+                self.player.metadata_provider.fetch,
+                video_id,
+            )
+            self._inflight[video_id] = future
+            future.add_done_callback(lambda _: self._inflight.pop(video_id, None))
+        return await asyncio.shield(future)
+
+    async def hydrate(
+        self, songs: Iterable[Song], background: bool = False
+    ) -> List[Song]:
+        """
+        Hydrates bare songs from the metadata cache, then from the metadata provider.
+
+        Args:
+            songs (Iterable[Song]): The songs to hydrate. Songs that already hold metadata are skipped.
+            background (bool, optional): Whether to fetch on the background executor. Defaults to False.
+
+        Returns:
+            List[Song]: The songs whose metadata could not be resolved.
+        """
+        bare: Dict[str, List[Song]] = {}
+        for song in songs:
+            if song.extracted_metadata:
+                continue
+            video_id = extract_video_id(song.url)
+            if video_id:
+                bare.setdefault(video_id, []).append(song)
+        if not bare:
+            return []
+
+        metadata_cache = self.player.metadata_cache
+        cached = metadata_cache.get_bulk(list(bare))
+        for video_id, meta in cached.items():
+            for song in bare.pop(video_id):
+                song.hydrate(meta)
+        if cached:
+            self.player.music_queue.touch()
+
+        failed = []
+        for video_id in [
+            video_id for video_id in bare if metadata_cache.is_failed(video_id)
+        ]:
+            failed.extend(bare.pop(video_id))
+        if not bare:
+            return failed
+
+        timer = time.time()
+        hydrated = 0
+        results = await asyncio.gather(
+            *(self._fetch(video_id, background) for video_id in bare),
+            return_exceptions=True,
+        )
+        for (video_id, bare_songs), meta in zip(bare.items(), results):
+            if isinstance(meta, BaseException):
+                metadata_cache.mark_failed(video_id)
+                LogHandler.warning(f"Failed to hydrate {video_id}: {meta}")
+                failed.extend(bare_songs)
+                continue
+            await metadata_cache.put(video_id, meta, buffered=True)
+            for song in bare_songs:
+                song.hydrate(meta)
+            hydrated += len(bare_songs)
+        await metadata_cache.flush()
+        if hydrated:
+            self.player.music_queue.touch()
+
+        print(
+            colored(
+                f"[HYDRATED] {hydrated} songs, Time taken: {time.time() - timer}",
+                "dark_grey",
+            )
+        )
+        return failed
+
+    async def ensure(
+        self, songs: Iterable[Song], background: bool = False
+    ) -> List[Song]:
+        """
+        Hydrates songs and drops the ones that cannot be resolved from the queue.
+
+        The song playing is never dropped.
+
+        Args:
+            songs (Iterable[Song]): The songs to hydrate.
+            background (bool, optional): Whether to fetch on the background executor. Defaults to False.
+
+        Returns:
+            List[Song]: The songs that could not be resolved.
+        """
+        failed = await self.hydrate(songs, background=background)
+        queue = self.player.music_queue
+        for song in failed:
+            if song is self.player._now_playing:
+                continue
+            try:
+                queue.pop(queue.index(song))
+            except (ValueError, IndexError):
+                continue
+            LogHandler.warning(f"Dropped unresolvable song {song.url} from the queue")
+        return failed
+
+    def _spawn(self, coroutine) -> asyncio.Task:
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def prefetch(self) -> None:
+        """
+        Hydrates the songs after the current one in the background.
+        """
+        upcoming = self.player.music_queue[1 : 1 + self.prefetch_count]
+        if any(not song.extracted_metadata for song in upcoming):
+            self._spawn(self.ensure(upcoming))
+
+    def start_drain(self) -> None:
+        """
+        Starts hydrating the whole queue in the background. Safe to call repeatedly.
+        """
+        if self._drain_task is None or self._drain_task.done():
+            self._drain_task = self._spawn(self._drain())
+
+    def _next_batch(self, start: int, attempted: Set[int]) -> tuple:
+        """
+        Collects the next bare songs to hydrate, scanning forward from an index.
+
+        When the scan reaches the end of the queue it wraps around once, up to
+        where it started, to pick up songs moved behind the cursor.
+
+        Args:
+            start (int): The index to scan from.
+            attempted (Set[int]): The entry IDs already collected. Updated in place.
+
+        Returns:
+            tuple: The songs to hydrate, and the index and entry ID of the last entry scanned.
+        """
+        queue = self.player.music_queue
+        batch = []
+        last = (start - 1, None)
+        index, end = start, None
+        wrapped = start == 0
+        while len(batch) < self.drain_batch:
+            stop = index + self.drain_batch
+            chunk = queue.entries(index, stop if end is None else min(stop, end))
+            if not chunk:
+                if wrapped:
+                    break
+                wrapped, index, end = True, 0, start
+                continue
+            for index, entry_id, song in chunk:
+                last = (index, entry_id)
+                if not song.extracted_metadata and entry_id not in attempted:
+                    attempted.add(entry_id)
+                    batch.append(song)
+                    if len(batch) >= self.drain_batch:
+                        break
+            index += 1
+        return batch, last
+
+    async def _drain(self) -> None:
+        """
+        Hydrates the bare songs of the queue in small batches until none are left.
+
+        A cursor on the last entry scanned carries over between batches, so
+        each batch resumes where the previous one stopped instead of scanning
+        from the head again. Each entry is attempted once, so a song that
+        cannot be dropped, such as the one playing, is not retried forever.
+        """
+        attempted: Set[int] = set()
+        cursor = 0
+        last_entry = None
+        while not self.player.removed:
+            if last_entry is not None:
+                try:
+                    cursor = self.player.music_queue.position(last_entry) + 1
+                except KeyError:
+                    # The entry left the queue; resume from its last index.
+                    pass
+            batch, (last_index, last_entry) = self._next_batch(cursor, attempted)
+            if not batch:
+                return
+            cursor = last_index + 1
+            try:
+                failed = await self.ensure(batch, background=True)
+                if failed:
+                    LogHandler.warning(
+                        f"Background hydration could not resolve {len(failed)}/{len(batch)} songs: "
+                        + ", ".join(song.url for song in failed)
+                    )
+            except Exception as e:
+                LogHandler.warning(f"Background hydration failed: {e}")
+            await asyncio.sleep(self.drain_delay)
+
+    def stop(self) -> None:
+        """
+        Cancels the prefetch and background hydration tasks.
+        """
+        for task in list(self._tasks):
+            task.cancel()
+        self._drain_task = None
@@ -21,7 +21,9 @@
 #  ------------------------------------------------------------
 #
 
+import asyncio
 from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
 from . import LogHandler
 from .event_manager import EventManager
@@ -29,6 +31,123 @@ from .exceptions import NothingPlaying
 from .utils import get_video_id
 
 
+class ReplayRecorder:
+    """
+    Buffers replay entries and writes them to the database in batches from a worker thread.
+
+    Recording never waits on the database. The buffer is flushed every
+    ``flush_interval`` seconds, or as soon as it holds ``batch_size`` entries.
+    Before the first flush, the replay rollup is backfilled from the existing
+    history if it is still empty.
+
+    Attributes:
+        database: The database instance to write to.
+        flush_interval (float): Seconds between flushes.
+        batch_size (int): The number of buffered entries that triggers a flush.
+        max_pending (int): The maximum number of entries kept while the database is failing.
+        stats (dict): Metrics about the flushes.
+    """
+
+    def __init__(
+        self,
+        database,
+        flush_interval: float = 5,
+        batch_size: int = 200,
+        max_pending: int = 10000,
+    ) -> None:
+        """
+        Initializes the ReplayRecorder.
+
+        Args:
+            database: The database instance to write to.
+            flush_interval (float, optional): Seconds between flushes. Defaults to 5.
+            batch_size (int, optional): The number of buffered entries that triggers a flush. Defaults to 200.
+            max_pending (int, optional): The maximum number of entries kept while the database is failing. Defaults to 10000.
+        """
+        self.database = database
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.max_pending = max_pending
+        self._pending: List[Tuple[str, str, str, str]] = []
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._backfilled = False
+        self.stats = {"recorded": 0, "written": 0, "flushes": 0, "errors": 0}
+
+    @property
+    def pending(self) -> int:
+        """int: The number of entries not yet written to the database."""
+        return len(self._pending)
+
+    def record(self, entries: List[Tuple[str, str, str, str]]) -> None:
+        """
+        Buffers replay entries.
+
+        Args:
+            entries (List[Tuple[str, str, str, str]]): (user_id, played_at, video_id, guild_id) tuples.
+        """
+        if not entries:
+            return
+        self._pending.extend(entries)
+        self.stats["recorded"] += len(entries)
+        self._ensure_task()
+        if len(self._pending) >= self.batch_size:
+            self._wakeup.set()
+
+    def start(self) -> None:
+        """Starts the flush task on the running event loop if it is not running yet."""
+        self._ensure_task()
+
+    def _ensure_task(self) -> None:
+        """Starts the flush task on the running event loop if it is not running yet."""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def flush(self) -> int:
+        """
+        Writes every buffered entry to the database.
+
+        Returns:
+            int: The number of entries written.
+        """
+        if not self._pending:
+            return 0
+        entries, self._pending = self._pending, []
+        try:
+            await asyncio.to_thread(self.database.add_replay_entries, entries)
+        except Exception as e:
+            self.stats["errors"] += 1
+            LogHandler.error(f"Failed to write {len(entries)} replay entries: {e}")
+            self._pending = (entries + self._pending)[-self.max_pending :]
+            return 0
+        self.stats["flushes"] += 1
+        self.stats["written"] += len(entries)
+        return len(entries)
+
+    async def _run(self) -> None:
+        """Backfills the rollup once, then flushes the buffer periodically until cancelled."""
+        if not self._backfilled:
+            try:
+                await asyncio.to_thread(self.database.backfill_replay_rollup)
+                self._backfilled = True
+            except Exception as e:
+                LogHandler.error(f"Replay rollup backfill failed: {e}")
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def stop(self) -> None:
+        """Cancels the flush task. Buffered entries stay pending."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
 class ReplayHandler(EventManager):
     """
     ReplayHandler class to handle replay events and log them to a database.
@@ -36,17 +155,27 @@ class ReplayHandler(EventManager):
     Attributes:
         manager (EventManager): The event manager instance.
         database: The database instance from the manager.
+        recorder (ReplayRecorder): The buffered writer of replay entries.
+
+    Members joining during a track are recorded with the track's ``played_at``,
+    so every entry of one play shares its timestamp.
     """
 
-    def __init__(self, manager):
+    def __init__(self, manager, flush_interval: float = 5, batch_size: int = 200):
         """
         Initializes the ReplayHandler with the given manager.
 
         Args:
             manager (EventManager): The event manager instance.
+            flush_interval (float, optional): Seconds between replay history writes. Defaults to 5.
+            batch_size (int, optional): The number of buffered replay entries that triggers a write. Defaults to 200.
         """
         self.manager = manager
         self.database = manager.database
+        self.recorder = ReplayRecorder(
+            self.database, flush_interval=flush_interval, batch_size=batch_size
+        )
+        self._played_at: Dict[str, Tuple[str, str]] = {}
 
     @EventManager.listener
     async def track_start(self, player, interaction, before, after):
@@ -59,15 +188,17 @@ class ReplayHandler(EventManager):
             before: The state before the track started.
             after: The state after the track started.
         """
-        for member in player.members:
-            if member.id == player.bot.user.id or member.id is None:
-                continue
-            now_playing = await player.now_playing()
-            video_id = await get_video_id(now_playing.url)
-            LogHandler.info(f"Adding replay entry for {member.global_name}")
-            await self.database.add_replay_entry(
-                str(member.id), (datetime.now().isoformat()), video_id
-            )
+        video_id = await get_video_id(after.url)
+        played_at = datetime.now().isoformat()
+        guild_id = str(player.interaction.guild.id)
+        self._played_at[guild_id] = (video_id, played_at)
+        self.recorder.record(
+            [
+                (str(member.id), played_at, video_id, guild_id)
+                for member in player.members
+                if member.id != player.bot.user.id and member.id is not None
+            ]
+        )
 
     @EventManager.listener
     async def member_joined_voice(self, player, member):
@@ -85,22 +216,24 @@ class ReplayHandler(EventManager):
         except NothingPlaying:
             return
         video_id = await get_video_id(now_playing.url)
-        LogHandler.info(f"Adding replay entry for {member.global_name}")
-        await self.database.add_replay_entry(
-            str(member.id), (datetime.now().isoformat()), video_id
-        )
+        guild_id = str(player.interaction.guild.id)
+        played_video_id, played_at = self._played_at.get(guild_id, (None, None))
+        if played_video_id != video_id:
+            played_at = datetime.now().isoformat()
+        self.recorder.record([(str(member.id), played_at, video_id, guild_id)])
 
 
-def attach(manager):
+def attach(manager, **kwargs):
     """
     Attaches the ReplayHandler to the EventManager.
 
     Args:
         manager: EventManager to attach manager.
+        **kwargs: Keyword arguments passed to the ReplayHandler.
 
     Returns:
         ReplayHandler: The attached handler instance.
     """
-    handler = ReplayHandler(manager)
+    handler = ReplayHandler(manager, **kwargs)
     EventManager.attach(handler)
     return handler
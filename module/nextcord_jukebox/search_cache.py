@@ -0,0 +1,178 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+from urllib import parse
+
+from . import LogHandler
+
+MAX_KEY_LENGTH = 255
+
+
+class SearchCache:
+    """
+    Maps normalised text queries to the video they resolved to, in memory and in the jukebox_search_cache table.
+
+    Only plain text queries are cached, URLs are resolved directly. A resolution
+    is served for ``ttl`` seconds; combined with the metadata cache, a repeated
+    query then needs no request to YouTube at all.
+
+    Attributes:
+        database: The database instance backing the cache.
+        max_size (int): The maximum number of queries kept in memory.
+        ttl (float): Seconds a resolution is served.
+        stats (dict): Hit and miss counters for the cache.
+    """
+
+    def __init__(self, database, max_size: int = 1024, ttl: float = 7 * 86400):
+        """
+        Initializes the SearchCache.
+
+        Args:
+            database: The database instance backing the cache.
+            max_size (int, optional): The maximum number of queries kept in memory. Defaults to 1024.
+            ttl (float, optional): Seconds a resolution is served. Defaults to 7 days.
+        """
+        self.database = database
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[str, Tuple[str, float]] = OrderedDict()
+        self.stats = {
+            "memory_hits": 0,
+            "database_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def normalize(query: str) -> Optional[str]:
+        """
+        Normalises a text query into a cache key.
+
+        Args:
+            query (str): The query as typed by the user.
+
+        Returns:
+            Optional[str]: The cache key, or None if the query is a URL or empty.
+        """
+        query = query.strip()
+        if not query or parse.urlparse(query).scheme in ("http", "https"):
+            return None
+        if re.search(r"(?:youtube\.com|youtu\.be)/", query):
+            return None
+        return " ".join(query.casefold().split())
+
+    def _remember(self, key: str, video_id: str, stored_at: float) -> None:
+        """
+        Stores a resolution in memory, evicting the least recently used entries if needed.
+
+        Args:
+            key (str): The normalised query.
+            video_id (str): The video ID.
+            stored_at (float): The UNIX time the query was resolved.
+        """
+        self._entries[key] = (video_id, stored_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get(self, query: str) -> Optional[str]:
+        """
+        Returns the video a query resolved to, from memory or the database.
+
+        Args:
+            query (str): The query as typed by the user.
+
+        Returns:
+            Optional[str]: The video ID if the query is cached and fresh, None otherwise.
+        """
+        key = self.normalize(query)
+        if key is None:
+            return None
+
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now - entry[1] < self.ttl:
+                self._entries.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return entry[0]
+            del self._entries[key]
+
+        if len(key) <= MAX_KEY_LENGTH:
+            cached = self.database.get_cached_search_result(key)
+            if cached is not None and datetime.now() - cached[
+                "registered_date"
+            ] < timedelta(seconds=self.ttl):
+                self.stats["database_hits"] += 1
+                self._remember(
+                    key, cached["video_id"], cached["registered_date"].timestamp()
+                )
+                return cached["video_id"]
+
+        self.stats["misses"] += 1
+        return None
+
+    def put(self, query: str, video_id: str) -> None:
+        """
+        Stores the video a query resolved to.
+
+        Args:
+            query (str): The query as typed by the user.
+            video_id (str): The video ID.
+        """
+        key = self.normalize(query)
+        if key is None or not video_id:
+            return
+        self._remember(key, video_id, time.time())
+        if len(key) <= MAX_KEY_LENGTH:
+            try:
+                self.database.cache_search_result(key, video_id)
+            except Exception as e:
+                LogHandler.warning(f"Failed to store search result for {key}: {e}")
+
+    def invalidate(self, query: str) -> None:
+        """
+        Drops the resolution of a query, for example when its video became unavailable.
+
+        Args:
+            query (str): The query as typed by the user.
+        """
+        key = self.normalize(query)
+        if key is None:
+            return
+        self._entries.pop(key, None)
+        if len(key) <= MAX_KEY_LENGTH:
+            self.database.delete_search_result(key)
+
+    def clear(self) -> None:
+        """Drops every entry from memory."""
+        self._entries.clear()
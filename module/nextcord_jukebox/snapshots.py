@@ -0,0 +1,174 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+from . import LogHandler
+
+
+class QueueSnapshotter:
+    """
+    Periodically stores compact snapshots of every player's queue.
+
+    Only players whose queue, loop mode, current song or playback progress
+    changed since the last run are written, and all of them are written in a
+    single transaction from a worker thread. The video IDs are only written
+    when the queue version changed since they were last stored; otherwise
+    just the loop mode and elapsed time are updated.
+
+    Attributes:
+        manager (PlayerManager): The manager whose players are snapshotted.
+        interval (float): Seconds between snapshot runs.
+        elapsed_granularity (float): Seconds of playback progress that make a snapshot stale.
+        max_age (float): Seconds after which a stored snapshot is discarded instead of restored.
+        stats (dict): Metrics about the snapshot runs.
+    """
+
+    def __init__(
+        self,
+        manager,
+        interval: float = 30,
+        elapsed_granularity: float = 30,
+        max_age: float = 86400,
+    ) -> None:
+        """
+        Initializes the QueueSnapshotter.
+
+        Args:
+            manager (PlayerManager): The manager whose players are snapshotted.
+            interval (float, optional): Seconds between snapshot runs. Defaults to 30.
+            elapsed_granularity (float, optional): Seconds of playback progress that make a snapshot stale. Defaults to 30.
+            max_age (float, optional): Seconds after which a stored snapshot is discarded instead of restored. Defaults to 1 day.
+        """
+        self.manager = manager
+        self.interval = interval
+        self.elapsed_granularity = elapsed_granularity
+        self.max_age = max_age
+        self._signatures: Dict[int, tuple] = {}
+        self._versions: Dict[int, int] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "runs": 0,
+            "snapshots_written": 0,
+            "states_written": 0,
+            "errors": 0,
+            "last_run_duration": 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        """bool: Whether the background task is running."""
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        """Starts the background task on the running event loop if it is not running yet."""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        """Cancels the background task."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def forget(self, guild_id: int) -> None:
+        """
+        Drops the remembered state of a guild so its next snapshot is written in full.
+
+        Args:
+            guild_id (int): The guild ID.
+        """
+        self._signatures.pop(guild_id, None)
+        self._versions.pop(guild_id, None)
+
+    def _save(self, snapshots: dict, states: dict) -> list:
+        """
+        Saves snapshots and states, then deletes those of players removed while they were taken. Runs in a worker thread.
+
+        Args:
+            snapshots (dict): A dictionary with guild IDs as keys and full snapshot dictionaries as values.
+            states (dict): A dictionary with guild IDs as keys and snapshot states, without video IDs, as values.
+
+        Returns:
+            list: The guild IDs whose snapshots were deleted again.
+        """
+        self.manager.database.save_queue_snapshots(snapshots)
+        self.manager.database.update_queue_snapshot_states(states)
+        removed = [
+            guild_id
+            for guild_id in (*snapshots, *states)
+            if guild_id not in self.manager.players
+        ]
+        if removed:
+            self.manager.database.delete_queue_snapshots(removed)
+        return removed
+
+    async def snapshot_all(self) -> int:
+        """
+        Writes snapshots for every player that changed since the last run.
+
+        Returns:
+            int: The number of snapshots written, full or state only.
+        """
+        timer = time.time()
+        changed = {}
+        states = {}
+        signatures = {}
+        for guild_id, player in list(self.manager.players.items()):
+            signature = player.snapshot_signature(self.elapsed_granularity)
+            if self._signatures.get(guild_id) == signature:
+                continue
+            if self._versions.get(guild_id) == player.music_queue.version:
+                states[guild_id] = player.snapshot_state()
+            else:
+                changed[guild_id] = await player.snapshot()
+            signatures[guild_id] = signature
+
+        if changed or states:
+            try:
+                removed = await asyncio.to_thread(self._save, changed, states)
+                self._signatures.update(signatures)
+                self._versions.update(
+                    (guild_id, signatures[guild_id][0]) for guild_id in changed
+                )
+                for guild_id in removed:
+                    self.forget(guild_id)
+            except Exception as e:
+                self.stats["errors"] += 1
+                LogHandler.error(f"Failed to save queue snapshots: {e}")
+                changed = {}
+                states = {}
+
+        self.stats["runs"] += 1
+        self.stats["snapshots_written"] += len(changed)
+        self.stats["states_written"] += len(states)
+        self.stats["last_run_duration"] = time.time() - timer
+        return len(changed) + len(states)
+
+    async def _run(self) -> None:
+        """Runs the snapshot loop until cancelled."""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.snapshot_all()
@@ -24,8 +24,11 @@
 import asyncio
 import json
 import os
-import threading
-from typing import Dict, Optional
+import time
+import zlib
+from collections import deque
+from typing import Deque, Dict, Iterable, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlsplit
 
 import websockets
 from websockets.server import WebSocketServerProtocol
@@ -34,24 +37,216 @@ from . import LogHandler, __socket_standard_version__
 from .event_manager import EventManager
 from .exceptions import NothingPlaying
 
+SYNC_VERSION = (1, 2, 0)
+SUPPORTED_COMPRESSION = ("zlib",)
+MESSAGE_KINDS = {"playing": "state", "idle": "state", "sync": "sync"}
+
+
+def parse_version(version: Optional[str]) -> Tuple[int, ...]:
+    """
+    Parses a socket standard version string.
+
+    Args:
+        version (Optional[str]): The version, such as "1.2.0".
+
+    Returns:
+        Tuple[int, ...]: The version numbers. Clients that send no valid version are treated as 1.1.0.
+    """
+    try:
+        return tuple(int(part) for part in version.split("."))
+    except (AttributeError, ValueError):
+        return (1, 1, 0)
+
+
+def song_timing(song) -> dict:
+    """
+    Builds the position of a song as absolute server timestamps, so a client can interpolate it locally.
+
+    Args:
+        song: The song playing.
+
+    Returns:
+        dict: The server time, the epoch the song would have started at without pauses, the elapsed
+        seconds from its CountTimer, its duration and whether it is paused.
+    """
+    timer = song.timer
+    elapsed = timer.elapsed
+    now = time.time()
+    return {
+        "server_time": round(now, 3),
+        "started_at": round(now - elapsed, 3),
+        "elapsed": round(elapsed, 3),
+        "duration": song.duration,
+        "paused": timer.paused,
+    }
+
+
+class RPCClient:
+    """
+    A connected RPC client with a coalescing outbound queue.
+
+    Messages are sent in order by a writer task of the client's own, so a slow
+    client only delays itself. Queued messages are coalesced by kind: a full
+    ``state`` message supersedes every queued state and sync message, and a
+    ``sync`` message supersedes the queued sync messages, since each carries
+    absolute values. A client is therefore never left with deltas whose state
+    was dropped. Other messages are never dropped; a client with more than
+    ``max_pending`` of them waiting is disconnected, as is a client that does
+    not accept a message within ``send_timeout`` seconds.
+
+    Attributes:
+        secret (str): The client secret.
+        websocket (WebSocketServerProtocol): The WebSocket connection.
+        version (Tuple[int, ...]): The socket standard version the client speaks.
+        compression (Optional[str]): The negotiated compression, or None.
+        max_pending (int): The maximum number of queued messages.
+        send_timeout (float): Seconds a single send may take.
+        sent (int): The number of messages sent.
+        dropped (int): The number of messages dropped as superseded.
+    """
+
+    def __init__(
+        self,
+        secret: str,
+        websocket: WebSocketServerProtocol,
+        max_pending: int = 8,
+        send_timeout: float = 5,
+        version: Tuple[int, ...] = (1, 1, 0),
+        compression: Optional[str] = None,
+    ) -> None:
+        """
+        Initializes the RPCClient and starts its writer on the running event loop.
+
+        Args:
+            secret (str): The client secret.
+            websocket (WebSocketServerProtocol): The WebSocket connection.
+            max_pending (int, optional): The maximum number of queued messages. Defaults to 8.
+            send_timeout (float, optional): Seconds a single send may take. Defaults to 5.
+            version (Tuple[int, ...], optional): The socket standard version the client speaks. Defaults to 1.1.0.
+            compression (Optional[str], optional): The negotiated compression. Defaults to None.
+        """
+        self.secret = secret
+        self.websocket = websocket
+        self.version = version
+        self.compression = compression
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+        self.sent = 0
+        self.dropped = 0
+
+        self._closed = False
+        self._pending: Deque[Tuple[Optional[str], Union[str, bytes]]] = deque()
+        self._ready = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._writer())
+
+    def send(self, message: Union[str, bytes], kind: Optional[str] = None) -> None:
+        """
+        Queues a message without waiting for it to be sent, dropping the queued messages it supersedes.
+
+        Args:
+            message (Union[str, bytes]): The serialised message, or its compressed form.
+            kind (Optional[str], optional): "state" for full states, "sync" for deltas, or None for messages that are never dropped. Defaults to None.
+        """
+        if self._closed:
+            return
+        if kind is not None:
+            superseded = ("state", "sync") if kind == "state" else ("sync",)
+            kept = deque(item for item in self._pending if item[0] not in superseded)
+            self.dropped += len(self._pending) - len(kept)
+            self._pending = kept
+        if len(self._pending) >= self.max_pending:
+            LogHandler.warning(
+                f"Client {self.secret} overflowed its queue, closing its connection"
+            )
+            self.dropped += len(self._pending) + 1
+            self._pending.clear()
+            self.close()
+            asyncio.get_running_loop().create_task(self.websocket.close())
+            return
+        self._pending.append((kind, message))
+        self._ready.set()
+
+    async def _writer(self) -> None:
+        """Sends the queued messages until the connection closes or stalls."""
+        while True:
+            await self._ready.wait()
+            self._ready.clear()
+            while self._pending:
+                _, message = self._pending.popleft()
+                try:
+                    await asyncio.wait_for(
+                        self.websocket.send(message), self.send_timeout
+                    )
+                except asyncio.TimeoutError:
+                    LogHandler.warning(
+                        f"Client {self.secret} stalled, closing its connection"
+                    )
+                    await self.websocket.close()
+                    return
+                except websockets.exceptions.ConnectionClosed:
+                    return
+                self.sent += 1
+
+    def close(self) -> None:
+        """Stops the writer. Queued messages are discarded."""
+        self._closed = True
+        self._task.cancel()
+
 
 class RPCHandler(EventManager):
     """
     Handles WebSocket connections and dispatches events to clients.
 
+    The server runs on the bot's event loop, the same loop the events are fired
+    on, so connections are only ever touched from that loop.
+
+    Clients negotiate the protocol in the connection path, as
+    ``/<secret>?version=1.2.0&compression=zlib``. Clients from 1.2.0 on are
+    greeted with a ``hello`` message and receive ``sync`` messages: a delta on
+    pause and resume and a low-rate heartbeat while a song plays. Every sync
+    message carries absolute timestamps, so a queued one can be replaced by a
+    newer one. Clients that asked for compression receive
+    messages of ``compress_threshold`` bytes or more as zlib-compressed binary
+    frames; smaller ones stay text.
+
     Attributes:
-        clients (Dict[str, WebSocketServerProtocol]): A dictionary of connected clients.
+        clients (Dict[str, RPCClient]): A dictionary of connected clients.
         port (int): The port on which the WebSocket server listens.
         address (str): The address on which the WebSocket server listens.
         database: The database instance from the manager.
+        max_pending (int): The maximum number of queued messages per client.
+        send_timeout (float): Seconds a single send to a client may take.
+        heartbeat_interval (float): Seconds between position heartbeats, or 0 to disable them.
+        compress_threshold (int): The size in bytes from which messages are compressed.
     """
 
-    def __init__(self, manager) -> None:
+    def __init__(
+        self,
+        manager,
+        max_pending: int = 8,
+        send_timeout: float = 5,
+        heartbeat_interval: float = 15,
+        compress_threshold: int = 512,
+    ) -> None:
         """
         Initializes the RPCHandler with the WebSocket server settings from environment variables.
+
+        Args:
+            manager: The manager instance that provides the database and the players.
+            max_pending (int, optional): The maximum number of queued messages per client. Defaults to 8.
+            send_timeout (float, optional): Seconds a single send to a client may take. Defaults to 5.
+            heartbeat_interval (float, optional): Seconds between position heartbeats, or 0 to disable them. Defaults to 15.
+            compress_threshold (int, optional): The size in bytes from which messages are compressed. Defaults to 512.
         """
-        self.clients: Dict[str, WebSocketServerProtocol] = {}
+        self.clients: Dict[str, RPCClient] = {}
+        self.manager = manager
         self.database = manager.database
+        self.max_pending = max_pending
+        self.send_timeout = send_timeout
+        self.heartbeat_interval = heartbeat_interval
+        self.compress_threshold = compress_threshold
+        self._server_task: Optional[asyncio.Task] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
         ws_port = os.getenv("RPC_WEBSOCKET_PORT")
         ws_address = os.getenv("RPC_WEBSOCKET_IP")
 
@@ -65,6 +260,31 @@ class RPCHandler(EventManager):
 
         self.address: str = ws_address if ws_address is not None else "localhost"
 
+    async def _member_secrets(self, members) -> list:
+        """
+        Resolves the secrets of the registered members in one pass, skipping bots and missing members.
+
+        Args:
+            members: The members to resolve.
+
+        Returns:
+            list: The secrets of the registered members.
+        """
+        members = [
+            member
+            for member in members
+            if member is not None and member != "None" and not member.bot
+        ]
+        user_secrets = self.database.get_user_secrets(member.id for member in members)
+        secrets = []
+        for member in members:
+            user_secret = user_secrets.get(str(member.id))
+            if user_secret is not None:
+                secrets.append(user_secret)
+            else:
+                LogHandler.info(f"Client {member.global_name} not registered")
+        return secrets
+
     @EventManager.listener
     async def track_start(self, player, interaction, before, after) -> None:
         """
@@ -76,26 +296,87 @@ class RPCHandler(EventManager):
             before: The state before the event.
             after: The state after the event.
         """
-        for member in player.members:
-            if member == player.bot or member is None:
+        self.broadcast(
+            await self._member_secrets(player.members),
+            {
+                "version": __socket_standard_version__,
+                "state": "playing",
+                "data": {
+                    "title": after.title,
+                    "url": after.url,
+                    "channel": after.channel,
+                    "thumbnail": after.thumbnail,
+                    "timing": song_timing(after),
+                },
+            },
+        )
+
+    @EventManager.listener
+    async def track_pause(self, player, interaction, song) -> None:
+        """
+        Event listener for when a track is paused. Dispatches a sync delta to clients that support it.
+
+        Args:
+            player: The player instance.
+            interaction: The interaction instance.
+            song: The paused song.
+        """
+        await self.sync(player, song, "pause")
+
+    @EventManager.listener
+    async def track_resume(self, player, interaction, song) -> None:
+        """
+        Event listener for when a track is resumed. Dispatches a sync delta to clients that support it.
+
+        Args:
+            player: The player instance.
+            interaction: The interaction instance.
+            song: The resumed song.
+        """
+        await self.sync(player, song, "resume")
+
+    async def sync(self, player, song, event: str) -> int:
+        """
+        Dispatches the position of a song to the members of a player whose clients support sync messages.
+
+        Args:
+            player: The player instance.
+            song: The song playing.
+            event (str): What caused the message, such as "pause", "resume", "seek" or "heartbeat".
+
+        Returns:
+            int: The number of clients the message was queued for.
+        """
+        timing = song_timing(song)
+        del timing["duration"]
+        return self.broadcast(
+            await self._member_secrets(player.members),
+            {
+                "version": __socket_standard_version__,
+                "state": "sync",
+                "data": {"event": event, **timing},
+            },
+            min_version=SYNC_VERSION,
+        )
+
+    async def _heartbeat(self) -> None:
+        """Periodically dispatches the position of every playing song."""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if not any(
+                client.version >= SYNC_VERSION for client in self.clients.values()
+            ):
                 continue
-            user_secret: Optional[str] = await self.database.get_user_secret(member.id)
-            if user_secret is not None:
-                await self.dispatch(
-                    user_secret,
-                    {
-                        "version": __socket_standard_version__,
-                        "state": "playing",
-                        "data": {
-                            "title": after.title,
-                            "url": after.url,
-                            "channel": after.channel,
-                            "thumbnail": after.thumbnail,
-                        },
-                    },
-                )
-            else:
-                LogHandler.info(f"Client {member.global_name} not registered")
+            for player in list(self.manager.players.values()):
+                if not player.connected:
+                    continue
+                try:
+                    song = await player.now_playing()
+                    await self.sync(player, song, "heartbeat")
+                except NothingPlaying:
+                    continue
+                except Exception as e:
+                    LogHandler.error(f"Failed to send a heartbeat: {e}")
 
     @EventManager.listener
     async def queue_ended(self, player, interaction) -> None:
@@ -106,24 +387,14 @@ class RPCHandler(EventManager):
             player: The player instance.
             interaction: The interaction instance.
         """
-        for member in player.members:
-            if member == player.bot or member is None or member == "None":
-                continue
-            user_secret: Optional[str] = await self.database.get_user_secret(member.id)
-            if user_secret is not None:
-                await self.dispatch(
-                    user_secret,
-                    {
-                        "version": __socket_standard_version__,
-                        "state": "idle",
-                        "data": {},
-                    },
-                )
-                LogHandler.info(
-                    f"Dispatched queue_ended to {user_secret}[{member.global_name}]"
-                )
-            else:
-                LogHandler.info(f"Client {member.global_name} not registered")
+        self.broadcast(
+            await self._member_secrets(player.members),
+            {
+                "version": __socket_standard_version__,
+                "state": "idle",
+                "data": {},
+            },
+        )
 
     @EventManager.listener
     async def member_joined_voice(self, player, member) -> None:
@@ -134,29 +405,24 @@ class RPCHandler(EventManager):
             player: The player instance.
             member: The member who joined the voice channel.
         """
-        if member == player.bot or member is None:
-            return
-        user_secret: Optional[str] = await self.database.get_user_secret(member.id)
         try:
             now_playing = await player.now_playing()
         except NothingPlaying:
             return
-        if user_secret is not None:
-            await self.dispatch(
-                user_secret,
-                {
-                    "version": __socket_standard_version__,
-                    "state": "playing",
-                    "data": {
-                        "title": now_playing.title,
-                        "url": now_playing.url,
-                        "channel": now_playing.channel,
-                        "thumbnail": now_playing.thumbnail,
-                    },
+        self.broadcast(
+            await self._member_secrets([member]),
+            {
+                "version": __socket_standard_version__,
+                "state": "playing",
+                "data": {
+                    "title": now_playing.title,
+                    "url": now_playing.url,
+                    "channel": now_playing.channel,
+                    "thumbnail": now_playing.thumbnail,
+                    "timing": song_timing(now_playing),
                 },
-            )
-        else:
-            LogHandler.info(f"Client {member.global_name} not registered")
+            },
+        )
 
     @EventManager.listener
     async def member_left_voice(self, player, member) -> None:
@@ -167,33 +433,60 @@ class RPCHandler(EventManager):
             player: The player instance.
             member: The member who left the voice channel.
         """
-        if member == player.bot or member is None or member == "None":
-            return
-        user_secret: Optional[str] = await self.database.get_user_secret(member.id)
-        if user_secret is not None:
-            await self.dispatch(
-                user_secret,
-                {
-                    "version": __socket_standard_version__,
-                    "state": "idle",
-                    "data": {},
-                },
-            )
-            LogHandler.info(f"Dispatched idle to {user_secret}[{member.global_name}]")
-        else:
-            LogHandler.info(f"Client {member.global_name} not registered")
+        self.broadcast(
+            await self._member_secrets([member]),
+            {
+                "version": __socket_standard_version__,
+                "state": "idle",
+                "data": {},
+            },
+        )
 
-    async def handler(self, websocket: WebSocketServerProtocol, path: str) -> None:
+    async def handler(
+        self, websocket: WebSocketServerProtocol, path: Optional[str] = None
+    ) -> None:
         """
         Handles incoming WebSocket connections and messages.
 
         Args:
             websocket (WebSocketServerProtocol): The WebSocket connection instance.
-            path (str): The path of the WebSocket connection.
+            path (Optional[str], optional): The path of the WebSocket connection. Defaults to the path of the connection's request.
         """
-        secret: str = path.strip("/")
-        self.clients[secret] = websocket
+        if path is None:
+            path = getattr(websocket, "path", None) or websocket.request.path
+        url = urlsplit(path)
+        query = parse_qs(url.query)
+        secret: str = url.path.strip("/")
+        version = parse_version(query.get("version", [None])[0])
+        compression = query.get("compression", [None])[0]
+        if version < SYNC_VERSION or compression not in SUPPORTED_COMPRESSION:
+            compression = None
+        client = RPCClient(
+            secret,
+            websocket,
+            max_pending=self.max_pending,
+            send_timeout=self.send_timeout,
+            version=version,
+            compression=compression,
+        )
+        previous = self.clients.get(secret)
+        if previous is not None:
+            previous.close()
+        self.clients[secret] = client
         LogHandler.info(f"Client {secret} connected")
+        if version >= SYNC_VERSION:
+            self.broadcast(
+                [secret],
+                {
+                    "version": __socket_standard_version__,
+                    "state": "hello",
+                    "data": {
+                        "compression": compression,
+                        "heartbeat": self.heartbeat_interval,
+                        "server_time": round(time.time(), 3),
+                    },
+                },
+            )
 
         try:
             async for message in websocket:
@@ -201,7 +494,48 @@ class RPCHandler(EventManager):
         except websockets.exceptions.ConnectionClosed as e:
             LogHandler.info(f"Client {secret} disconnected: {e}")
         finally:
-            del self.clients[secret]
+            client.close()
+            if self.clients.get(secret) is client:
+                del self.clients[secret]
+
+    def broadcast(
+        self,
+        secrets: Iterable[str],
+        data: dict,
+        min_version: Optional[Tuple[int, ...]] = None,
+    ) -> int:
+        """
+        Queues a message for several clients, serialising and compressing it at most once. Does not wait for the sends.
+
+        Args:
+            secrets (Iterable[str]): The client secrets.
+            data (dict): The data to be sent.
+            min_version (Optional[Tuple[int, ...]], optional): Skips clients speaking an older version. Defaults to None.
+
+        Returns:
+            int: The number of connected clients the message was queued for.
+        """
+        message = json.dumps(data, separators=(",", ":"))
+        kind = MESSAGE_KINDS.get(data.get("state"))
+        compressed = None
+        queued = 0
+        for secret in secrets:
+            client = self.clients.get(secret)
+            if client is None:
+                LogHandler.info(f"Client {secret} not connected")
+                continue
+            if min_version is not None and client.version < min_version:
+                continue
+            if client.compression and len(message) >= self.compress_threshold:
+                if compressed is None:
+                    compressed = zlib.compress(message.encode())
+                client.send(compressed, kind)
+            else:
+                client.send(message, kind)
+            queued += 1
+        if queued:
+            LogHandler.info(f"Dispatched message to {queued} clients: {message}")
+        return queued
 
     async def dispatch(self, secret: str, data: dict) -> None:
         """
@@ -211,47 +545,62 @@ class RPCHandler(EventManager):
             secret (str): The client secret.
             data (dict): The data to be sent.
         """
-        data = json.dumps(data)
-        if secret in self.clients:
-            await self.clients[secret].send(data)
-            LogHandler.info(f"Dispatched message to client {secret}: {data}")
-        else:
-            LogHandler.info(f"Client {secret} not connected")
+        self.broadcast([secret], data)
 
-    async def start_server(self) -> None:
-        """Starts the WebSocket server."""
-        async with websockets.serve(self.handler, self.address, self.port):
-            LogHandler.info(
-                f"WebSocket server started on ws://{self.address}:{self.port}"
+    def start(self) -> None:
+        """
+        Starts the WebSocket server on the running event loop. Safe to call repeatedly.
+        """
+        if self._server_task is None:
+            self._server_task = asyncio.get_running_loop().create_task(
+                self.start_server()
+            )
+        if self._heartbeat_task is None and self.heartbeat_interval > 0:
+            self._heartbeat_task = asyncio.get_running_loop().create_task(
+                self._heartbeat()
             )
-            await asyncio.Future()
 
+    async def start_server(self) -> None:
+        """Starts the WebSocket server."""
+        try:
+            async with websockets.serve(self.handler, self.address, self.port):
+                LogHandler.info(
+                    f"WebSocket server started on ws://{self.address}:{self.port}"
+                )
+                await asyncio.Future()
+        except OSError as e:
+            LogHandler.error(f"Failed to start the WebSocket server: {e}")
 
-def start_websocket_server(handler: RPCHandler) -> None:
-    """
-    Starts the WebSocket server using the provided handler.
+    def stats(self) -> dict:
+        """
+        Reports the connected clients and their queues.
 
-    Args:
-        handler (RPCHandler): The handler instance to use for the WebSocket server.
-    """
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    loop.run_until_complete(handler.start_server())
-    loop.run_forever()
+        Returns:
+            dict: The protocol version, compression and number of sent, dropped and pending messages per client secret.
+        """
+        return {
+            secret: {
+                "version": ".".join(map(str, client.version)),
+                "compression": client.compression,
+                "sent": client.sent,
+                "dropped": client.dropped,
+                "pending": len(client._pending),
+            }
+            for secret, client in self.clients.items()
+        }
 
 
-def attach(manager) -> RPCHandler:
+def attach(manager, **kwargs) -> RPCHandler:
     """
-    Attaches the RPCHandler to the EventManager and starts the WebSocket server in a separate thread.
+    Attaches the RPCHandler to the EventManager. The WebSocket server is started by ``RPCHandler.start``.
 
     Args:
         manager: The manager instance that provides the database and other services.
+        **kwargs: Keyword arguments for RPCHandler.
 
     Returns:
         RPCHandler: The attached handler instance.
     """
-    handler = RPCHandler(manager)
+    handler = RPCHandler(manager, **kwargs)
     EventManager.attach(handler)
-    websocket_thread = threading.Thread(target=start_websocket_server, args=(handler,))
-    websocket_thread.start()
     return handler
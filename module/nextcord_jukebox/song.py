@@ -21,29 +21,94 @@
 #  ------------------------------------------------------------
 #
 
+import sys
 from typing import List, Optional
 
 from .timer import CountTimer
+from .utils import extract_video_id
+
+# Only the qualities YouTube generates for every video; sddefault and
+# maxresdefault are missing for many uploads.
+THUMBNAIL_QUALITIES = (
+    "default",
+    "mqdefault",
+    "hqdefault",
+)
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """
+    Interns a string shared by many songs, such as a channel name.
+
+    Args:
+        value (Optional[str]): The string to intern.
+
+    Returns:
+        Optional[str]: The interned string, or the value unchanged if it is not a string.
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _pick_thumbnail(
+    url: str, thumbnail: Optional[str], thumbnails: Optional[list]
+) -> str:
+    """
+    Picks the thumbnail URL to store for a song.
+
+    Args:
+        url (str): The URL of the song.
+        thumbnail (Optional[str]): The thumbnail URL, if one is given.
+        thumbnails (Optional[list]): Thumbnail URLs, or dictionaries with a "url" key, from lowest to highest quality.
+
+    Returns:
+        str: The given thumbnail, else the best of thumbnails, else the hqdefault thumbnail of the video.
+    """
+    if thumbnail:
+        return thumbnail
+    if thumbnails:
+        best = thumbnails[-1]
+        return best["url"] if isinstance(best, dict) else best
+    video_id = extract_video_id(url)
+    return f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg" if video_id else ""
 
 
 class Song:
     """
     A class to represent a song with various attributes and a timer.
 
+    Songs are slotted and keep only what a queue needs. The playback timer is
+    created when the song starts, and the thumbnail list is derived from the
+    video ID when it is asked for. A song created from a bare video ID holds no
+    metadata until it is hydrated.
+
     Attributes:
         url (str): The URL of the song.
         title (Optional[str]): The title of the song.
+        name (Optional[str]): Alias of the title.
         views (Optional[int]): The number of views of the song.
         duration (Optional[int]): The duration of the song in seconds.
         thumbnail (Optional[str]): The URL of the song's thumbnail.
         channel (Optional[str]): The name of the channel that uploaded the song.
         channel_url (Optional[str]): The URL of the channel that uploaded the song.
-        thumbnails (Optional[List[str]]): A list of thumbnail URLs for the song.
+        thumbnails (List[str]): The thumbnail URLs of the song, from lowest to highest quality.
         timer (CountTimer): An instance of CountTimer to track the song's playback time.
         source_url (Optional[str]): The source URL of the song.
-        extracted_metadata (bool): A flag indicating whether metadata has been extracted.
+        extracted_metadata (bool): Whether the song holds its metadata, False for a bare video ID awaiting hydration.
     """
 
+    __slots__ = (
+        "url",
+        "title",
+        "views",
+        "duration",
+        "thumbnail",
+        "channel",
+        "channel_url",
+        "source_url",
+        "extracted_metadata",
+        "_timer",
+    )
+
     def __init__(
         self,
         url: str,
@@ -53,7 +118,7 @@ class Song:
         thumbnail: Optional[str] = None,
         channel: Optional[str] = None,
         channel_url: Optional[str] = None,
-        thumbnails: Optional[List[str]] = None,
+        thumbnails: Optional[list] = None,
     ) -> None:
         """
         Initializes a Song instance with the given attributes.
@@ -66,28 +131,97 @@ class Song:
             thumbnail (Optional[str]): The URL of the song's thumbnail.
             channel (Optional[str]): The name of the channel that uploaded the song.
             channel_url (Optional[str]): The URL of the channel that uploaded the song.
-            thumbnails (Optional[List[str]]): A list of thumbnail URLs for the song.
+            thumbnails (Optional[list]): A list of thumbnail URLs, or dictionaries with a "url" key, for the song. Only used to pick a thumbnail when none is given.
         """
         self.url: str = url
-        self.title: Optional[str] = title or "Unknown"
-        self.name: Optional[str] = title or "Unknown"
-        self.views: Optional[int] = views or 0
-        self.duration: Optional[int] = duration or 1
-        self.thumbnail: Optional[str] = thumbnail or ""
-        self.channel: Optional[str] = channel or "Unknown"
-        self.channel_url: Optional[str] = channel_url or ""
-        self.thumbnails: Optional[List[str]] = thumbnails or []
-
-        if self.duration < 1:
-            self.duration = 1
-
-        self.timer: CountTimer = CountTimer()
+        self.title: str = title or "Unknown"
+        self.views: int = views or 0
+        self.duration: int = max(duration or 1, 1)
+        self.thumbnail: str = _pick_thumbnail(url, thumbnail, thumbnails)
+        self.channel: str = _intern(channel or "Unknown")
+        self.channel_url: str = _intern(channel_url or "")
         self.source_url: Optional[str] = None
-        self.extracted_metadata: bool = False
+        self.extracted_metadata: bool = True
+        self._timer: Optional[CountTimer] = None
+
+    @classmethod
+    def from_video_id(cls, video_id: str) -> "Song":
+        """
+        Creates a song holding only its video ID, to be hydrated later.
+
+        Args:
+            video_id (str): The video ID.
+
+        Returns:
+            Song: The bare song.
+        """
+        song = cls(f"https://www.youtube.com/watch?v={video_id}")
+        song.extracted_metadata = False
+        return song
+
+    def hydrate(self, meta: dict) -> None:
+        """
+        Fills in the metadata of the song.
+
+        Args:
+            meta (dict): The video metadata, as accepted by the constructor.
+        """
+        self.title = meta.get("title") or "Unknown"
+        self.views = meta.get("views") or 0
+        self.duration = max(meta.get("duration") or 1, 1)
+        self.thumbnail = _pick_thumbnail(
+            self.url, meta.get("thumbnail"), meta.get("thumbnails")
+        )
+        self.channel = _intern(meta.get("channel") or "Unknown")
+        self.channel_url = _intern(meta.get("channel_url") or "")
+        self.extracted_metadata = True
+
+    @property
+    def name(self) -> str:
+        """str: Alias of the title."""
+        return self.title
+
+    @name.setter
+    def name(self, value: str) -> None:
+        self.title = value
+
+    @property
+    def timer(self) -> CountTimer:
+        """CountTimer: The playback timer, created on first use."""
+        if self._timer is None:
+            self._timer = CountTimer()
+        return self._timer
+
+    @property
+    def thumbnails(self) -> List[str]:
+        """List[str]: The thumbnail URLs of the song, from lowest to highest quality."""
+        video_id = extract_video_id(self.url)
+        if video_id is None:
+            return [self.thumbnail] if self.thumbnail else []
+        return [
+            f"https://i.ytimg.com/vi/{video_id}/{quality}.jpg"
+            for quality in THUMBNAIL_QUALITIES
+        ]
+
+    def memory_estimate(self) -> int:
+        """
+        Estimates the memory held by the song, its attributes and its timer.
+
+        Returns:
+            int: The estimated size in bytes.
+        """
+        size = sys.getsizeof(self)
+        size += sum(
+            sys.getsizeof(getattr(self, slot))
+            for slot in ("url", "title", "thumbnail", "source_url")
+        )
+        if self._timer is not None:
+            size += sys.getsizeof(self._timer)
+        return size
 
     async def reset(self) -> None:
         """Resets the song's timer."""
-        self.timer.reset()
+        self._timer = None
 
     async def resume(self) -> None:
         """Resumes the song's timer."""
@@ -97,6 +231,11 @@ class Song:
         """Pauses the song's timer."""
         self.timer.pause()
 
-    async def start(self) -> None:
-        """Starts the song's timer."""
-        self.timer.start()
+    async def start(self, offset: float = 0.0) -> None:
+        """
+        Starts the song's timer.
+
+        Args:
+            offset (float): Seconds of the song already played. Defaults to 0.0.
+        """
+        self.timer.start(offset)
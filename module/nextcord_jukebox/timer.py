@@ -37,6 +37,8 @@ class CountTimer:
         paused (bool): Indicates if the timer is paused.
     """
 
+    __slots__ = ("_time_started", "_timepaused", "paused", "duration")
+
     def __init__(self, duration: int = 0) -> None:
         """
         Initialize the CountTimer with a specified duration.
@@ -58,9 +60,14 @@ class CountTimer:
         """
         self.__init__(duration)
 
-    def start(self) -> None:
-        """Start the timer."""
-        self._time_started = time.time()
+    def start(self, offset: float = 0.0) -> None:
+        """
+        Start the timer.
+
+        Args:
+            offset (float): Seconds to count as already elapsed. Default is 0.0.
+        """
+        self._time_started = time.time() - offset
         self.paused = False
 
     def pause(self) -> None:
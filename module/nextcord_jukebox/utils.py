@@ -28,9 +28,9 @@ import string
 from typing import Optional
 
 
-async def generate_secret(length: int = 16) -> str:
+def make_secret(length: int = 16) -> str:
     """
-    Generate a random secret string of a specified length.
+    Generate a random secret string of a specified length without awaiting.
 
     Args:
         length (int, optional): Length of the generated secret string (default is 16).
@@ -43,6 +43,19 @@ async def generate_secret(length: int = 16) -> str:
     )
 
 
+async def generate_secret(length: int = 16) -> str:
+    """
+    Generate a random secret string of a specified length.
+
+    Args:
+        length (int, optional): Length of the generated secret string (default is 16).
+
+    Returns:
+        str: Randomly generated secret string consisting of alphanumeric characters.
+    """
+    return make_secret(length)
+
+
 async def get_playlist_id(url: str) -> Optional[str]:
     """
     Extracts the playlist ID from a YouTube playlist URL.
@@ -60,6 +73,25 @@ async def get_playlist_id(url: str) -> Optional[str]:
     )
 
 
+VIDEO_ID_PATTERN = re.compile(
+    r"(?:https?://)?(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/|youtube\.com/v/)(["
+    r"a-zA-Z0-9_-]{11})"
+)
+
+
+def extract_video_id(url: str) -> Optional[str]:
+    """
+    Extracts the video ID from a YouTube video URL without awaiting.
+
+    Args:
+        url (str): YouTube video URL.
+
+    Returns:
+        Optional[str]: Video ID extracted from the URL, or None if no valid ID found.
+    """
+    return match.group(1) if (match := VIDEO_ID_PATTERN.search(url)) else None
+
+
 async def get_video_id(url: str) -> Optional[str]:
     """
     Extracts the video ID from a YouTube video URL.
@@ -70,17 +102,7 @@ async def get_video_id(url: str) -> Optional[str]:
     Returns:
         Optional[str]: Video ID extracted from the URL, or None if no valid ID found.
     """
-    return (
-        match.group(1)
-        if (
-            match := re.search(
-                r"(?:https?://)?(?:www\.)?(?:youtube\.com/watch\?v=|youtu\.be/|youtube\.com/embed/|youtube\.com/v/)(["
-                r"a-zA-Z0-9_-]{11})",
-                url,
-            )
-        )
-        else None
-    )
+    return extract_video_id(url)
 
 
 def to_timestamp(dt: datetime.datetime) -> int:
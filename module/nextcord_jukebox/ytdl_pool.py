@@ -0,0 +1,221 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import asyncio
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import yt_dlp
+
+from . import LogHandler
+
+yt_dlp.utils.bug_reports_message = lambda *args, **kwargs: ""
+YTDL_OPTIONS = {
+    "format": "bestaudio[acodec=opus]/bestaudio/best",
+    "noplaylist": True,
+    "ignoreerrors": True,
+    "quiet": True,
+    "no_warnings": True,
+    "source_address": "0.0.0.0",
+    "forceip": "4",
+    "skip_download": True,
+    "extract_flat": True,
+    "default_search": "auto",
+}
+
+
+class PooledYoutubeDL:
+    """
+    A YoutubeDL instance owned by a YTDLPool.
+
+    Attributes:
+        index (int): The position of the instance in the pool.
+        instance (yt_dlp.YoutubeDL): The YoutubeDL instance.
+        extractions (int): How many extractions the instance ran.
+        errors (int): How many of those extractions raised.
+        busy_time (float): The total seconds the instance spent extracting.
+    """
+
+    __slots__ = ("index", "instance", "extractions", "errors", "busy_time")
+
+    def __init__(self, index: int, options: dict) -> None:
+        self.index = index
+        self.instance = yt_dlp.YoutubeDL(dict(options))
+        self.extractions = 0
+        self.errors = 0
+        self.busy_time = 0.0
+
+    def stats(self) -> Dict[str, float]:
+        """Dict[str, float]: The extraction statistics of the instance."""
+        return {
+            "index": self.index,
+            "extractions": self.extractions,
+            "errors": self.errors,
+            "busy_time": round(self.busy_time, 3),
+        }
+
+
+class YTDLPool:
+    """
+    A fixed-size pool of YoutubeDL instances for extractions from executor threads.
+
+    YoutubeDL keeps per-instance state and is not safe to share between threads,
+    so every extraction checks out an instance of its own. Instances are created
+    on demand up to ``size``, or all at once by ``warm_up``. When every instance is
+    busy, a checkout blocks until one is returned.
+
+    Attributes:
+        options (dict): The options every instance is created with.
+        size (int): The maximum number of instances.
+    """
+
+    def __init__(self, options: Optional[dict] = None, size: int = 4) -> None:
+        """
+        Initializes the YTDLPool without creating any instance.
+
+        Args:
+            options (Optional[dict], optional): The YoutubeDL options. Defaults to YTDL_OPTIONS.
+            size (int, optional): The maximum number of instances. Defaults to 4.
+
+        Raises:
+            ValueError: If the size is smaller than 1.
+        """
+        if size < 1:
+            raise ValueError("The pool size must be at least 1")
+
+        self.options = dict(options or YTDL_OPTIONS)
+        self.size = size
+
+        self._instances: List[PooledYoutubeDL] = []
+        self._idle: "queue.LifoQueue[PooledYoutubeDL]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._waits = 0
+        self._wait_time = 0.0
+        self._warming = False
+
+    def _create(self) -> Optional[PooledYoutubeDL]:
+        """
+        Creates an instance if the pool is not full.
+
+        Returns:
+            Optional[PooledYoutubeDL]: The new instance, or None if the pool is full.
+        """
+        with self._lock:
+            if len(self._instances) >= self.size:
+                return None
+            pooled = PooledYoutubeDL(len(self._instances), self.options)
+            self._instances.append(pooled)
+            return pooled
+
+    def warm_up(self) -> None:
+        """
+        Creates every instance and loads its YouTube extractor, so the first extractions do not pay for it.
+        """
+        timer = time.time()
+        while True:
+            pooled = self._create()
+            if pooled is None:
+                break
+            try:
+                pooled.instance.get_info_extractor("Youtube")
+            except Exception as e:
+                LogHandler.warning(f"Failed to warm up YoutubeDL instance: {e}")
+            self._idle.put(pooled)
+        LogHandler.info(
+            f"Warmed up {len(self._instances)} YoutubeDL instances in {time.time() - timer:.2f}s"
+        )
+
+    def start(self) -> None:
+        """
+        Warms up the pool in a worker thread. Safe to call repeatedly.
+        """
+        if self._warming:
+            return
+        self._warming = True
+        asyncio.get_running_loop().run_in_executor(None, self.warm_up)
+
+    @contextmanager
+    def checkout(self) -> Iterator[PooledYoutubeDL]:
+        """
+        Checks out an instance for the duration of the block.
+
+        Yields:
+            PooledYoutubeDL: An instance no other thread is using.
+        """
+        try:
+            pooled = self._idle.get_nowait()
+        except queue.Empty:
+            pooled = self._create()
+            if pooled is None:
+                timer = time.time()
+                pooled = self._idle.get()
+                with self._lock:
+                    self._waits += 1
+                    self._wait_time += time.time() - timer
+        try:
+            yield pooled
+        finally:
+            self._idle.put(pooled)
+
+    def extract_info(self, url: str, **kwargs) -> Optional[dict]:
+        """
+        Runs ``extract_info`` on a checked out instance. Blocking, meant for executor threads.
+
+        Args:
+            url (str): The URL or search query.
+            **kwargs: Keyword arguments for ``YoutubeDL.extract_info``.
+
+        Returns:
+            Optional[dict]: The extracted info.
+        """
+        with self.checkout() as pooled:
+            timer = time.time()
+            try:
+                return pooled.instance.extract_info(url, **kwargs)
+            except Exception:
+                pooled.errors += 1
+                raise
+            finally:
+                pooled.extractions += 1
+                pooled.busy_time += time.time() - timer
+
+    def stats(self) -> dict:
+        """
+        Reports the pool usage and the statistics of each instance.
+
+        Returns:
+            dict: The pool size, created and idle instance counts, checkout waits and per-instance statistics.
+        """
+        with self._lock:
+            instances = [pooled.stats() for pooled in self._instances]
+            return {
+                "size": self.size,
+                "created": len(instances),
+                "idle": self._idle.qsize(),
+                "waits": self._waits,
+                "wait_time": round(self._wait_time, 3),
+                "instances": instances,
+            }
@@ -0,0 +1,169 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import resource
+import subprocess
+import sys
+import time
+
+from termcolor import colored
+
+# Compares the CPU cost per stream of the jukebox audio modes. FFmpeg is run with
+# the same arguments the player uses and its output is drained as fast as possible,
+# so the numbers are CPU seconds spent per second of audio.
+#
+# Usage: python test/audio_pipeline_bench.py [file or YouTube URL] [seconds]
+
+SOURCE = sys.argv[1] if len(sys.argv) > 1 else None
+SECONDS = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+GAIN_DB = -6.0
+
+if SOURCE is None:
+    SOURCE = "/tmp/audio_pipeline_bench.webm"
+    subprocess.run(
+        [
+            "ffmpeg",
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "lavfi",
+            "-i",
+            f"sine=frequency=440:duration={SECONDS}",
+            "-ac",
+            "2",
+            "-ar",
+            "48000",
+            "-c:a",
+            "libopus",
+            "-b:a",
+            "128k",
+            SOURCE,
+        ],
+        check=True,
+    )
+elif SOURCE.startswith("http"):
+    import yt_dlp
+
+    ydl = yt_dlp.YoutubeDL(
+        {"format": "bestaudio[acodec=opus]/bestaudio/best", "quiet": True}
+    )
+    data = ydl.extract_info(SOURCE, download=False)
+    print(colored(f"Source codec: {data.get('acodec')}", "dark_grey"))
+    SOURCE = data["url"]
+
+MODES = {
+    "passthrough": ["-vn", "-f", "opus", "-c:a", "copy"],
+    "gain": [
+        "-vn",
+        "-af",
+        f"volume={GAIN_DB}dB",
+        "-f",
+        "opus",
+        "-c:a",
+        "libopus",
+        "-ar",
+        "48000",
+        "-ac",
+        "2",
+        "-b:a",
+        "128k",
+    ],
+    "loudnorm": [
+        "-vn",
+        "-af",
+        "loudnorm",
+        "-f",
+        "opus",
+        "-c:a",
+        "libopus",
+        "-ar",
+        "48000",
+        "-ac",
+        "2",
+        "-b:a",
+        "128k",
+    ],
+    "loudnorm_pcm": [
+        "-vn",
+        "-af",
+        "loudnorm",
+        "-f",
+        "s16le",
+        "-ar",
+        "48000",
+        "-ac",
+        "2",
+    ],
+}
+
+
+def encode_pcm(pcm: bytes) -> float:
+    """
+    Encodes PCM to Opus the way the voice client does for PCM sources.
+
+    Args:
+        pcm (bytes): Raw 48kHz stereo s16le audio.
+
+    Returns:
+        float: The CPU seconds spent encoding, or 0.0 if libopus is unavailable.
+    """
+    try:
+        from nextcord import opus
+
+        encoder = opus.Encoder()
+    except Exception as e:
+        print(colored(f"Skipping client-side Opus encode: {e}", "yellow"))
+        return 0.0
+
+    frame = opus.Encoder.FRAME_SIZE
+    start = time.process_time()
+    for offset in range(0, len(pcm) - frame + 1, frame):
+        encoder.encode(pcm[offset : offset + frame], opus.Encoder.SAMPLES_PER_FRAME)
+    return time.process_time() - start
+
+
+results = {}
+for mode, options in MODES.items():
+    before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    wall = time.time()
+    process = subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-t", str(SECONDS), "-i", SOURCE]
+        + options
+        + ["pipe:1"],
+        stdout=subprocess.PIPE,
+        check=True,
+    )
+    after = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    ffmpeg_cpu = (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime)
+    client_cpu = encode_pcm(process.stdout) if mode == "loudnorm_pcm" else 0.0
+    results[mode] = (ffmpeg_cpu, client_cpu, time.time() - wall)
+
+print(colored(f"Audio length: {SECONDS}s", "dark_grey"))
+for mode, (ffmpeg_cpu, client_cpu, wall) in results.items():
+    total = ffmpeg_cpu + client_cpu
+    print(
+        f"{mode:<12} ffmpeg {ffmpeg_cpu:7.3f}s  client {client_cpu:7.3f}s  "
+        f"total {total:7.3f}s  ({total / SECONDS * 100:6.2f}% of one core per stream, wall {wall:.2f}s)"
+    )
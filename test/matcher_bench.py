@@ -0,0 +1,213 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from module.matcher import QueueSearchIndex, SongMatcher
+from module.nextcord_jukebox.music_queue import MusicQueue
+from module.nextcord_jukebox.song import Song
+
+# Times queue searches over a synthetic multilingual corpus shaped like real
+# queues (utaite covers, MVs, anime songs, K-pop, Mandopop), comparing the
+# previous unbounded matcher against the bounded one and the queue index.
+
+SONGS = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+ROUNDS = 3
+
+ARTISTS = [
+    "アステル・レダ",
+    "カグラナナ",
+    "戌亥とこ",
+    "夢追翔",
+    "町田ちま",
+    "七海うらら",
+    "竜胆 尊 / Rindou Mikoto",
+    "Kaga Sumire",
+    "HoneyWorks",
+    "YOASOBI",
+    "Ado",
+    "米津玄師",
+    "Aimer",
+    "LiSA",
+    "Justin Bieber",
+    "Taylor Swift",
+    "BTS",
+    "아이유",
+    "뉴진스",
+    "周杰倫",
+    "鄧紫棋",
+    "五月天",
+    "Oishi Masayoshi",
+    "VOCALOID",
+    "初音ミク",
+]
+TITLES = [
+    "夕刻、夢ト見紛ウ",
+    "一度だけの恋なら",
+    "仮死化",
+    "可愛くてごめん",
+    "でんでんぱっしょん",
+    "常夜鬼譚",
+    "オレンジ",
+    "夜に駆ける",
+    "うっせぇわ",
+    "Lemon",
+    "残響散歌",
+    "紅蓮華",
+    "We don't talk anymore",
+    "Shake It Off",
+    "Dynamite",
+    "좋은 날",
+    "Hype Boy",
+    "晴天",
+    "光年之外",
+    "倔強",
+    "SHINDA!",
+    "Alice in Musicland",
+    "千本桜",
+    "W/X/Y",
+]
+DECORATIONS = [
+    "【歌ってみた】{title} / {artist}",
+    "{title} / {artist}【Covered by {cover}】",
+    "[MV] {title} - {artist}",
+    "{artist} - {title} (Official Video)",
+    "【MV】{title}／{artist}【オリジナル曲】",
+    "{title}『{artist}』 (Cover)",
+    "{artist} '{title}' M/V",
+    "{title} ・*✧Special Edition",
+    "{artist}《{title}》官方MV",
+]
+QUERIES = [
+    "cover",
+    "仮死化",
+    "covered by 町田ちま",
+    "夢追翔 and 町田ちま",
+    "一度だけの恋なら とこ",
+    "アステル レダ",
+    "w/x/y",
+    "alice in musicland",
+    "official vidoe",
+    "yoasobi 夜に駆ける",
+    "周杰倫 晴天",
+    "뉴진스 hype boy",
+    "shake it of",
+    "nothing like this",
+]
+
+
+def build_queue(count: int) -> MusicQueue:
+    rng = random.Random(0)
+    songs = []
+    for index in range(count):
+        artist = rng.choice(ARTISTS)
+        title = rng.choice(DECORATIONS).format(
+            title=rng.choice(TITLES), artist=artist, cover=rng.choice(ARTISTS)
+        )
+        songs.append(
+            Song(
+                f"https://www.youtube.com/watch?v={index:011d}",
+                title=title,
+                channel=artist,
+            )
+        )
+    return MusicQueue(songs)
+
+
+class LegacyMatcher(SongMatcher):
+    @classmethod
+    def split(cls, text):
+        return re.split(r"\s+|[^\w\s・]", text)
+
+    @classmethod
+    def normalize_text(cls, text):
+        text = re.sub(r"[『』【】\[\]()・]", "", text)
+        text = re.sub(r"[^\w\sぁ-んァ-ン一-龯]", "", text)
+        return re.sub(r"\s+", " ", text).strip()
+
+    @classmethod
+    def match(cls, song_queue, query, case_sens=True, threshold=0.8):
+        query = cls.normalize_text(query.lower())
+        q_terms = cls.split(query)
+        results = []
+        for song in song_queue:
+            title_proc = cls.normalize_text(song.name).lower()
+            channel_proc = cls.normalize_text(song.channel).lower()
+            combined_terms = cls.split(title_proc) + cls.split(channel_proc)
+            match_found = False
+            for q_term in q_terms:
+                highest_score = 0
+                if q_term in title_proc or q_term in channel_proc:
+                    highest_score = 1
+                    match_found = True
+                    break
+                for t_term in combined_terms:
+                    highest_score = max(highest_score, cls.term_sim(q_term, t_term))
+                if highest_score >= threshold:
+                    match_found = True
+                    break
+            if match_found:
+                results.append((song, highest_score))
+        results.sort(key=lambda x: x[1], reverse=True)
+        return results
+
+
+def timed(search, rounds: int = ROUNDS) -> tuple:
+    best = float("inf")
+    hits = 0
+    for _ in range(rounds):
+        timer = time.perf_counter()
+        hits = sum(len(search(query)) for query in QUERIES)
+        best = min(best, time.perf_counter() - timer)
+    return best / len(QUERIES) * 1000, hits
+
+
+queue = build_queue(SONGS)
+index = QueueSearchIndex(queue)
+
+legacy_ms, legacy_hits = timed(
+    lambda query: LegacyMatcher.match(queue, query, case_sens=False)
+)
+bounded_ms, bounded_hits = timed(
+    lambda query: SongMatcher.match(queue, query, case_sens=False)
+)
+timer = time.perf_counter()
+index.refresh()
+build_ms = (time.perf_counter() - timer) * 1000
+index_ms, index_hits = timed(lambda query: index.search(query), rounds=1)
+cached_ms, _ = timed(lambda query: index.search(query))
+
+assert legacy_hits == bounded_hits == index_hits, "implementations disagree"
+
+print(f"{SONGS} songs, {len(QUERIES)} queries, {legacy_hits} matches per round")
+print(f"legacy match   {legacy_ms:9.2f} ms/query")
+print(f"bounded match  {bounded_ms:9.2f} ms/query  ({legacy_ms / bounded_ms:5.1f}x)")
+print(f"index build    {build_ms:9.2f} ms")
+print(f"index search   {index_ms:9.3f} ms/query")
+print(f"index repeat   {cached_ms:9.3f} ms/query  (same query on an unchanged queue)")
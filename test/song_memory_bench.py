@@ -0,0 +1,101 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from module.nextcord_jukebox.song import Song
+from module.nextcord_jukebox.timer import CountTimer
+
+# Measures the memory of a 10k-song queue with the slotted Song against the
+# previous dict-based layout, using metadata shaped like jukebox_ytcache rows.
+
+SONGS = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+CHANNELS = 200
+
+
+class LegacySong:
+    def __init__(
+        self,
+        url,
+        title=None,
+        views=None,
+        duration=None,
+        thumbnail=None,
+        channel=None,
+        channel_url=None,
+        thumbnails=None,
+    ):
+        self.url = url
+        self.title = title or "Unknown"
+        self.name = title or "Unknown"
+        self.views = views or 0
+        self.duration = duration or 1
+        self.thumbnail = thumbnail or ""
+        self.channel = channel or "Unknown"
+        self.channel_url = channel_url or ""
+        self.thumbnails = thumbnails or []
+        self.timer = CountTimer()
+        self.source_url = None
+        self.extracted_metadata = False
+
+
+def metadata(index: int) -> dict:
+    video_id = f"{index:011d}"
+    channel = index % CHANNELS
+    # Decoded JSON does not share strings between rows, so neither does this.
+    return {
+        "url": f"https://www.youtube.com/watch?v={video_id}",
+        "title": f"Song number {index} (Official Music Video)",
+        "views": 1_000_000 + index,
+        "duration": 180 + index % 120,
+        "thumbnail": f"https://i.ytimg.com/vi/{video_id}/hqdefault.jpg",
+        "channel": "".join(["Channel ", str(channel)]),
+        "channel_url": "".join(["https://www.youtube.com/channel/UC", str(channel)]),
+        "thumbnails": [
+            f"https://i.ytimg.com/vi/{video_id}/{quality}.jpg"
+            for quality in ("default", "mqdefault", "hqdefault", "sddefault")
+        ],
+    }
+
+
+def measure(cls) -> int:
+    # The metadata is traced too, so strings and lists the songs keep alive count
+    # and the ones they let go of (interned duplicates, thumbnail lists) do not.
+    tracemalloc.start()
+    songs = [cls(**metadata(i)) for i in range(SONGS)]
+    retained = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del songs
+    return retained
+
+
+legacy = measure(LegacySong)
+compact = measure(Song)
+print(f"{SONGS} songs")
+print(f"legacy  {legacy / 1024:10.1f} KiB  ({legacy / SONGS:6.1f} B/song)")
+print(f"compact {compact / 1024:10.1f} KiB  ({compact / SONGS:6.1f} B/song)")
+print(f"saved   {(1 - compact / legacy) * 100:9.1f} %")
@@ -0,0 +1,156 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import asyncio
+import concurrent.futures
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from module.nextcord_jukebox.metadata_cache import MetadataCache
+from module.nextcord_jukebox.music_player import MusicPlayer
+from module.nextcord_jukebox.music_queue import MusicQueue
+from module.nextcord_jukebox.queue import QueueHydrator
+from module.nextcord_jukebox.song import Song
+
+GOOD_ID = "aaaaaaaaaaa"
+BROKEN_ID = "bbbbbbbbbbb"
+UNEXTRACTABLE_ID = "ccccccccccc"
+
+
+class Database:
+    def get_bulk_video_metadata(self, video_ids):
+        return {}
+
+    def cache_video_metadata_bulk(self, entries):
+        pass
+
+
+class Provider:
+    def fetch(self, video_id):
+        if video_id == BROKEN_ID:
+            raise RuntimeError("Video unavailable")
+        return {
+            "url": f"https://www.youtube.com/watch?v={video_id}",
+            "title": video_id,
+            "duration": 60,
+        }
+
+
+class YTDLPool:
+    def extract_info(self, url, download=False):
+        if UNEXTRACTABLE_ID in url:
+            return None
+        return {"url": f"{url}&expire=1719847124"}
+
+
+class Voice:
+    def __init__(self):
+        self.channel = SimpleNamespace(members=[])
+        self.played = []
+
+    def play(self, source, after=None):
+        self.played.append(source)
+
+
+def make_player(executor) -> MusicPlayer:
+    player = MusicPlayer.__new__(MusicPlayer)
+    player.interaction = SimpleNamespace(guild=SimpleNamespace(voice_client=True))
+    player.voice = Voice()
+    player.loop = asyncio.get_running_loop()
+    player.manager = SimpleNamespace(ytdl_pool=YTDLPool())
+    player.metadata_cache = MetadataCache(Database())
+    player.metadata_provider = Provider()
+    player.audio_cache = None
+    player.music_queue = MusicQueue()
+    player._now_playing = None
+    player._members = []
+    player._asyncio_lock = asyncio.Lock()
+    player.hydrator = QueueHydrator(player, executor)
+
+    async def create_audio_source(data, source_url, start_at=0.0, local=False):
+        return source_url
+
+    player._create_audio_source = create_audio_source
+    return player
+
+
+async def play_broken_then_good():
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        player = make_player(executor)
+        player.music_queue.extend(
+            [Song.from_video_id(BROKEN_ID), Song.from_video_id(GOOD_ID)]
+        )
+        await player._play_func(None, player.music_queue[0])
+
+        assert len(player.music_queue) == 1
+        assert player._now_playing is player.music_queue[0]
+        assert player._now_playing.title == GOOD_ID
+        assert player.voice.played == [
+            f"https://www.youtube.com/watch?v={GOOD_ID}&expire=1719847124"
+        ]
+        assert player.metadata_cache.is_failed(BROKEN_ID)
+
+
+async def play_only_broken():
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        player = make_player(executor)
+        player.music_queue.append(Song.from_video_id(BROKEN_ID))
+        await player._play_func(None, player.music_queue[0])
+
+        assert len(player.music_queue) == 0
+        assert player._now_playing is None
+        assert player.voice.played == []
+
+
+async def play_unextractable_then_good():
+    with concurrent.futures.ThreadPoolExecutor(1) as executor:
+        player = make_player(executor)
+        player.music_queue.extend(
+            [Song.from_video_id(UNEXTRACTABLE_ID), Song.from_video_id(GOOD_ID)]
+        )
+        await player._play_func(None, player.music_queue[0])
+
+        assert len(player.music_queue) == 1
+        assert player._now_playing.title == GOOD_ID
+
+
+def test_play_skips_bare_song_whose_fetch_fails():
+    asyncio.run(play_broken_then_good())
+
+
+def test_play_ends_queue_when_only_song_fails():
+    asyncio.run(play_only_broken())
+
+
+def test_play_skips_song_whose_extraction_fails():
+    asyncio.run(play_unextractable_then_good())
+
+
+if __name__ == "__main__":
+    test_play_skips_bare_song_whose_fetch_fails()
+    test_play_ends_queue_when_only_song_fails()
+    test_play_skips_song_whose_extraction_fails()
+    print("ok")
@@ -0,0 +1,165 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from module.nextcord_jukebox.music_queue import MusicQueue
+from module.nextcord_jukebox.song import Song
+
+
+def make_songs(count):
+    return [
+        Song(f"https://www.youtube.com/watch?v={index:011d}", title=f"Song {index}")
+        for index in range(count)
+    ]
+
+
+def assert_matches(queue, expected):
+    """Checks the queue against a list of (entry ID, song) pairs."""
+    songs = [song for _, song in expected]
+    assert len(queue) == len(expected)
+    assert list(queue) == songs
+    assert queue.entries() == [
+        (index, entry_id, song) for index, (entry_id, song) in enumerate(expected)
+    ]
+    for index, (entry_id, song) in enumerate(expected):
+        assert queue[index] is song
+        assert queue.entry_id(index) == entry_id
+        assert queue.position(entry_id) == index
+        assert queue.index(song) == songs.index(song)
+
+
+def test_entry_ids_survive_rotate_move_and_shuffle():
+    songs = make_songs(8)
+    queue = MusicQueue(songs[:5])
+    expected = list(zip([queue.entry_id(index) for index in range(5)], songs[:5]))
+    assert_matches(queue, expected)
+
+    queue.rotate(2)
+    expected = expected[-2:] + expected[:-2]
+    assert_matches(queue, expected)
+
+    queue.rotate(-3)
+    expected = expected[3:] + expected[:3]
+    assert_matches(queue, expected)
+
+    queue.move(0, 3)
+    expected.insert(3, expected.pop(0))
+    assert_matches(queue, expected)
+
+    random.seed(3)
+    queue.shuffle()
+    shuffled = dict((entry_id, song) for _, entry_id, song in queue.entries())
+    assert dict(expected) == shuffled
+    assert queue.entry_id(0) == expected[0][0]
+    expected = [(entry_id, song) for _, entry_id, song in queue.entries()]
+    assert_matches(queue, expected)
+
+
+def test_matches_list_under_random_mutations():
+    rng = random.Random(26)
+    songs = make_songs(40)
+    queue = MusicQueue()
+    expected = []
+
+    for _ in range(2000):
+        operation = rng.choice(
+            ["append", "appendleft", "insert", "pop", "popleft", "move", "rotate"]
+            + ["advance", "advance_append"]
+        )
+        song = rng.choice(songs)
+        if operation == "append":
+            expected.append((queue.append(song), song))
+        elif operation == "appendleft":
+            expected.insert(0, (queue.appendleft(song), song))
+        elif operation == "insert":
+            index = rng.randint(-3, len(expected) + 3)
+            entry_id = queue.insert(index, song)
+            expected.insert(index, (entry_id, song))
+        elif not expected:
+            continue
+        elif operation == "pop":
+            index = rng.randrange(-len(expected), len(expected))
+            assert queue.pop(index) is expected.pop(index)[1]
+        elif operation == "popleft":
+            assert queue.popleft() is expected.pop(0)[1]
+        elif operation == "move":
+            source = rng.randrange(len(expected))
+            destination = rng.randrange(len(expected))
+            assert queue.move(source, destination) is expected[source][1]
+            expected.insert(destination, expected.pop(source))
+        elif operation == "rotate":
+            steps = rng.randint(-5, 5)
+            queue.rotate(steps)
+            steps %= len(expected)
+            expected = expected[-steps:] + expected[:-steps] if steps else expected
+        else:
+            count = rng.randint(0, 3)
+            removed = queue.advance(count, append=operation == "advance_append")
+            count = min(count, len(expected))
+            assert removed == [song for _, song in expected[:count]]
+            if operation == "advance_append":
+                expected = expected[count:] + expected[:count]
+            else:
+                expected = expected[count:]
+
+        assert list(queue) == [song for _, song in expected]
+        for index, (entry_id, _) in enumerate(expected):
+            assert queue.position(entry_id) == index
+
+    assert_matches(queue, expected)
+
+
+def test_removed_entries_are_forgotten():
+    songs = make_songs(3)
+    queue = MusicQueue(songs)
+    entry_id = queue.entry_id(1)
+    version = queue.version
+
+    assert queue.pop(1) is songs[1]
+    assert queue.version > version
+    try:
+        queue.position(entry_id)
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("a removed entry still has a position")
+
+    queue.clear()
+    assert len(queue) == 0 and not queue
+    assert queue.entries() == []
+
+
+def test_index_of_a_song_queued_twice_is_its_first_entry():
+    first, second = make_songs(2)
+    queue = MusicQueue([first, second, first])
+
+    assert queue.index(first) == 0
+    queue.pop(0)
+    assert queue.index(first) == 1
+    queue.rotate(1)
+    assert queue.index(first) == 0
@@ -0,0 +1,130 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from module.matcher import QueueSearchIndex, SongMatcher
+from module.nextcord_jukebox.music_queue import MusicQueue
+from module.nextcord_jukebox.song import Song
+
+WORDS = [
+    "Midnight",
+    "City",
+    "Lights",
+    "Ocean",
+    "Drive",
+    "Summer",
+    "Rain",
+    "Electric",
+    "Heart",
+    "Dreams",
+    "Official",
+    "Video",
+    "(Live)",
+    "Remix",
+]
+CHANNELS = ["M83", "Daft Punk", "The Midnight", "Kavinsky", "Lofi Girl"]
+QUERIES = [
+    "midnight",
+    "MIDNIGHT city",
+    "ocaen",
+    "drive summer",
+    "daft",
+    "kavinski",
+    "electrik hart",
+    "live",
+    "nothing like this",
+    "lofi",
+]
+
+
+def make_song(rng, index):
+    return Song(
+        f"https://www.youtube.com/watch?v={index:011d}",
+        title=" ".join(rng.sample(WORDS, rng.randint(1, 4))),
+        channel=rng.choice(CHANNELS),
+    )
+
+
+def assert_same_results(queue, index):
+    songs = list(queue)
+    for query in QUERIES:
+        expected = SongMatcher.match(songs, query, case_sens=False, threshold=0.8)
+        results = index.search(query, threshold=0.8)
+        assert [(song, score) for _, song, score in results] == expected, query
+        for position, song, _ in results:
+            assert queue[position] is song
+
+
+def test_search_matches_song_matcher_after_mutations():
+    rng = random.Random(45)
+    queue = MusicQueue(make_song(rng, index) for index in range(30))
+    index = QueueSearchIndex(queue)
+    assert_same_results(queue, index)
+
+    for step in range(60):
+        operation = rng.choice(
+            ["append", "insert", "pop", "move", "rotate", "shuffle", "retitle"]
+        )
+        if operation == "append":
+            queue.append(make_song(rng, 100 + step))
+        elif operation == "insert":
+            queue.insert(rng.randrange(len(queue) + 1), make_song(rng, 100 + step))
+        elif operation == "pop" and len(queue) > 1:
+            queue.pop(rng.randrange(len(queue)))
+        elif operation == "move":
+            queue.move(rng.randrange(len(queue)), rng.randrange(len(queue)))
+        elif operation == "rotate":
+            queue.rotate(rng.randint(-3, 3))
+        elif operation == "shuffle":
+            queue.shuffle()
+        else:
+            # A song hydrated in place changes its title without a queue mutation.
+            song = queue[rng.randrange(len(queue))]
+            song.title = " ".join(rng.sample(WORDS, 2))
+            queue.touch()
+        assert_same_results(queue, index)
+
+
+def test_cached_results_follow_queue_changes():
+    rng = random.Random(7)
+    queue = MusicQueue(make_song(rng, index) for index in range(5))
+    index = QueueSearchIndex(queue)
+    before = index.search("kavinsky")
+
+    queue.append(
+        Song(
+            "https://www.youtube.com/watch?v=kkkkkkkkkkk",
+            "Nightcall",
+            channel="Kavinsky",
+        )
+    )
+    after = index.search("kavinsky")
+
+    assert len(after) == len(before) + 1
+    assert after[-1][0] == len(queue) - 1
+    assert_same_results(queue, index)
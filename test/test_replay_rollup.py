@@ -0,0 +1,99 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import asyncio
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from module.nextcord_jukebox.database_handler import Database
+
+GUILD = "100"
+TODAY = datetime.now().replace(microsecond=0)
+EARLIER = (TODAY - timedelta(days=1)).isoformat()
+LATER = TODAY.isoformat()
+OLD = (TODAY - timedelta(days=60)).isoformat()
+
+
+def make_database(tmp_path) -> Database:
+    database = Database("sqlite", db_file=str(tmp_path / "jukebox.db"))
+    # Two listeners hear the same play, one of them also hears two more songs.
+    database.add_replay_entries(
+        [
+            ("1", EARLIER, "song_a", GUILD),
+            ("2", EARLIER, "song_a", GUILD),
+            ("1", LATER, "song_a", GUILD),
+            ("1", LATER, "song_b", GUILD),
+            ("2", OLD, "song_c", GUILD),
+        ]
+    )
+    return database
+
+
+def summaries(database):
+    async def fetch():
+        return (
+            await database.get_replay_summary("1", 30),
+            await database.get_replay_summary("2", 30),
+            await database.get_guild_replay_summary(GUILD, 30),
+        )
+
+    return asyncio.run(fetch())
+
+
+def test_rollup_totals_after_add(tmp_path):
+    database = make_database(tmp_path)
+    user_1, user_2, guild = summaries(database)
+
+    assert user_1 == {"top": [("song_a", 2), ("song_b", 1)], "total": 3}
+    assert user_2 == {"top": [("song_a", 1)], "total": 1}
+    # The guild rollup counts listener-plays, the sum of the user rollups.
+    assert guild == {"top": [("song_a", 3), ("song_b", 1)], "total": 4}
+    database.close()
+
+
+def test_rollup_totals_after_clear(tmp_path):
+    database = make_database(tmp_path)
+    database.clear_replay_history("1")
+    user_1, user_2, guild = summaries(database)
+
+    assert user_1 == {"top": [], "total": 0}
+    assert user_2 == {"top": [("song_a", 1)], "total": 1}
+    assert guild == {"top": [("song_a", 1)], "total": 1}
+    database.cursor.execute(
+        "SELECT COUNT(*) FROM jukebox_guild_rollup WHERE plays <= 0"
+    )
+    assert database.cursor.fetchone()[0] == 0
+    database.close()
+
+
+def test_backfill_rebuilds_the_same_rollups(tmp_path):
+    database = make_database(tmp_path)
+    database.clear_replay_history("1")
+    before = summaries(database)
+
+    assert database.backfill_replay_rollup(force=True) > 0
+    assert summaries(database) == before
+    database.close()
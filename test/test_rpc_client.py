@@ -0,0 +1,106 @@
+#  ------------------------------------------------------------
+#  Copyright (c) 2024 Rystal-Team
+#
+#  Permission is hereby granted, free of charge, to any person obtaining a copy
+#  of this software and associated documentation files (the "Software"), to deal
+#  in the Software without restriction, including without limitation the rights
+#  to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+#  copies of the Software, and to permit persons to whom the Software is
+#  furnished to do so, subject to the following conditions:
+#
+#  The above copyright notice and this permission notice shall be included in
+#  all copies or substantial portions of the Software.
+#
+#  THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#  IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#  FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#  AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#  LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#  OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+#  THE SOFTWARE.
+#  ------------------------------------------------------------
+#
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from module.nextcord_jukebox.sockets import RPCClient
+
+
+class WebSocket:
+    """Records sent messages; sends block until the gate opens."""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.messages = []
+        self.closed = False
+
+    async def send(self, message):
+        await self.gate.wait()
+        self.messages.append(message)
+
+    async def close(self):
+        self.closed = True
+
+
+async def drain(client, websocket):
+    websocket.gate.set()
+    while client._pending:
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+
+async def coalesce_by_kind():
+    websocket = WebSocket()
+    client = RPCClient("secret", websocket, max_pending=8)
+    client.send("state 1", "state")
+    await asyncio.sleep(0)  # The writer takes state 1 and blocks on it.
+
+    client.send("sync 1", "sync")
+    client.send("event 1")
+    client.send("sync 2", "sync")
+    client.send("event 2")
+    queued = [message for _, message in client._pending]
+    client.send("state 2", "state")
+    client.send("sync 3", "sync")
+
+    await drain(client, websocket)
+    client.close()
+    return queued, websocket.messages, client
+
+
+async def overflow_closes_client():
+    websocket = WebSocket()
+    client = RPCClient("secret", websocket, max_pending=2)
+    client.send("event 1")
+    await asyncio.sleep(0)
+    client.send("event 2")
+    client.send("event 3")
+    client.send("event 4")
+    await asyncio.sleep(0)
+    closed_after_overflow = websocket.closed
+    client.send("event 5")
+    return closed_after_overflow, client
+
+
+def test_newer_messages_supersede_queued_ones_of_their_kind():
+    queued, sent, client = asyncio.run(coalesce_by_kind())
+
+    # A sync only replaces queued syncs.
+    assert queued == ["event 1", "sync 2", "event 2"]
+    # A state replaces queued states and syncs; other messages keep their order.
+    assert sent == ["state 1", "event 1", "event 2", "state 2", "sync 3"]
+    assert client.sent == 5
+    assert client.dropped == 2
+
+
+def test_overflow_closes_the_client():
+    closed_after_overflow, client = asyncio.run(overflow_closes_client())
+
+    assert closed_after_overflow
+    assert client._closed
+    assert not client._pending
+    assert client.dropped == 3